@@ -38,6 +38,40 @@ func putGuilds(c *gin.Context) {
 	c.JSON(http.StatusOK, gin.H{"success": true})
 }
 
+type GuildCommit struct {
+	AdminPlayerUids []string `json:"admin_player_uids"`
+}
+
+// commitGuilds godoc
+//
+//	@Summary		Commit Guilds
+//	@Description	Finish a SavSync, removing guilds that are no longer in the save and listing the ones that are not stored
+//	@Tags			Guild
+//	@Accept			json
+//	@Produce		json
+//
+//	@Security		ApiKeyAuth
+//
+//	@Param			commit	body		GuildCommit	true	"Admin UIDs of every guild in the save"
+//
+//	@Success		200		{object}	CommitResponse
+//	@Failure		401		{object}	ErrorResponse
+//	@Failure		400		{object}	ErrorResponse
+//	@Router			/api/guild/commit [post]
+func commitGuilds(c *gin.Context) {
+	var commit GuildCommit
+	if err := c.ShouldBindJSON(&commit); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+	missing, err := service.PruneGuilds(database.GetDB(), commit.AdminPlayerUids)
+	if err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+	c.JSON(http.StatusOK, gin.H{"success": true, "missing": missing})
+}
+
 // listGuilds godoc
 //
 //	@Summary		List Guilds
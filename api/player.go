@@ -1,7 +1,9 @@
 package api
 
 import (
+	"encoding/json"
 	"fmt"
+	"io"
 	"net/http"
 	"sort"
 
@@ -11,6 +13,9 @@ import (
 	"github.com/zaigie/palworld-server-tool/service"
 )
 
+// players decoded from an NDJSON upload before they are written out
+const playerBatchSize = 100
+
 type PlayerOrderBy string
 
 const (
@@ -68,6 +73,85 @@ func putPlayers(c *gin.Context) {
 	c.JSON(http.StatusOK, gin.H{"success": true})
 }
 
+// putPlayersBatch godoc
+//
+//	@Summary		Put Players Batch
+//	@Description	Upsert one NDJSON batch of players (one player per line) during a SavSync, finish with /api/player/commit
+//	@Tags			Player
+//	@Accept			x-ndjson
+//	@Produce		json
+//
+//	@Security		ApiKeyAuth
+//
+//	@Param			players	body		database.Player	true	"Players, one JSON object per line"
+//
+//	@Success		200		{object}	SuccessResponse
+//	@Failure		400		{object}	ErrorResponse
+//	@Failure		401		{object}	ErrorResponse
+//	@Router			/api/player/batch [put]
+func putPlayersBatch(c *gin.Context) {
+	decoder := json.NewDecoder(c.Request.Body)
+	players := make([]database.Player, 0, playerBatchSize)
+	for {
+		var player database.Player
+		err := decoder.Decode(&player)
+		if err == io.EOF {
+			break
+		}
+		if err != nil {
+			c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+			return
+		}
+		players = append(players, player)
+		if len(players) == playerBatchSize {
+			if err := service.UpsertPlayers(database.GetDB(), players); err != nil {
+				c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+				return
+			}
+			players = players[:0]
+		}
+	}
+	if err := service.UpsertPlayers(database.GetDB(), players); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+	c.JSON(http.StatusOK, gin.H{"success": true})
+}
+
+type PlayerCommit struct {
+	PlayerUids []string `json:"player_uids"`
+}
+
+// commitPlayers godoc
+//
+//	@Summary		Commit Players
+//	@Description	Finish a batched SavSync, removing players that are no longer in the save and listing the ones that are not stored
+//	@Tags			Player
+//	@Accept			json
+//	@Produce		json
+//
+//	@Security		ApiKeyAuth
+//
+//	@Param			commit	body		PlayerCommit	true	"UIDs of every player in the save"
+//
+//	@Success		200		{object}	CommitResponse
+//	@Failure		400		{object}	ErrorResponse
+//	@Failure		401		{object}	ErrorResponse
+//	@Router			/api/player/commit [post]
+func commitPlayers(c *gin.Context) {
+	var commit PlayerCommit
+	if err := c.ShouldBindJSON(&commit); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+	missing, err := service.PrunePlayers(database.GetDB(), commit.PlayerUids)
+	if err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+	c.JSON(http.StatusOK, gin.H{"success": true, "missing": missing})
+}
+
 // listPlayers godoc
 //
 //	@Summary		List Players
@@ -1,7 +1,9 @@
 package api
 
 import (
+	"compress/gzip"
 	"fmt"
+	"net/http"
 	"strings"
 
 	"github.com/gin-gonic/gin"
@@ -24,6 +26,11 @@ type ErrorResponse struct {
 
 type EmptyResponse struct{}
 
+type CommitResponse struct {
+	Success bool     `json:"success"`
+	Missing []string `json:"missing"`
+}
+
 func ignoreLogPrefix(path string) bool {
 	prefixes := []string{"/swagger/", "/assets/", "/favicon.ico", "/map"}
 	for _, prefix := range prefixes {
@@ -54,6 +61,27 @@ func Logger() gin.HandlerFunc {
 	})
 }
 
+// GzipRequest decompresses request bodies sent with Content-Encoding: gzip,
+// as sav_cli does for its uploads.
+func GzipRequest() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		if c.GetHeader("Content-Encoding") != "gzip" {
+			c.Next()
+			return
+		}
+		reader, err := gzip.NewReader(c.Request.Body)
+		if err != nil {
+			c.AbortWithStatusJSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+			return
+		}
+		defer reader.Close()
+		c.Request.Body = reader
+		c.Request.Header.Del("Content-Encoding")
+		c.Request.ContentLength = -1
+		c.Next()
+	}
+}
+
 func RegisterRouter(r *gin.Engine) {
 	r.Use(Logger(), gin.Recovery())
 
@@ -75,15 +103,18 @@ func RegisterRouter(r *gin.Engine) {
 	}
 
 	authGroup := apiGroup.Group("")
-	authGroup.Use(auth.JWTAuthMiddleware())
+	authGroup.Use(auth.JWTAuthMiddleware(), GzipRequest())
 	{
 		authGroup.POST("/server/broadcast", publishBroadcast)
 		authGroup.POST("/server/shutdown", shutdownServer)
 		authGroup.PUT("/player", putPlayers)
+		authGroup.PUT("/player/batch", putPlayersBatch)
+		authGroup.POST("/player/commit", commitPlayers)
 		authGroup.POST("/player/:player_uid/kick", kickPlayer)
 		authGroup.POST("/player/:player_uid/ban", banPlayer)
 		authGroup.POST("/player/:player_uid/unban", unbanPlayer)
 		authGroup.PUT("/guild", putGuilds)
+		authGroup.POST("/guild/commit", commitGuilds)
 		authGroup.POST("/sync", syncData)
 		authGroup.GET("/whitelist", listWhite)
 		authGroup.POST("/whitelist", addWhite)
@@ -24,6 +24,7 @@ const (
 //	@Produce		json
 //	@Security		ApiKeyAuth
 //	@Param			from	query		From	true	"from"	enum(rest,sav)
+//	@Param			force	query		bool	false	"decode the save even if it is unchanged"
 //
 //	@Success		200		{object}	SuccessResponse
 //	@Failure		401		{object}	ErrorResponse
@@ -35,7 +36,11 @@ func syncData(c *gin.Context) {
 		c.JSON(http.StatusOK, gin.H{"success": true})
 		return
 	} else if from == "sav" {
-		go task.SavSync()
+		if c.Query("force") == "true" {
+			go task.ForceSavSync()
+		} else {
+			go task.SavSync()
+		}
 		c.JSON(http.StatusOK, gin.H{"success": true})
 		return
 	}
@@ -37,6 +37,10 @@ type Config struct {
 	Save struct {
 		Path           string `mapstructure:"path"`
 		DecodePath     string `mapstructure:"decode_path"`
+		DecodeServe    bool   `mapstructure:"decode_serve"`
+		DecodeMetrics  string `mapstructure:"decode_metrics"`
+		DecodeTimeout  int    `mapstructure:"decode_timeout"`
+		Watch          bool   `mapstructure:"watch"`
 		SyncInterval   int    `mapstructure:"sync_interval"`
 		BackupInterval int    `mapstructure:"backup_interval"`
 		BackupKeepDays int    `mapstructure:"backup_keep_days"`
@@ -76,6 +80,9 @@ func Init(cfgFile string, conf *Config) {
 	viper.SetDefault("rest.timeout", 5)
 
 	viper.SetDefault("save.sync_interval", 600)
+	viper.SetDefault("save.decode_serve", false)
+	viper.SetDefault("save.decode_timeout", 600)
+	viper.SetDefault("save.watch", false)
 	viper.SetDefault("save.backup_interval", 14400)
 	viper.SetDefault("save.backup_keep_days", 7)
 
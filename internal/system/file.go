@@ -61,8 +61,15 @@ func CopyFile(srcFile, destFile string) error {
 	}
 	defer output.Close()
 
-	_, err = io.Copy(output, input)
-	return err
+	if _, err = io.Copy(output, input); err != nil {
+		return err
+	}
+	// keep the save time, sav_cli derives last online times from it
+	info, err := input.Stat()
+	if err != nil {
+		return err
+	}
+	return os.Chtimes(destFile, info.ModTime(), info.ModTime())
 }
 
 func ZipDir(srcDir, zipFilePath string) error {
@@ -150,14 +150,42 @@ func CheckAndKickPlayers(db *bbolt.DB, players []database.OnlinePlayer) {
 }
 
 func SavSync() {
+	savSync(false)
+}
+
+// ForceSavSync decodes and uploads the save even if it has not changed
+func ForceSavSync() {
+	savSync(true)
+}
+
+func savSync(force bool) {
 	logger.Info("Scheduling Sav sync...\n")
-	err := tool.Decode(viper.GetString("save.path"))
+	err := tool.Decode(viper.GetString("save.path"), force)
 	if err != nil {
 		logger.Errorf("%v\n", err)
 	}
 	logger.Info("Sav sync done\n")
 }
 
+// SavWatch syncs the save whenever the game writes it, falling back to
+// interval syncs if the save can't be watched
+func SavWatch() {
+	err := tool.Watch(viper.GetString("save.path"))
+	logger.Errorf("%v\n", err)
+	savSyncInterval := time.Duration(viper.GetInt("save.sync_interval"))
+	if savSyncInterval > 0 {
+		logger.Warn("Falling back to interval Sav sync\n")
+		SavSync()
+		_, err = getScheduler().NewJob(
+			gocron.DurationJob(savSyncInterval*time.Second),
+			gocron.NewTask(SavSync),
+		)
+		if err != nil {
+			logger.Errorf("%v\n", err)
+		}
+	}
+}
+
 func Schedule(db *bbolt.DB) {
 	s := getScheduler()
 
@@ -176,7 +204,9 @@ func Schedule(db *bbolt.DB) {
 		}
 	}
 
-	if savSyncInterval > 0 {
+	if viper.GetBool("save.watch") {
+		go SavWatch()
+	} else if savSyncInterval > 0 {
 		go SavSync()
 		_, err := s.NewJob(
 			gocron.DurationJob(savSyncInterval*time.Second),
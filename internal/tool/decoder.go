@@ -0,0 +1,176 @@
+package tool
+
+import (
+	"bufio"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"os"
+	"os/exec"
+	"sync"
+	"time"
+
+	"github.com/zaigie/palworld-server-tool/internal/logger"
+)
+
+// decoder keeps one `sav_cli --serve` process alive between syncs so the
+// interpreter start, imports and Oodle setup are paid only once.
+type decoder struct {
+	mu     sync.Mutex
+	path   string
+	cmd    *exec.Cmd
+	stdin  io.WriteCloser
+	stdout *bufio.Reader
+	nextId int
+}
+
+type decodeJob struct {
+	Id          int    `json:"id"`
+	File        string `json:"file"`
+	Request     string `json:"request"`
+	Token       string `json:"token"`
+	CacheDir    string `json:"cache_dir,omitempty"`
+	CacheHash   bool   `json:"cache_hash,omitempty"`
+	StateFile   string `json:"state_file,omitempty"`
+	FullSync    bool   `json:"full_sync,omitempty"`
+	Force       bool   `json:"force,omitempty"`
+	MetricsJson string `json:"metrics_json,omitempty"`
+	MetricsProm string `json:"metrics_prom,omitempty"`
+}
+
+// decodeMetrics is the per-phase breakdown sav_cli reports for a job
+type decodeMetrics struct {
+	Status  string             `json:"status"`
+	Seconds float64            `json:"seconds"`
+	Phases  map[string]float64 `json:"phases"`
+	Counts  map[string]int     `json:"counts"`
+	Caches  map[string]struct {
+		Hits    int     `json:"hits"`
+		Misses  int     `json:"misses"`
+		HitRate float64 `json:"hit_rate"`
+	} `json:"caches"`
+}
+
+type decodeResult struct {
+	Id        int                `json:"id"`
+	Ok        bool               `json:"ok"`
+	Unchanged bool               `json:"unchanged"`
+	Error     string             `json:"error"`
+	Timings   map[string]float64 `json:"timings"`
+	Metrics   decodeMetrics      `json:"metrics"`
+}
+
+var savDecoder decoder
+
+func (d *decoder) start(savCli string) error {
+	cmd := exec.Command(savCli, "--serve")
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return err
+	}
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return err
+	}
+	cmd.Stderr = os.Stderr
+	if err = cmd.Start(); err != nil {
+		return err
+	}
+	d.path = savCli
+	d.cmd = cmd
+	d.stdin = stdin
+	d.stdout = bufio.NewReader(stdout)
+	return nil
+}
+
+func (d *decoder) stop() {
+	if d.cmd == nil {
+		return
+	}
+	d.stdin.Close()
+	d.cmd.Process.Kill()
+	d.cmd.Wait()
+	d.cmd = nil
+}
+
+// run sends job to the resident decoder and waits for its result. A decoder
+// that has not answered within timeout is killed, the next job starts a new
+// one; a timeout of 0 waits forever.
+func (d *decoder) run(savCli string, job decodeJob, timeout time.Duration) (decodeResult, error) {
+	d.mu.Lock()
+	defer d.mu.Unlock()
+
+	var result decodeResult
+	if d.cmd != nil && d.path != savCli {
+		d.stop()
+	}
+	if d.cmd == nil {
+		if err := d.start(savCli); err != nil {
+			return result, errors.New("error starting decoder: " + err.Error())
+		}
+	}
+
+	d.nextId++
+	job.Id = d.nextId
+	line, err := json.Marshal(job)
+	if err != nil {
+		return result, err
+	}
+	if _, err = d.stdin.Write(append(line, '\n')); err != nil {
+		d.stop()
+		return result, errors.New("error sending job to decoder: " + err.Error())
+	}
+	type response struct {
+		line []byte
+		err  error
+	}
+	responses := make(chan response, 1)
+	stdout := d.stdout
+	go func() {
+		line, err := stdout.ReadBytes('\n')
+		responses <- response{line, err}
+	}()
+	var expired <-chan time.Time
+	if timeout > 0 {
+		timer := time.NewTimer(timeout)
+		defer timer.Stop()
+		expired = timer.C
+	}
+	var resp []byte
+	select {
+	case r := <-responses:
+		resp, err = r.line, r.err
+	case <-expired:
+		// killing the child closes its stdout, which ends the read
+		d.stop()
+		<-responses
+		return result, fmt.Errorf("decoder did not answer job %d within %s, restarted it", job.Id, timeout)
+	}
+	if err != nil {
+		d.stop()
+		return result, errors.New("error reading decoder result: " + err.Error())
+	}
+	if err = json.Unmarshal(resp, &result); err != nil {
+		d.stop()
+		return result, errors.New("error parsing decoder result: " + err.Error())
+	}
+	if result.Id != job.Id {
+		d.stop()
+		return result, fmt.Errorf("decoder answered job %d, expected %d", result.Id, job.Id)
+	}
+	if !result.Ok {
+		return result, errors.New(result.Error)
+	}
+	if result.Unchanged {
+		return result, nil
+	}
+	logger.Infof("Decoded in %.3fs (convert %.3fs, players %.3fs, guilds %.3fs, output %.3fs)\n",
+		result.Timings["total"], result.Timings["convert"], result.Timings["players"],
+		result.Timings["guilds"], result.Timings["output"])
+	m := result.Metrics
+	logger.Infof("Decoded %d players, %d pals, %d guilds, %d containers; player cache hit rate %.2f\n",
+		m.Counts["players"], m.Counts["pals"], m.Counts["guilds"], m.Counts["containers"],
+		m.Caches["players"].HitRate)
+	return result, nil
+}
@@ -20,6 +20,9 @@ import (
 	"go.etcd.io/bbolt"
 )
 
+// fullSyncDone is set once a sync has uploaded every record since start
+var fullSyncDone bool
+
 type Sturcture struct {
 	Players []database.Player `json:"players"`
 	Guilds  []database.Guild  `json:"guilds"`
@@ -44,7 +47,73 @@ func getSavCli() (string, error) {
 	return savCliPath, nil
 }
 
-func Decode(file string) error {
+// exit status of sav_cli when the save matches the last sync
+const savUnchangedExitCode = 3
+
+// newDecodeJob describes a sync of levelFilePath to the local API
+func newDecodeJob(levelFilePath string, force bool) (decodeJob, error) {
+	baseUrl := fmt.Sprintf("http://127.0.0.1:%d", viper.GetInt("web.port"))
+	if viper.GetBool("web.tls") && !strings.HasSuffix(baseUrl, "/") {
+		baseUrl = viper.GetString("web.public_url")
+	}
+
+	requestUrl := fmt.Sprintf("%s/api/", baseUrl)
+	tokenString, err := auth.GenerateToken()
+	if err != nil {
+		return decodeJob{}, errors.New("error generating token: " + err.Error())
+	}
+	cacheDir, err := GetCacheDir()
+	if err != nil {
+		logger.Warnf("decode cache disabled: %s\n", err)
+	}
+	job := decodeJob{
+		File:    levelFilePath,
+		Request: requestUrl,
+		Token:   tokenString,
+		// the first sync after start sends everything, later ones only changes
+		FullSync: !fullSyncDone,
+		Force:    force,
+	}
+	if metricsDir := viper.GetString("save.decode_metrics"); metricsDir != "" {
+		// sav_cli.prom can be picked up by node_exporter's textfile collector
+		if err := os.MkdirAll(metricsDir, os.ModePerm); err != nil {
+			logger.Warnf("decode metrics disabled: %s\n", err)
+		} else {
+			job.MetricsJson = filepath.Join(metricsDir, "sav_cli.json")
+			job.MetricsProm = filepath.Join(metricsDir, "sav_cli.prom")
+		}
+	}
+	if cacheDir != "" {
+		// Saves are copied to a fresh temp dir each sync, so player files
+		// are matched by content hash rather than path
+		job.CacheDir = filepath.Join(cacheDir, "players")
+		job.CacheHash = true
+		job.StateFile = filepath.Join(cacheDir, "sync_state.json")
+	}
+	return job, nil
+}
+
+// args returns the sav_cli options for the job, except the save file
+func (job decodeJob) args() []string {
+	execArgs := []string{"--request", job.Request, "--token", job.Token}
+	if job.CacheDir != "" {
+		execArgs = append(execArgs, "--cache-dir", job.CacheDir, "--cache-hash", "--state-file", job.StateFile)
+	}
+	if job.MetricsJson != "" {
+		execArgs = append(execArgs, "--metrics-json", job.MetricsJson, "--metrics-prom", job.MetricsProm)
+	}
+	if job.FullSync {
+		execArgs = append(execArgs, "--full-sync")
+	}
+	if job.Force {
+		execArgs = append(execArgs, "--force")
+	}
+	return execArgs
+}
+
+// Decode converts the save and uploads it to the API. Unless force is set,
+// a save whose files match the last successful sync is skipped.
+func Decode(file string, force bool) error {
 	savCli, err := getSavCli()
 	if err != nil {
 		return errors.New("error getting executable path: " + err.Error())
@@ -56,17 +125,25 @@ func Decode(file string) error {
 	}
 	defer os.RemoveAll(filepath.Dir(levelFilePath))
 
-	baseUrl := fmt.Sprintf("http://127.0.0.1:%d", viper.GetInt("web.port"))
-	if viper.GetBool("web.tls") && !strings.HasSuffix(baseUrl, "/") {
-		baseUrl = viper.GetString("web.public_url")
+	job, err := newDecodeJob(levelFilePath, force)
+	if err != nil {
+		return err
 	}
 
-	requestUrl := fmt.Sprintf("%s/api/", baseUrl)
-	tokenString, err := auth.GenerateToken()
-	if err != nil {
-		return errors.New("error generating token: " + err.Error())
+	if viper.GetBool("save.decode_serve") {
+		timeout := time.Duration(viper.GetInt("save.decode_timeout")) * time.Second
+		result, err := savDecoder.run(savCli, job, timeout)
+		if err != nil {
+			return err
+		}
+		if result.Unchanged {
+			logger.Info("Save unchanged since last sync, skipped\n")
+		}
+		fullSyncDone = true
+		return nil
 	}
-	execArgs := []string{"-f", levelFilePath, "--request", requestUrl, "--token", tokenString}
+
+	execArgs := append([]string{"-f", levelFilePath}, job.args()...)
 	cmd := exec.Command(savCli, execArgs...)
 	cmd.Stdout = os.Stdout
 	cmd.Stderr = os.Stderr
@@ -75,9 +152,13 @@ func Decode(file string) error {
 		return errors.New("error starting command: " + err.Error())
 	}
 	err = cmd.Wait()
-	if err != nil {
+	var exitErr *exec.ExitError
+	if errors.As(err, &exitErr) && exitErr.ExitCode() == savUnchangedExitCode {
+		logger.Info("Save unchanged since last sync, skipped\n")
+	} else if err != nil {
 		return errors.New("error waiting for command: " + err.Error())
 	}
+	fullSyncDone = true
 
 	return nil
 }
@@ -117,6 +198,18 @@ func GetBackupDir() (string, error) {
 	return backDir, nil
 }
 
+func GetCacheDir() (string, error) {
+	wd, err := os.Getwd()
+	if err != nil {
+		return "", err
+	}
+	cacheDir := filepath.Join(wd, "cache")
+	if err = os.MkdirAll(cacheDir, os.ModePerm); err != nil {
+		return "", err
+	}
+	return cacheDir, nil
+}
+
 func CleanOldBackups(db *bbolt.DB, keepDays int) error {
 	backupDir, err := GetBackupDir()
 	if err != nil {
@@ -0,0 +1,74 @@
+package tool
+
+import (
+	"errors"
+	"fmt"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strings"
+	"time"
+
+	"github.com/zaigie/palworld-server-tool/internal/logger"
+	"github.com/zaigie/palworld-server-tool/internal/system"
+)
+
+// watchPeriod restarts `sav_cli --watch` well before its API token expires
+const watchPeriod = 12 * time.Hour
+
+// Watch keeps `sav_cli --watch` running on a local save, which syncs shortly
+// after every game save instead of on a fixed interval. It only returns if
+// the save cannot be watched.
+func Watch(file string) error {
+	for _, prefix := range []string{"http://", "https://", "k8s://", "docker://"} {
+		if strings.HasPrefix(file, prefix) {
+			return errors.New("save.watch needs a local save.path")
+		}
+	}
+	levelFilePath := file
+	isDir, err := system.CheckIsDir(file)
+	if err != nil {
+		return err
+	}
+	if isDir {
+		levelFilePath, err = system.GetLevelSavFilePath(file)
+		if err != nil {
+			return errors.New("error finding Level.sav: " + err.Error())
+		}
+	}
+
+	for {
+		start := time.Now()
+		if err := runWatcher(filepath.Dir(levelFilePath)); err != nil {
+			logger.Errorf("save watcher stopped: %v\n", err)
+		}
+		// don't spin if sav_cli fails right away
+		if time.Since(start) < time.Minute {
+			time.Sleep(time.Minute)
+		}
+	}
+}
+
+func runWatcher(saveDir string) error {
+	savCli, err := getSavCli()
+	if err != nil {
+		return errors.New("error getting executable path: " + err.Error())
+	}
+	job, err := newDecodeJob(filepath.Join(saveDir, "Level.sav"), false)
+	if err != nil {
+		return err
+	}
+	execArgs := append([]string{
+		"--watch", saveDir,
+		"--watch-for", fmt.Sprint(watchPeriod.Seconds()),
+	}, job.args()...)
+	cmd := exec.Command(savCli, execArgs...)
+	cmd.Stdout = os.Stdout
+	cmd.Stderr = os.Stderr
+	logger.Infof("Watching %s for saves\n", saveDir)
+	if err = cmd.Run(); err != nil {
+		return err
+	}
+	fullSyncDone = true
+	return nil
+}
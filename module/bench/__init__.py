@@ -0,0 +1,4 @@
+"""Synthetic saves and benchmarks for the sav_cli pipeline.
+
+Run from the ``module`` directory, e.g. ``python -m bench.scaling``.
+"""
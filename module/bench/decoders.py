@@ -0,0 +1,362 @@
+"""Microbenchmark each rawdata decode_bytes/encode_bytes pair.
+
+The corpus is a set of golden RawData blobs per decoder, harvested from a
+save by recording every ``decode_bytes`` call while the save is loaded with
+all custom properties. Where sav_cli replaces a vendored decoder with its
+own (guilds and item slots, see ``structurer``), its own one is measured. Without ``--save`` or ``--corpus`` a synthetic 1x
+world from ``bench.synth`` is harvested, which only covers the decoders
+that world reaches; harvest a real save for the rest.
+
+For every decoder the harness reports ns per blob for decode and encode and
+checks that ``encode_bytes(decode_bytes(blob))`` gives the blob back.
+CPython keeps no allocation counter, so memory is reported as the blocks
+the decoded value retains and the peak traced bytes of one call, both per
+blob. Blobs a decoder could only keep as raw bytes are counted as fallbacks.
+
+    python -m bench.decoders --save Level.sav --write-corpus corpus/
+    python -m bench.decoders --corpus corpus/ --only character,group
+"""
+
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from palworld_save_tools import diagnostics
+from palworld_save_tools.archive import FArchiveReader
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import (
+    DISABLED_PROPERTIES,
+    PALWORLD_CUSTOM_PROPERTIES,
+    PALWORLD_TYPE_HINTS,
+)
+
+# registers sav_cli's own decoders in PALWORLD_CUSTOM_PROPERTIES
+import structurer
+
+DECODERS = (
+    "base_camp",
+    "base_camp_module",
+    "build_process",
+    "character",
+    "character_container",
+    "connector",
+    "dynamic_item",
+    "foliage_model",
+    "foliage_model_instance",
+    "group",
+    "item_container",
+    "item_container_slots",
+    "map_concrete_model",
+    "map_concrete_model_module",
+    "map_model",
+    "work",
+    "work_collection",
+    "worker_director",
+)
+# decoders sav_cli ships in place of the vendored rawdata ones
+SHIPPED_DECODERS = {"group", "item_container_slots"}
+# corpus records: extra decode argument, then the blob, each length prefixed
+LENGTH = struct.Struct("<I")
+
+
+def load_module(name):
+    if name in SHIPPED_DECODERS:
+        return importlib.import_module(name)
+    return importlib.import_module(f"palworld_save_tools.rawdata.{name}")
+
+
+def harvest(level_file, limit=200):
+    """Golden blobs per decoder from ``level_file``, at most ``limit`` each.
+
+    Returns ``{decoder: [(blob, extra_argument), ...]}``; the extra argument
+    is the group, module or work type some decoders take, None otherwise.
+    Blobs are sampled evenly over the save.
+    """
+    with open(level_file, "rb") as f:
+        gvas, _ = decompress_sav_to_gvas(f.read())
+
+    recorded = {name: [] for name in DECODERS}
+    originals = {}
+
+    def recorder(name, original):
+        def decode_bytes(parent_reader, blob, *extra, **kwargs):
+            recorded[name].append((bytes(blob), extra[0] if extra else None))
+            return original(parent_reader, blob, *extra, **kwargs)
+
+        return decode_bytes
+
+    for name in DECODERS:
+        module = load_module(name)
+        originals[name] = module.decode_bytes
+        module.decode_bytes = recorder(name, module.decode_bytes)
+    try:
+        GvasFile.read(gvas, PALWORLD_TYPE_HINTS, PALWORLD_CUSTOM_PROPERTIES)
+    except Exception as e:
+        # the disabled decoders don't keep up with every game version
+        print(
+            f"Loading with every decoder failed ({e}), "
+            "retrying without the disabled ones",
+            file=sys.stderr,
+        )
+        for blobs in recorded.values():
+            blobs.clear()
+        custom_properties = {
+            path: codec
+            for path, codec in PALWORLD_CUSTOM_PROPERTIES.items()
+            if path not in DISABLED_PROPERTIES
+        }
+        GvasFile.read(gvas, PALWORLD_TYPE_HINTS, custom_properties)
+    finally:
+        for name, original in originals.items():
+            load_module(name).decode_bytes = original
+
+    corpus = {}
+    for name, blobs in recorded.items():
+        if len(blobs) > limit:
+            step = len(blobs) / limit
+            blobs = [blobs[int(i * step)] for i in range(limit)]
+        if blobs:
+            corpus[name] = blobs
+    return corpus
+
+
+def write_corpus(corpus, corpus_dir):
+    os.makedirs(corpus_dir, exist_ok=True)
+    for name, blobs in corpus.items():
+        with open(os.path.join(corpus_dir, f"{name}.bin"), "wb") as f:
+            for blob, extra in blobs:
+                extra = b"" if extra is None else extra.encode("utf-8")
+                f.write(LENGTH.pack(len(extra)) + extra)
+                f.write(LENGTH.pack(len(blob)) + blob)
+
+
+def read_corpus(corpus_dir):
+    corpus = {}
+    for name in DECODERS:
+        path = os.path.join(corpus_dir, f"{name}.bin")
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        blobs = []
+        offset = 0
+        while offset < len(data):
+            fields = []
+            for _ in range(2):
+                (length,) = LENGTH.unpack_from(data, offset)
+                offset += LENGTH.size
+                fields.append(data[offset : offset + length])
+                offset += length
+            extra, blob = fields
+            blobs.append((blob, extra.decode("utf-8") if extra else None))
+        corpus[name] = blobs
+    return corpus
+
+
+def fell_back(decoded):
+    """Whether a decoder kept the blob as raw bytes instead of decoding it."""
+    return isinstance(decoded, dict) and (
+        "raw_bytes" in decoded or "error" in decoded or set(decoded) == {"values"}
+    )
+
+
+def repeat(func, calls, min_time):
+    """Run every call at least once and for ``min_time`` seconds; ns per call."""
+    passes = 0
+    start = time.perf_counter_ns()
+    while True:
+        for args in calls:
+            func(*args)
+        passes += 1
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            return elapsed / (passes * len(calls))
+
+
+def memory_per_call(func, calls):
+    """Retained blocks and peak traced bytes of one call, averaged."""
+    blocks = peak = 0
+    tracemalloc.start()
+    try:
+        for args in calls:
+            gc.collect()
+            before = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            result = func(*args)
+            peak += tracemalloc.get_traced_memory()[1] - baseline
+            blocks += sys.getallocatedblocks() - before
+            del result
+    finally:
+        tracemalloc.stop()
+    return blocks / len(calls), peak / len(calls)
+
+
+def bench_decoder(name, blobs, min_time=0.2):
+    module = load_module(name)
+    encode_takes_extra = len(inspect.signature(module.encode_bytes).parameters) > 1
+    reader = FArchiveReader(b"", PALWORLD_TYPE_HINTS, PALWORLD_CUSTOM_PROPERTIES)
+
+    # the readers hand decoders a tuple of ints, not bytes
+    decode_calls = []
+    encode_calls = []
+    result = {"blobs": len(blobs), "bytes": sum(len(b) for b, _ in blobs)}
+    errors = mismatches = fallbacks = 0
+    for blob, extra in blobs:
+        args = (reader, tuple(blob)) + (() if extra is None else (extra,))
+        try:
+            decoded = module.decode_bytes(*args)
+        except Exception:
+            errors += 1
+            continue
+        decode_calls.append(args)
+        fallbacks += fell_back(decoded)
+        encode_args = (decoded, extra) if encode_takes_extra else (decoded,)
+        encode_calls.append(encode_args)
+        try:
+            if bytes(module.encode_bytes(*encode_args)) != blob:
+                mismatches += 1
+        except Exception:
+            mismatches += 1
+    result.update(errors=errors, mismatches=mismatches, fallbacks=fallbacks)
+    if not decode_calls:
+        return result
+
+    gc.collect()
+    result["decode_ns"] = repeat(module.decode_bytes, decode_calls, min_time)
+    result["decode_blocks"], result["decode_peak_bytes"] = memory_per_call(
+        module.decode_bytes, decode_calls
+    )
+    try:
+        result["encode_ns"] = repeat(module.encode_bytes, encode_calls, min_time)
+        result["encode_blocks"], result["encode_peak_bytes"] = memory_per_call(
+            module.encode_bytes, encode_calls
+        )
+    except Exception as e:
+        result["encode_error"] = str(e)
+    return result
+
+
+def report(results):
+    rows = [
+        (
+            "decoder",
+            "blobs",
+            "avg B",
+            "decode ns",
+            "blocks",
+            "peak KiB",
+            "encode ns",
+            "peak KiB",
+            "round trip",
+        )
+    ]
+    for name, r in results.items():
+        problems = [
+            f"{r[key]} {key}" for key in ("errors", "mismatches", "fallbacks") if r[key]
+        ]
+        if "encode_error" in r:
+            problems.append("encode failed")
+
+        def cell(key, fmt, scale=1):
+            return fmt.format(r[key] / scale) if key in r else "-"
+
+        rows.append(
+            (
+                name,
+                str(r["blobs"]),
+                f"{r['bytes'] / r['blobs']:.0f}",
+                cell("decode_ns", "{:,.0f}"),
+                cell("decode_blocks", "{:.0f}"),
+                cell("decode_peak_bytes", "{:.1f}", 1024),
+                cell("encode_ns", "{:,.0f}"),
+                cell("encode_peak_bytes", "{:.1f}", 1024),
+                ", ".join(problems) or "ok",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells += [cell.rjust(width) for cell, width in zip(row[1:-1], widths[1:-1])]
+        print("  ".join(cells + [row[-1]]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--save", help="Harvest blobs from this Level.sav", type=str)
+    source.add_argument(
+        "--corpus", help="Read blobs written by --write-corpus", type=str
+    )
+    parser.add_argument(
+        "--write-corpus", help="Keep the harvested blobs in this directory", type=str
+    )
+    parser.add_argument(
+        "--limit", help="Most blobs kept per decoder", type=int, default=200
+    )
+    parser.add_argument(
+        "--only", help="Comma separated decoders to benchmark", type=str
+    )
+    parser.add_argument(
+        "--min-time",
+        help="Seconds spent timing each decode and encode",
+        type=float,
+        default=0.2,
+    )
+    parser.add_argument(
+        "--work-dir",
+        help="Where the synthetic world is kept between runs",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "pst-bench"),
+    )
+    parser.add_argument(
+        "--diagnostics-level",
+        help="Level of the decoder diagnostics shown on stderr, "
+        "off by default as every blob a decoder can't parse is reported",
+        choices=("debug", "info", "warning", "error", "off"),
+        default="off",
+    )
+    parser.add_argument("--json", help="Also write the results here", type=str)
+    args = parser.parse_args()
+    diagnostics.configure(args.diagnostics_level)
+
+    if args.corpus:
+        corpus = read_corpus(args.corpus)
+    else:
+        level_file = args.save
+        if level_file is None:
+            from bench.scaling import world_for
+
+            world_dir, _ = world_for(args.work_dir, 1, 1, False)
+            level_file = os.path.join(world_dir, "Level.sav")
+        corpus = harvest(level_file, args.limit)
+        if args.write_corpus:
+            write_corpus(corpus, args.write_corpus)
+    if args.only:
+        wanted = args.only.split(",")
+        unknown = set(wanted) - set(DECODERS)
+        if unknown:
+            parser.error(f"unknown decoders: {', '.join(sorted(unknown))}")
+        corpus = {name: blobs for name, blobs in corpus.items() if name in wanted}
+    if not corpus:
+        sys.exit("No blobs to benchmark")
+
+    results = {
+        name: bench_decoder(name, blobs, args.min_time)
+        for name, blobs in corpus.items()
+    }
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if any(r["errors"] or r["mismatches"] for r in results.values()):
+        sys.exit(1)
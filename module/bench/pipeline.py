@@ -0,0 +1,313 @@
+"""Run the whole sav_cli flow against a local stand-in for the PST API.
+
+One ``sav_cli.run_job`` is run in a fresh process, uploading to the
+stand-in like a sync does, or writing structure.json with ``--to-file``.
+The phases are the ones ``metrics.Metrics`` records for the job; each
+reports wall time, CPU time (including worker processes), peak RSS so far
+and, for reading, writing and uploading, the bytes involved. The stand-in
+API runs in its own process, so it doesn't count towards any phase, and
+counts the bytes it receives.
+
+The result is JSON; comparing it with a stored one flags phases that grew:
+
+    python -m bench.pipeline --scale 10 --json baseline.json
+    python -m bench.pipeline --scale 10 --baseline baseline.json
+"""
+
+import argparse
+import contextlib
+import gzip
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.scaling import in_fresh_process, peak_rss_mb, world_for
+from metrics import PHASES, Metrics
+
+# Compared with a baseline, the measures that count as a regression
+COMPARED = ("seconds", "cpu_seconds", "peak_rss_mb", "bytes")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Accepts what sav_cli uploads like the Go API does."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self):
+        stats = self.server.stats
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        stats["requests"] += 1
+        stats["bytes"] += length
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        reply = {"success": True}
+        if self.path.endswith("/player/batch"):
+            stats["players"] += sum(1 for line in body.splitlines() if line.strip())
+        elif self.path.endswith("/guild"):
+            stats["guilds"] += len(json.loads(body))
+        elif self.path.endswith("/commit"):
+            # everything was uploaded, nothing is missing
+            reply["missing"] = []
+        reply = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    do_POST = do_PUT
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stand_in(conn):
+    """Serve the stand-in API until anything arrives on ``conn``."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.stats = {"requests": 0, "bytes": 0, "players": 0, "guilds": 0}
+    conn.send(server.server_address[1])
+    server.timeout = 0.1
+    while not conn.poll():
+        server.handle_request()
+    conn.send(server.stats)
+    server.server_close()
+
+
+@contextlib.contextmanager
+def stand_in_api():
+    """Yield the API root of a stand-in and a callable returning its stats."""
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=serve_stand_in, args=(child_conn,))
+    process.start()
+    port = conn.recv()
+    stats = {}
+
+    def stop():
+        if not stats:
+            conn.send("stop")
+            stats.update(conn.recv())
+        return stats
+
+    try:
+        yield f"http://127.0.0.1:{port}/api/", stop
+    finally:
+        stop()
+        process.join()
+
+
+def cpu_seconds():
+    """CPU time of this process and its reaped children."""
+    try:
+        import resource
+    except ImportError:
+        return time.process_time()
+    usage = (
+        resource.getrusage(resource.RUSAGE_SELF),
+        resource.getrusage(resource.RUSAGE_CHILDREN),
+    )
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+class BenchMetrics(Metrics):
+    """Metrics that also take the CPU time and peak RSS of each phase."""
+
+    def __init__(self):
+        super().__init__()
+        self.cpu_seconds = {}
+        self.peak_rss_mb = {}
+        # CPU time spent in nested phases, per open phase
+        self._nested_cpu = []
+
+    @contextlib.contextmanager
+    def phase(self, name, checkpoint=None):
+        cpu = cpu_seconds()
+        self._nested_cpu.append(0.0)
+        try:
+            with super().phase(name, checkpoint):
+                yield
+        finally:
+            elapsed = cpu_seconds() - cpu
+            nested = self._nested_cpu.pop()
+            self.cpu_seconds[name] = self.cpu_seconds.get(name, 0.0) + elapsed - nested
+            if self._nested_cpu:
+                self._nested_cpu[-1] += elapsed
+            self.peak_rss_mb[name] = peak_rss_mb()
+
+
+def measure(level_file, api_url, workers, out_dir, diagnostics_level):
+    """Run one sav_cli job on ``level_file``; meant for a fresh process.
+
+    Uploads to ``api_url``, or writes structure.json when it is None.
+    """
+    import sav_cli
+    from palworld_save_tools import diagnostics
+
+    # keep anything a run writes to the working directory out of the caller's
+    os.chdir(out_dir)
+    diagnostics.configure(diagnostics_level)
+    argv = ["--file", level_file, "--workers", str(workers)]
+    if api_url is None:
+        output_file = os.path.join(out_dir, "structure.json")
+        argv += ["--output", output_file]
+    else:
+        argv += ["--request", api_url, "--token", "bench"]
+    metrics = BenchMetrics()
+    sav_cli.run_job(sav_cli.build_parser().parse_args(argv), metrics=metrics)
+
+    phases = {}
+    for name in PHASES:
+        if name in metrics.phases:
+            phases[name] = {
+                "seconds": metrics.phases[name],
+                "cpu_seconds": metrics.cpu_seconds[name],
+                "peak_rss_mb": metrics.peak_rss_mb[name],
+            }
+    phases["read"]["bytes"] = os.path.getsize(level_file)
+    if api_url is None:
+        phases["serialise"]["bytes"] = os.path.getsize(output_file)
+        os.remove(output_file)
+    return phases, metrics.seconds, metrics.counts
+
+
+def run(level_file, workers=1, to_file=False, diagnostics_level="error"):
+    with stand_in_api() as (api_url, api_stats), tempfile.TemporaryDirectory() as tmp:
+        phases, seconds, counts = in_fresh_process(
+            measure,
+            level_file,
+            None if to_file else api_url,
+            workers,
+            tmp,
+            diagnostics_level,
+        )
+        stats = api_stats()
+    if not to_file:
+        phases["upload"].update(bytes=stats["bytes"], requests=stats["requests"])
+    return {
+        "level_file": level_file,
+        "workers": workers,
+        "to_file": to_file,
+        "python": sys.version.split()[0],
+        "phases": phases,
+        "counts": counts,
+        "total_seconds": seconds,
+        "peak_rss_mb": max(
+            (p["peak_rss_mb"] for p in phases.values() if p["peak_rss_mb"]),
+            default=None,
+        ),
+    }
+
+
+def compare(result, baseline, threshold):
+    """Measures that grew by more than ``threshold`` over ``baseline``."""
+    regressions = []
+    for name, new in result["phases"].items():
+        old = baseline["phases"].get(name, {})
+        for measure_name in COMPARED:
+            if not old.get(measure_name) or new.get(measure_name) is None:
+                continue
+            ratio = new[measure_name] / old[measure_name]
+            new.setdefault("vs_baseline", {})[measure_name] = ratio
+            if ratio > 1 + threshold:
+                regressions.append(f"{name} {measure_name} x{ratio:.2f}")
+    return regressions
+
+
+def report(result):
+    rows = [("phase", "wall s", "cpu s", "peak MB", "MB", "vs baseline")]
+    for name, p in result["phases"].items():
+        ratios = p.get("vs_baseline", {})
+        rows.append(
+            (
+                name,
+                f"{p['seconds']:.3f}",
+                f"{p['cpu_seconds']:.3f}",
+                "-" if p["peak_rss_mb"] is None else f"{p['peak_rss_mb']:.0f}",
+                f"{p['bytes'] / 1e6:.2f}" if "bytes" in p else "-",
+                " ".join(f"{k} x{v:.2f}" for k, v in ratios.items() if k != "bytes")
+                or "-",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells += [cell.rjust(width) for cell, width in zip(row[1:-1], widths[1:-1])]
+        print("  ".join(cells + [row[-1]]))
+    summary = f"total {result['total_seconds']:.3f}s"
+    if "upload" in result["phases"]:
+        summary += f", upload {result['phases']['upload']['requests']} requests"
+    print(summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--save", help="Level.sav to run on", type=str)
+    source.add_argument(
+        "--scale",
+        help="Run on a synthetic world of this multiple (default 10)",
+        type=int,
+    )
+    parser.add_argument(
+        "--work-dir",
+        help="Where generated worlds are kept between runs",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "pst-bench"),
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        help="Processes reading Players/*.sav",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--to-file",
+        help="Write structure.json instead of uploading",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--diagnostics-level",
+        help="Level of the decoder diagnostics shown on stderr",
+        choices=("debug", "info", "warning", "error", "off"),
+        default="error",
+    )
+    parser.add_argument("--json", help="Write the result here", type=str)
+    parser.add_argument("--baseline", help="Compare with this result", type=str)
+    parser.add_argument(
+        "--threshold",
+        help="Growth over the baseline that fails the run (0.25 is 25%%)",
+        type=float,
+        default=0.25,
+    )
+    args = parser.parse_args()
+
+    level_file = args.save
+    if level_file is None:
+        world_dir, _ = in_fresh_process(
+            world_for, args.work_dir, args.scale or 10, 1, False
+        )
+        level_file = os.path.join(world_dir, "Level.sav")
+    result = run(
+        os.path.abspath(level_file),
+        args.workers,
+        args.to_file,
+        args.diagnostics_level,
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+    report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if regressions:
+        print("Grew past the baseline: " + ", ".join(regressions), file=sys.stderr)
+        sys.exit(1)
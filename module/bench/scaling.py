@@ -0,0 +1,208 @@
+"""Time the sav_cli pipeline on synthetic worlds of growing size.
+
+Every scale multiplies ``bench.synth.BASE_SPEC`` and is measured in a fresh
+process, so peak memory is that of the scale alone. For each phase the
+wall time, throughput and peak RSS are reported, along with the per-unit
+cost relative to the smallest scale: a value well above 1.0 means the phase
+grows faster than linearly.
+
+    python -m bench.scaling --scales 1,10,100 --json results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench.synth import BASE_SPEC, generate
+
+PHASES = ("convert", "players", "guilds", "output")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, None where unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def world_for(work_dir, scale, seed, use_zlib):
+    """Generate the world of ``scale`` unless an identical one exists."""
+    spec = {key: value * scale for key, value in BASE_SPEC.items()}
+    # pals are per player
+    spec["pals"] = BASE_SPEC["pals"]
+    world_dir = os.path.join(work_dir, f"x{scale}")
+    spec_file = os.path.join(world_dir, "spec.json")
+    wanted = {"spec": spec, "seed": seed, "zlib": use_zlib}
+    try:
+        with open(spec_file, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if {key: info.get(key) for key in wanted} == wanted:
+            return world_dir, info
+    except (OSError, ValueError):
+        pass
+    print(f"Generating {scale}x world...", file=sys.stderr)
+    start = time.perf_counter()
+    sizes = generate(world_dir, **spec, seed=seed, use_zlib=use_zlib)
+    info = {**wanted, **sizes}
+    print(f"  done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    with open(spec_file, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    return world_dir, info
+
+
+def measure(world_dir, workers):
+    """Run every phase on ``world_dir``; meant for a fresh process."""
+    import structurer
+    from output import write_structure
+
+    # keep anything a run writes to the working directory with the world
+    os.chdir(world_dir)
+
+    level_file = os.path.join(world_dir, "Level.sav")
+    phases = {}
+
+    def timed(name, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        phases[name] = {
+            "seconds": time.perf_counter() - start,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        return result
+
+    timed("convert", structurer.convert_sav, level_file)
+    filetime = os.stat(level_file).st_mtime
+    players = timed(
+        "players",
+        structurer.structure_player,
+        os.path.join(world_dir, "Players"),
+        filetime=filetime,
+        with_pals=False,
+        workers=workers,
+    )
+    guilds = timed("guilds", structurer.structure_guild, filetime)
+    output_file = os.path.join(world_dir, "structure.json")
+    timed(
+        "output",
+        write_structure,
+        output_file,
+        players,
+        guilds,
+        structurer.pal_table,
+    )
+    return {
+        "phases": phases,
+        "players": len(players),
+        "guilds": len(guilds),
+        "output_bytes": os.path.getsize(output_file),
+    }
+
+
+def in_fresh_process(func, *args):
+    # spawned rather than forked, a child starts out with the peak RSS of
+    # the process it was forked from
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args).result()
+
+
+def run(scales, work_dir, workers=1, seed=1, use_zlib=False):
+    results = []
+    for scale in scales:
+        world_dir, info = in_fresh_process(world_for, work_dir, scale, seed, use_zlib)
+        result = in_fresh_process(measure, world_dir, workers)
+        results.append({"scale": scale, **info, **result})
+
+    base = results[0]
+    for result in results:
+        ratio = result["scale"] / base["scale"]
+        result["unit_cost"] = {
+            name: (result["phases"][name]["seconds"] / ratio)
+            / max(base["phases"][name]["seconds"], 1e-9)
+            for name in PHASES
+        }
+    return results
+
+
+def report(results):
+    rows = [
+        (
+            "scale",
+            "gvas MB",
+            "convert MB/s",
+            "players/s",
+            "guilds/s",
+            "output MB/s",
+            "total s",
+            "peak MB",
+            "unit cost",
+        )
+    ]
+    for r in results:
+        phases = r["phases"]
+        total = sum(phases[name]["seconds"] for name in PHASES)
+        base_total = sum(results[0]["phases"][name]["seconds"] for name in PHASES)
+        peak = phases["output"]["peak_rss_mb"]
+        rows.append(
+            (
+                f"{r['scale']}x",
+                f"{r['gvas_bytes'] / 1e6:.1f}",
+                f"{r['gvas_bytes'] / 1e6 / phases['convert']['seconds']:.1f}",
+                f"{r['players'] / phases['players']['seconds']:.0f}",
+                f"{r['guilds'] / phases['guilds']['seconds']:.0f}",
+                f"{r['output_bytes'] / 1e6 / phases['output']['seconds']:.1f}",
+                f"{total:.2f}",
+                "-" if peak is None else f"{peak:.0f}",
+                f"{total / (r['scale'] / results[0]['scale']) / base_total:.2f}",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scales",
+        help="Comma separated multiples of the base world",
+        type=str,
+        default="1,10,100",
+    )
+    parser.add_argument(
+        "--work-dir",
+        help="Where generated worlds are kept between runs",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "pst-bench"),
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        help="Processes reading Players/*.sav",
+        type=int,
+        default=1,
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--zlib",
+        help="Benchmark PlZ (zlib) instead of Oodle saves",
+        action="store_true",
+    )
+    parser.add_argument("--json", help="Also write the results here", type=str)
+    args = parser.parse_args()
+
+    scales = sorted(int(scale) for scale in args.scales.split(","))
+    results = run(scales, args.work_dir, args.workers, args.seed, args.zlib)
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
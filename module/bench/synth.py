@@ -0,0 +1,546 @@
+"""Generate synthetic Palworld worlds for benchmarks.
+
+The saves are written through ``GvasFile.write`` and ``compress_gvas_to_sav``
+and decode with the same type hints and custom properties as sav_cli uses.
+RawData payloads are written by the ``encode_bytes`` of the decoder sav_cli
+reads them with, so guild and item slot payloads come from ``group.py`` and
+``item_container_slots.py``, which are newer than the vendored decoders.
+They only contain what sav_cli reads plus bulk (map objects, neutral
+groups) that it has to get through. Output is deterministic for a given
+seed.
+
+    python -m bench.synth OUT_DIR --players 100 --pals 20 --map-objects 5000
+"""
+
+import argparse
+import base64
+import os
+import random
+import time
+
+from palworld_save_tools.archive import UUID, FArchiveWriter
+from palworld_save_tools.gvas import GvasFile, GvasHeader
+from palworld_save_tools.palsav import compress_gvas_to_sav
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES
+from palworld_save_tools.rawdata import build_process, connector, map_model
+
+import group
+import item_container_slots
+
+# Counts of a 1x world, scaled linearly by bench.scaling
+BASE_SPEC = {
+    "players": 5,
+    "pals": 10,
+    "guilds": 2,
+    "base_camps": 2,
+    "item_containers": 20,
+    "map_objects": 200,
+    "neutral_groups": 20,
+}
+
+ZERO = UUID(b"\x00" * 16)
+GAME_TICKS = 638000000000000000
+TRANSFORM = {
+    "rotation": {"x": 0.0, "y": 0.0, "z": 0.0, "w": 1.0},
+    "translation": {"x": 1.0, "y": 2.0, "z": 3.0},
+    "scale3d": {"x": 1.0, "y": 1.0, "z": 1.0},
+}
+INVENTORY_CONTAINERS = (
+    "CommonContainerId",
+    "DropSlotContainerId",
+    "EssentialContainerId",
+    "FoodEquipContainerId",
+    "PlayerEquipArmorContainerId",
+    "WeaponLoadOutContainerId",
+)
+CHARACTER_IDS = ("SheepBall", "BOSS_Kitsunebi", "PinkCat", "Gym_Boar")
+PASSIVE_SKILLS = ("Deffence_up1", "PAL_ALLAttack_up2", "CraftSpeed_up1", "Legend")
+STATIC_ITEMS = ("Wood", "Stone", "PalSphere", "Berries", "None")
+# build objects without concrete model payload
+MAP_OBJECT_IDS = ("wooden_foundation", "wooden_wall", "stonehouse1", "woodhouse1")
+
+
+def prop(type_name, value):
+    return {"type": type_name, "id": None, "value": value}
+
+
+def struct_prop(struct_type, value):
+    return {
+        "type": "StructProperty",
+        "struct_type": struct_type,
+        "struct_id": ZERO,
+        "id": None,
+        "value": value,
+    }
+
+
+def guid_prop(guid):
+    return struct_prop("Guid", guid)
+
+
+def byte_prop(value):
+    return prop("ByteProperty", {"type": "None", "value": value})
+
+
+def fixed_prop(value):
+    return struct_prop("FixedPoint64", {"Value": prop("Int64Property", value)})
+
+
+def bytes_prop(data):
+    return {
+        "type": "ArrayProperty",
+        "array_type": "ByteProperty",
+        "id": None,
+        "value": {"values": bytes(data)},
+    }
+
+
+def struct_array_prop(name, type_name, values):
+    return {
+        "type": "ArrayProperty",
+        "array_type": "StructProperty",
+        "id": None,
+        "value": {
+            "prop_name": name,
+            "prop_type": "StructProperty",
+            "type_name": type_name,
+            "id": ZERO,
+            "values": values,
+        },
+    }
+
+
+def map_prop(key_type, key_struct_type, entries):
+    return {
+        "type": "MapProperty",
+        "key_type": key_type,
+        "value_type": "StructProperty",
+        "key_struct_type": key_struct_type,
+        "value_struct_type": "StructProperty",
+        "id": None,
+        "value": entries,
+    }
+
+
+class WorldBuilder:
+    """Builds the property trees of one world from a seeded RNG."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def guid(self):
+        return UUID(self.rng.randbytes(16))
+
+    def character(self, player_uid, params):
+        raw = {
+            "type": "ArrayProperty",
+            "array_type": "ByteProperty",
+            "id": None,
+            "custom_type": ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+            "value": {
+                "object": {
+                    "SaveParameter": struct_prop(
+                        "PalIndividualCharacterSaveParameter", params
+                    )
+                },
+                "unknown_bytes": (0, 0, 0, 0),
+                "group_id": ZERO,
+            },
+        }
+        return {
+            "key": {
+                "PlayerUId": guid_prop(player_uid),
+                "InstanceId": guid_prop(self.guid()),
+                "DebugName": prop("StrProperty", ""),
+            },
+            "value": {"RawData": raw},
+        }
+
+    def player_character(self, uid, index):
+        rng = self.rng
+        status_points = [
+            {
+                "StatusName": prop("NameProperty", name),
+                "StatusPoint": prop("IntProperty", rng.randint(0, 10)),
+            }
+            for name in ("max HP", "max SP", "Attack")
+        ]
+        return self.character(
+            uid,
+            {
+                "IsPlayer": prop("BoolProperty", True),
+                "NickName": prop("StrProperty", f"Player{index}"),
+                "Level": byte_prop(rng.randint(1, 50)),
+                "Exp": prop("Int64Property", rng.randint(0, 10**6)),
+                "HP": fixed_prop(500000),
+                "MaxHP": fixed_prop(500000),
+                "FullStomach": prop("FloatProperty", 88.5),
+                "GotStatusPointList": struct_array_prop(
+                    "GotStatusPointList", "PalGotStatusPoint", status_points
+                ),
+            },
+        )
+
+    def pal_character(self, owner_uid):
+        rng = self.rng
+        return self.character(
+            ZERO,
+            {
+                "CharacterID": prop("NameProperty", rng.choice(CHARACTER_IDS)),
+                "Gender": prop(
+                    "EnumProperty",
+                    {"type": "EPalGenderType", "value": "EPalGenderType::Female"},
+                ),
+                "Level": byte_prop(rng.randint(1, 50)),
+                "Exp": prop("Int64Property", rng.randint(0, 10**6)),
+                "HP": fixed_prop(10000),
+                "Talent_HP": byte_prop(rng.randint(0, 100)),
+                "Talent_Melee": prop("IntProperty", rng.randint(0, 100)),
+                "Talent_Shot": byte_prop(rng.randint(0, 100)),
+                "Talent_Defense": byte_prop(rng.randint(0, 100)),
+                "CraftSpeed": prop("IntProperty", 70),
+                "PassiveSkillList": {
+                    "type": "ArrayProperty",
+                    "array_type": "NameProperty",
+                    "id": None,
+                    "value": {"values": rng.sample(PASSIVE_SKILLS, 2)},
+                },
+                "OwnerPlayerUId": guid_prop(owner_uid),
+            },
+        )
+
+    def item_container(self, container_id, group_id, slots):
+        rng = self.rng
+        values = []
+        for index in range(slots):
+            slot = {
+                "permission": {
+                    "type_a": index,
+                    "type_b": rng.randint(1, 99),
+                    "item_static_id": rng.choice(STATIC_ITEMS),
+                },
+                "corruption_progress_value": 0.0,
+                # dynamic item id, local id, trailing padding
+                "unknown_padding": base64.b64encode(
+                    b"\x00" * 12 + rng.randbytes(16) + b"\x00" * 4
+                ).decode(),
+            }
+            raw = item_container_slots.encode_bytes(slot)
+            values.append({"RawData": bytes_prop(raw)})
+        return {
+            "key": {"ID": guid_prop(container_id)},
+            "value": {
+                "BelongInfo": struct_prop(
+                    "PalItemContainerBelongInfo", {"GroupID": guid_prop(group_id)}
+                ),
+                "Slots": struct_array_prop("Slots", "PalItemSlotSaveData", values),
+            },
+        }
+
+    def group(self, group_type, group_id, name, handles=0, guild=None):
+        data = {
+            "group_type": group_type,
+            "group_id": group_id,
+            "group_name": name,
+            "individual_character_handle_ids": [
+                {"guid": self.guid(), "instance_id": self.guid()}
+                for _ in range(handles)
+            ],
+        }
+        if guild is not None:
+            base_ids, level, admin, members = guild
+            data |= {
+                "org_type": 0,
+                "base_ids": base_ids,
+                "base_camp_level": level,
+                "map_object_instance_ids_base_camp_points": [],
+                "guild_name": name,
+                "u1": 0,
+                "u2": 0,
+                "admin_player_uid": admin,
+                "players": [
+                    {
+                        "player_uid": uid,
+                        "player_info": {
+                            "last_online_real_time": GAME_TICKS,
+                            "player_name": nickname,
+                        },
+                    }
+                    for uid, nickname in members
+                ],
+            }
+        return {
+            "key": group_id,
+            "value": {
+                "GroupType": prop(
+                    "EnumProperty", {"type": "EPalGroupType", "value": group_type}
+                ),
+                "RawData": bytes_prop(group.encode_bytes(data)),
+            },
+        }
+
+    def base_camp(self, camp_id, group_id):
+        return {
+            "key": camp_id,
+            "value": {
+                "RawData": {
+                    "type": "ArrayProperty",
+                    "array_type": "ByteProperty",
+                    "id": None,
+                    "custom_type": ".worldSaveData.BaseCampSaveData.Value.RawData",
+                    "value": {
+                        "id": camp_id,
+                        "name": "",
+                        "state": 1,
+                        "transform": TRANSFORM,
+                        "area_range": 3500.0,
+                        "group_id_belong_to": group_id,
+                        "fast_travel_local_transform": TRANSFORM,
+                        "owner_map_object_instance_id": self.guid(),
+                    },
+                }
+            },
+        }
+
+    def map_object(self, camp_id, group_id, builder_uid):
+        instance_id = self.guid()
+        concrete_id = self.guid()
+        model = map_model.encode_bytes(
+            {
+                "instance_id": instance_id,
+                "concrete_model_instance_id": concrete_id,
+                "base_camp_id_belong_to": camp_id,
+                "group_id_belong_to": group_id,
+                "hp": {"current": 1000, "max": 1000},
+                "initital_transform_cache": TRANSFORM,
+                "repair_work_id": ZERO,
+                "owner_spawner_level_object_instance_id": ZERO,
+                "owner_instance_id": ZERO,
+                "build_player_uid": builder_uid,
+                "interact_restrict_type": 1,
+                "stage_instance_id_belong_to": {"id": ZERO, "valid": False},
+                "created_at": GAME_TICKS,
+            }
+        )
+        concrete = FArchiveWriter()
+        concrete.guid(concrete_id)
+        concrete.guid(instance_id)
+        return {
+            "MapObjectInstanceId": guid_prop(instance_id),
+            "MapObjectConcreteModelInstanceId": guid_prop(concrete_id),
+            "MapObjectId": prop("NameProperty", self.rng.choice(MAP_OBJECT_IDS)),
+            "Model": struct_prop(
+                "PalMapObjectModelSaveData",
+                {
+                    "RawData": bytes_prop(model),
+                    "Connector": struct_prop(
+                        "PalMapObjectConnectorSaveData",
+                        {
+                            "RawData": bytes_prop(
+                                connector.encode_bytes(
+                                    {
+                                        "supported_level": 1,
+                                        "connect": {"index": 0, "any_place": []},
+                                    }
+                                )
+                            )
+                        },
+                    ),
+                    "BuildProcess": struct_prop(
+                        "PalMapObjectBuildProcessSaveData",
+                        {
+                            "RawData": bytes_prop(
+                                build_process.encode_bytes({"state": 1, "id": ZERO})
+                            )
+                        },
+                    ),
+                },
+            ),
+            "ConcreteModel": struct_prop(
+                "PalMapObjectConcreteModelSaveData",
+                {
+                    "RawData": bytes_prop(concrete.bytes()),
+                    "ModuleMap": map_prop("EnumProperty", None, []),
+                },
+            ),
+        }
+
+
+def write_gvas(properties, save_game_class_name):
+    header = GvasHeader()
+    header.magic = 0x53415647
+    header.save_game_version = 3
+    header.package_file_version_ue4 = 522
+    header.package_file_version_ue5 = 1008
+    header.engine_version_major = 5
+    header.engine_version_minor = 1
+    header.engine_version_patch = 1
+    header.engine_version_changelist = 0
+    header.engine_version_branch = "++UE5+Release-5.1"
+    header.custom_version_format = 3
+    header.custom_versions = []
+    header.save_game_class_name = save_game_class_name
+    gvas_file = GvasFile()
+    gvas_file.header = header
+    gvas_file.properties = properties
+    gvas_file.trailer = b"\x00\x00\x00\x00"
+    return gvas_file.write(PALWORLD_CUSTOM_PROPERTIES)
+
+
+def generate(
+    out_dir,
+    players=BASE_SPEC["players"],
+    pals=BASE_SPEC["pals"],
+    guilds=BASE_SPEC["guilds"],
+    base_camps=BASE_SPEC["base_camps"],
+    item_containers=BASE_SPEC["item_containers"],
+    map_objects=BASE_SPEC["map_objects"],
+    neutral_groups=BASE_SPEC["neutral_groups"],
+    seed=1,
+    use_zlib=False,
+):
+    """Write ``out_dir/Level.sav`` and ``out_dir/Players/*.sav``.
+
+    ``pals`` is per player. Guilds, base camps, chests and map objects are
+    spread round-robin over the players and guilds. Saves are Oodle (PlM)
+    compressed like the game's, or PlZ with ``use_zlib``. Returns the
+    uncompressed and compressed Level.sav sizes.
+    """
+    builder = WorldBuilder(seed)
+    rng = builder.rng
+    save_type = 0x32 if use_zlib else 0x31
+    players_dir = os.path.join(out_dir, "Players")
+    os.makedirs(players_dir, exist_ok=True)
+
+    characters = []
+    containers = []
+    player_uids = [builder.guid() for _ in range(players)]
+    for index, uid in enumerate(player_uids):
+        characters.append(builder.player_character(uid, index))
+        inventory = {}
+        for name in INVENTORY_CONTAINERS:
+            container_id = builder.guid()
+            inventory[name] = struct_prop(
+                "PalContainerId", {"ID": guid_prop(container_id)}
+            )
+            containers.append(builder.item_container(container_id, ZERO, 5))
+        player_save = {
+            "SaveData": struct_prop(
+                "PalWorldPlayerSaveData",
+                {
+                    "PlayerUId": guid_prop(uid),
+                    "InventoryInfo": struct_prop(
+                        "PalPlayerDataInventoryInfo", inventory
+                    ),
+                    "RecordData": struct_prop(
+                        "PalLoggedinPlayerSaveDataRecordData",
+                        {"Junk": bytes_prop(rng.randbytes(2000))},
+                    ),
+                },
+            )
+        }
+        gvas = write_gvas(player_save, "/Script/Pal.PalWorldPlayerSaveGame")
+        name = str(uid).upper().replace("-", "") + ".sav"
+        with open(os.path.join(players_dir, name), "wb") as f:
+            f.write(compress_gvas_to_sav(gvas, save_type, zlib=use_zlib))
+    for index in range(players * pals):
+        characters.append(builder.pal_character(player_uids[index % players]))
+
+    guild_ids = [builder.guid() for _ in range(guilds)]
+    camp_ids = [builder.guid() for _ in range(base_camps if guilds else 0)]
+    groups = []
+    for g, guild_id in enumerate(guild_ids):
+        members = [
+            (uid, f"Player{i}") for i, uid in enumerate(player_uids) if i % guilds == g
+        ]
+        guild = (
+            camp_ids[g::guilds],
+            rng.randint(1, 20),
+            members[0][0] if members else ZERO,
+            members,
+        )
+        groups.append(
+            builder.group("EPalGroupType::Guild", guild_id, f"Guild{g}", guild=guild)
+        )
+    for _ in range(neutral_groups):
+        groups.append(
+            builder.group("EPalGroupType::Neutral", builder.guid(), "", handles=16)
+        )
+    camps = [
+        builder.base_camp(camp_id, guild_ids[i % guilds])
+        for i, camp_id in enumerate(camp_ids)
+    ]
+    for i in range(item_containers):
+        group_id = guild_ids[i % guilds] if guilds else ZERO
+        containers.append(builder.item_container(builder.guid(), group_id, 20))
+    objects = []
+    for i in range(map_objects):
+        camp_id = camp_ids[i % len(camp_ids)] if camp_ids else ZERO
+        group_id = guild_ids[i % guilds] if guilds else ZERO
+        builder_uid = player_uids[i % players] if players else ZERO
+        objects.append(builder.map_object(camp_id, group_id, builder_uid))
+
+    world = {
+        "CharacterSaveParameterMap": map_prop(
+            "StructProperty", "StructProperty", characters
+        ),
+        "MapObjectSaveData": struct_array_prop(
+            "MapObjectSaveData", "PalMapObjectSaveData", objects
+        ),
+        "GroupSaveDataMap": map_prop("StructProperty", "Guid", groups),
+        "BaseCampSaveData": map_prop("StructProperty", "Guid", camps),
+        "ItemContainerSaveData": map_prop(
+            "StructProperty", "StructProperty", containers
+        ),
+        "GameTimeSaveData": struct_prop(
+            "PalGameTimeSaveData",
+            {
+                "GameDateTimeTicks": prop("Int64Property", 10**15),
+                "RealDateTimeTicks": prop("Int64Property", GAME_TICKS),
+            },
+        ),
+    }
+    gvas = write_gvas(
+        {
+            "Version": prop("IntProperty", 100),
+            "worldSaveData": struct_prop("PalWorldSaveData", world),
+        },
+        "/Script/Pal.PalWorldSaveGame",
+    )
+    sav = compress_gvas_to_sav(gvas, save_type, zlib=use_zlib)
+    with open(os.path.join(out_dir, "Level.sav"), "wb") as f:
+        f.write(sav)
+    return {"gvas_bytes": len(gvas), "sav_bytes": len(sav)}
+
+
+def add_spec_arguments(parser):
+    for key, default in BASE_SPEC.items():
+        parser.add_argument(
+            "--" + key.replace("_", "-"),
+            type=int,
+            default=default,
+            help=f"defaults to {default}" + (" per player" if key == "pals" else ""),
+        )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--zlib", help="Write PlZ (zlib) instead of Oodle saves", action="store_true"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic world")
+    parser.add_argument("out_dir", help="Directory for Level.sav and Players/")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    sizes = generate(
+        args.out_dir,
+        **{key: getattr(args, key) for key in BASE_SPEC},
+        seed=args.seed,
+        use_zlib=args.zlib,
+    )
+    print(
+        f"Generated {args.out_dir} in {time.perf_counter() - start:.2f}s: "
+        f"Level.sav {sizes['sav_bytes']:,} bytes "
+        f"({sizes['gvas_bytes']:,} uncompressed)"
+    )
@@ -1,7 +1,7 @@
 $pythonScript = "sav_cli.py"
 $distName = "sav_cli_windows_x86_64.exe"
 $pyPipCommand = "pip install -r requirements.txt"
-$pyInstallerCommand = "pyinstaller --onefile " + $pythonScript + " -n " + $distName
+$pyInstallerCommand = "pyinstaller --onefile " + $pythonScript + " -n " + $distName + " --collect-submodules palworld_save_tools.rawdata"
 Invoke-Expression $pyPipCommand
 Invoke-Expression $pyInstallerCommand
 Write-Host "sav_cli.exe has been built successfully."
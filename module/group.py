@@ -1,10 +1,17 @@
-from typing import Sequence
+from typing import Optional, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
+
+GUILD_GROUP_TYPES = {"EPalGroupType::Guild"}
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: str,
+    group_types: Optional[set[str]] = None,
 ) -> dict[str, Any]:
     if type_name != "MapProperty":
         raise Exception(f"Expected MapProperty, got {type_name}")
@@ -13,16 +20,72 @@ def decode(
     group_map = value["value"]
     for group in group_map:
         group_type = group["value"]["GroupType"]["value"]["value"]
+        if group_types is not None and group_type not in group_types:
+            # left as raw bytes, see decode_group
+            continue
         group_bytes = group["value"]["RawData"]["value"]["values"]
         try:
             group["value"]["RawData"]["value"] = decode_bytes(
                 reader, group_bytes, group_type
             )
         except Exception as e:
-            print(f"Skipping reading 1 group: {e}")
+            anomaly(
+                "group_skipped",
+                path,
+                group_type,
+                "Skipping reading 1 group: %s",
+                e,
+            )
     return value
 
 
+def decode_guilds(
+    reader: FArchiveReader, type_name: str, size: int, path: str
+) -> dict[str, Any]:
+    return decode(reader, type_name, size, path, group_types=GUILD_GROUP_TYPES)
+
+
+def decode_group(group: dict[str, Any]) -> dict[str, Any]:
+    """Decode the RawData of a group skipped by a filtered decode, in place"""
+    raw_data = group["value"]["RawData"]["value"]
+    if "values" in raw_data:
+        group["value"]["RawData"]["value"] = decode_bytes(
+            FArchiveReader(b""),
+            raw_data["values"],
+            group["value"]["GroupType"]["value"]["value"],
+        )
+    return group
+
+
+def decode_raw_data(
+    reader: FArchiveReader, type_name: str, size: int, path: str
+) -> dict[str, Any]:
+    # Keep group RawData as one bytes slice instead of a tuple of ints
+    if type_name != "ArrayProperty":
+        raise Exception(f"Expected ArrayProperty, got {type_name}")
+    array_type = reader.fstring()
+    if array_type != "ByteProperty":
+        raise Exception(f"Expected ByteProperty array, got {array_type}")
+    _id = reader.optional_guid()
+    count = reader.u32()
+    if count != size - 4:
+        raise Exception("Labelled ByteProperty not implemented")
+    return {
+        "array_type": array_type,
+        "id": _id,
+        "value": {"values": reader.read(count)},
+    }
+
+
+def encode_raw_data(
+    writer: FArchiveWriter, property_type: str, properties: dict[str, Any]
+) -> int:
+    if property_type != "ArrayProperty":
+        raise Exception(f"Expected ArrayProperty, got {property_type}")
+    del properties["custom_type"]
+    return writer.property_inner(property_type, properties)
+
+
 def decode_bytes(
     parent_reader: FArchiveReader, group_bytes: Sequence[int], group_type: str
 ) -> dict[str, Any]:
@@ -122,6 +185,8 @@ def encode_bytes(p: dict[str, Any]) -> bytes:
         writer.i64(p["player_info"]["last_online_real_time"])
         writer.fstring(p["player_info"]["player_name"])
     if p["group_type"] == "EPalGroupType::Guild":
+        writer.i64(p["u1"])
+        writer.i64(p["u2"])
         writer.guid(p["admin_player_uid"])
         writer.i32(len(p["players"]))
         for i in range(len(p["players"])):
@@ -29,12 +29,14 @@ def decode_bytes(
         "corruption_progress_value": reader.float(),
     }
     unknown_bytes = reader.read_to_end()
+    # kept whole so encode_bytes gives the slot back byte for byte
+    data["unknown_padding"] = base64.b64encode(unknown_bytes).decode()
     try:
         uuid_bytes = unknown_bytes[12:28]
         local_id = UUID(uuid_bytes)
         data["local_id"] = local_id
     except ValueError:
-        data["unknown_padding"] = base64.b64encode(unknown_bytes).decode()
+        pass
 
     if not reader.eof():
         raise Exception("Warning: EOF not reached")
@@ -0,0 +1,207 @@
+import _thread
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from logger import log
+
+MB = 1 << 20
+
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+
+def current_rss():
+    """Resident set size of this process in bytes, None where unknown."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, None where unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mb(size):
+    return "?" if size is None else f"{size / MB:.1f}MB"
+
+
+class MemoryMonitor:
+    """RSS and tracemalloc snapshots taken after each phase of a job.
+
+    With ``trace`` the ``top`` largest allocation sites still alive are kept
+    per checkpoint. With a ``limit`` in bytes, a watchdog thread checks the
+    RSS every ``interval`` seconds and interrupts the main thread once it is
+    exceeded, so the job stops with a diagnostic instead of being killed by
+    the kernel. Checkpoints check the limit as well.
+
+    The watchdog only interrupts a job that is still running. An interrupt
+    the main thread has not taken by the time it calls ``stop`` is taken
+    there and turned into MemoryLimitExceeded, so it can't escape the job.
+    """
+
+    def __init__(self, trace=False, limit=0, top=10, interval=0.25):
+        self.trace = trace
+        self.limit = limit
+        self.top = top
+        self.interval = interval
+        self.checkpoints = []
+        # phases running, innermost last
+        self.running = []
+        # (phase, rss) once the limit was hit
+        self.exceeded = None
+        # the watchdog interrupted the main thread and it wasn't taken yet
+        self._interrupt_pending = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.limit:
+            if current_rss() is None:
+                log("RSS is unknown on this system, --memory-limit is off", "WARNING")
+            else:
+                self._thread = threading.Thread(target=self._watch, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the watchdog and tracing.
+
+        Raises MemoryLimitExceeded if the watchdog interrupted the main
+        thread and the job had not taken the KeyboardInterrupt yet.
+        """
+        pending = False
+        try:
+            with self._lock:
+                self._stopped.set()
+                pending = self._interrupt_pending
+            if pending:
+                # the interrupt lands within a few bytecodes, unless the job
+                # swallowed it already
+                deadline = time.monotonic() + 1.0
+                while time.monotonic() < deadline:
+                    time.sleep(0.001)
+        except KeyboardInterrupt:
+            if not self.take_interrupt():
+                raise
+            pending = True
+        finally:
+            self._stopped.set()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        if pending:
+            self._interrupt_pending = False
+            raise MemoryLimitExceeded(self.diagnostic())
+
+    def take_interrupt(self):
+        """Whether the KeyboardInterrupt the main thread caught came from the
+        watchdog rather than the user. True only once per interrupt."""
+        with self._lock:
+            taken = self._interrupt_pending
+            self._interrupt_pending = False
+        return taken
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            rss = current_rss()
+            if rss is None or rss <= self.limit:
+                continue
+            with self._lock:
+                if self._stopped.is_set():
+                    return
+                self.exceeded = (self.current_phase(), rss)
+                # log now, the main thread may be stuck in C code for a while
+                log(self.diagnostic(), "ERROR")
+                self._interrupt_pending = True
+                _thread.interrupt_main()
+            return
+
+    def current_phase(self):
+        running = self.running
+        return running[-1] if running else None
+
+    def enter(self, name):
+        self.running.append(name)
+
+    def checkpoint(self, name):
+        """Record memory use after phase ``name``."""
+        rss = current_rss()
+        entry = {"name": name, "rss": rss, "peak_rss": peak_rss()}
+        if self.trace and tracemalloc.is_tracing():
+            entry["traced"], entry["traced_peak"] = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            stats = tracemalloc.take_snapshot().statistics("lineno")
+            entry["top"] = [
+                {
+                    "file": stat.traceback[0].filename,
+                    "line": stat.traceback[0].lineno,
+                    "size": stat.size,
+                    "count": stat.count,
+                }
+                for stat in stats[: self.top]
+            ]
+        self.checkpoints.append(entry)
+        if self.running and self.running[-1] == name:
+            self.running.pop()
+        if self.limit and rss is not None and rss > self.limit:
+            self.exceeded = (name, rss)
+            raise MemoryLimitExceeded(self.diagnostic())
+
+    def diagnostic(self):
+        phase, rss = self.exceeded
+        text = f"Memory limit of {_mb(self.limit)} exceeded with {_mb(rss)} resident"
+        if phase:
+            text += f" during {phase}"
+        if self.checkpoints:
+            last = self.checkpoints[-1]
+            text += f", {_mb(last['rss'])} after {last['name']}"
+        return text
+
+    def dump(self):
+        return list(self.checkpoints)
+
+    def report(self):
+        """Log the memory use recorded at each checkpoint."""
+        for entry in self.checkpoints:
+            text = (
+                f"Memory after {entry['name']}: rss {_mb(entry['rss'])}, "
+                f"peak {_mb(entry['peak_rss'])}"
+            )
+            if "traced" in entry:
+                text += (
+                    f", traced {_mb(entry['traced'])} "
+                    f"(phase peak {_mb(entry['traced_peak'])})"
+                )
+            log(text)
+            for stat in entry.get("top", ()):
+                log(
+                    f"    {_mb(stat['size'])} in {stat['count']} blocks "
+                    f"at {stat['file']}:{stat['line']}"
+                )
@@ -0,0 +1,194 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Phases of a sync in the order they run
+PHASES = (
+    "read",
+    "decompress",
+    "parse",
+    "player_files",
+    "structure",
+    "serialise",
+    "fingerprint",
+    "upload",
+)
+
+
+class Metrics:
+    """Per-phase wall times, record counts and cache statistics of one job.
+
+    Phases may nest; a phase only keeps the time not spent in the phases
+    nested in it, so the phases add up to the job's run time. With a
+    MemoryMonitor as ``memory``, a memory checkpoint is taken as each phase
+    ends.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+        # name -> [hits, misses]
+        self.caches = {}
+        self.status = "ok"
+        self.started = time.time()
+        self.seconds = 0.0
+        self._start = time.perf_counter()
+        # time spent in nested phases, per open phase
+        self._nested = []
+        self.memory = None
+        # counted decode anomalies, see diagnostics.anomalies
+        self.anomalies = []
+
+    @contextmanager
+    def phase(self, name, checkpoint=None):
+        """Time a phase ``name``; ``checkpoint`` names its memory checkpoint
+        where one phase covers several steps."""
+        checkpoint = checkpoint or name
+        if self.memory is not None:
+            self.memory.enter(checkpoint)
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - nested
+            if self._nested:
+                self._nested[-1] += elapsed
+        if self.memory is not None:
+            self.memory.checkpoint(checkpoint)
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def cache(self, name, hits, misses):
+        self.caches[name] = [hits, misses]
+
+    def finish(self, status="ok"):
+        self.status = status
+        self.seconds = time.perf_counter() - self._start
+
+    def dump(self):
+        caches = {}
+        for name, (hits, misses) in self.caches.items():
+            lookups = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+        data = {
+            "status": self.status,
+            "started": self.started,
+            "seconds": self.seconds,
+            "phases": dict(self.phases),
+            "counts": dict(self.counts),
+            "caches": caches,
+            "anomalies": list(self.anomalies),
+        }
+        if self.memory is not None:
+            data["memory"] = self.memory.dump()
+        return data
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        data = self.dump()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP sav_cli_{name} {help_text}")
+            lines.append(f"# TYPE sav_cli_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"sav_cli_{name}{labels} {value}")
+
+        metric(
+            "last_run_timestamp_seconds",
+            "gauge",
+            "Unix time the last sav_cli job started.",
+            [("", data["started"])],
+        )
+        metric(
+            "last_run_seconds",
+            "gauge",
+            "Wall time of the last sav_cli job.",
+            [("", data["seconds"])],
+        )
+        metric(
+            "last_run_status",
+            "gauge",
+            "Outcome of the last sav_cli job, 1 for the status it ended with.",
+            [
+                (f'{{status="{status}"}}', int(data["status"] == status))
+                for status in ("ok", "unchanged", "error")
+            ],
+        )
+        metric(
+            "phase_seconds",
+            "gauge",
+            "Wall time of each phase of the last sav_cli job.",
+            [(f'{{phase="{name}"}}', data["phases"].get(name, 0.0)) for name in PHASES],
+        )
+        metric(
+            "records",
+            "gauge",
+            "Records handled by the last sav_cli job.",
+            [(f'{{kind="{name}"}}', value) for name, value in data["counts"].items()],
+        )
+        for field, help_text in (
+            ("hits", "Cache hits in the last sav_cli job."),
+            ("misses", "Cache misses in the last sav_cli job."),
+            ("hit_rate", "Cache hit rate in the last sav_cli job."),
+        ):
+            metric(
+                f"cache_{field}",
+                "gauge",
+                help_text,
+                [
+                    (f'{{cache="{name}"}}', cache[field])
+                    for name, cache in data["caches"].items()
+                ],
+            )
+        per_kind = {}
+        for entry in data["anomalies"]:
+            per_kind[entry["kind"]] = per_kind.get(entry["kind"], 0) + entry["count"]
+        metric(
+            "decode_anomalies",
+            "gauge",
+            "Decode anomalies counted in the last sav_cli job.",
+            [(f'{{kind="{kind}"}}', count) for kind, count in per_kind.items()],
+        )
+        if "memory" in data:
+            for field, help_text in (
+                ("rss", "Resident set size after each phase of the last job."),
+                (
+                    "peak_rss",
+                    "Peak resident set size after each phase of the last job.",
+                ),
+            ):
+                metric(
+                    f"{field}_bytes",
+                    "gauge",
+                    help_text,
+                    [
+                        (f'{{checkpoint="{entry["name"]}"}}', entry[field])
+                        for entry in data["memory"]
+                        if entry[field] is not None
+                    ],
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.dump(), indent=2) + "\n")
+
+    def write_prometheus(self, path):
+        # collectors may read the file at any time, never show a partial one
+        _write_atomic(path, self.prometheus())
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
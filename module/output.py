@@ -0,0 +1,39 @@
+import gzip
+import json
+
+COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def open_output(path, compress=False):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    return open(path, "w", encoding="utf-8")
+
+
+def write_structure(path, players, guilds, pal_table, pretty=False, compress=False):
+    """Write ``{"players": [...], "guilds": [...]}`` to ``path``.
+
+    Records are encoded and written one at a time, so the document is never
+    held in memory as a whole; pals are rendered straight from ``pal_table``.
+    ``pretty`` keeps the old indented layout.
+    """
+    with open_output(path, compress) as f:
+        if pretty:
+            for player in players:
+                player["pals"] = pal_table.pals_of(player["player_uid"])
+            json.dump(
+                {"players": players, "guilds": guilds}, f, indent=4, ensure_ascii=False
+            )
+            return
+        dumps = json.JSONEncoder(**COMPACT).encode
+        f.write('{"players":[')
+        for i, player in enumerate(players):
+            if i:
+                f.write(",")
+            f.write(pal_table.player_json(player))
+        f.write('],"guilds":[')
+        for i, guild in enumerate(guilds):
+            if i:
+                f.write(",")
+            f.write(dumps(guild))
+        f.write("]}")
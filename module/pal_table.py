@@ -0,0 +1,241 @@
+import json
+from array import array
+
+from world_types import hexuid_to_decimal
+
+FLAG_LUCKY = 1
+FLAG_BOSS = 2
+FLAG_TOWER = 4
+
+PAL_JSON = (
+    '{"nickname":%s,"level":%d,"exp":%d,"hp":%d,"max_hp":%d,"type":%s,'
+    '"gender":%s,"is_lucky":%s,"is_boss":%s,"is_tower":%s,"workspeed":%d,'
+    '"melee":%d,"ranged":%d,"defense":%d,"rank":%d,"rank_attack":%d,'
+    '"rank_defence":%d,"rank_craftspeed":%d,"skills":%s}'
+)
+
+
+def _int(data, key, default=0):
+    return int(data[key]["value"]) if data.get(key) else default
+
+
+def _byte(data, key, default=0):
+    return int(data[key]["value"]["value"]) if data.get(key) else default
+
+
+def _fixed(data, key):
+    return int(data[key]["value"]["Value"]["value"]) if data.get(key) else 0
+
+
+class PalTable:
+    """Columnar storage of owned pals.
+
+    Every pal is one row spread over parallel arrays. Species, nickname,
+    gender and passive skill lists are interned, so a row only holds small
+    integers. Rows are indexed by owner as they are appended and rendered to
+    the JSON shape of ``database.Pal`` on demand.
+    """
+
+    def __init__(self):
+        self._strings = []
+        self._string_ids = {}
+        self._json_strings = []
+        self._skill_sets = []
+        self._skill_set_ids = {}
+        self._json_skill_sets = []
+        self._owner_rows = {}
+
+        self.nickname = array("I")
+        self.type = array("I")
+        self.gender = array("I")
+        self.skills = array("I")
+        self.flags = array("B")
+        self.level = array("i")
+        self.exp = array("q")
+        self.hp = array("q")
+        self.max_hp = array("q")
+        self.workspeed = array("i")
+        self.melee = array("i")
+        self.ranged = array("i")
+        self.defense = array("i")
+        self.rank = array("i")
+        self.rank_attack = array("i")
+        self.rank_defence = array("i")
+        self.rank_craftspeed = array("i")
+
+    def __len__(self):
+        return len(self.level)
+
+    def intern(self, s):
+        idx = self._string_ids.get(s)
+        if idx is None:
+            idx = len(self._strings)
+            self._string_ids[s] = idx
+            self._strings.append(s)
+            self._json_strings.append(json.dumps(s, ensure_ascii=False))
+        return idx
+
+    def intern_skills(self, skills):
+        key = tuple(skills)
+        idx = self._skill_set_ids.get(key)
+        if idx is None:
+            idx = len(self._skill_sets)
+            self._skill_set_ids[key] = idx
+            self._skill_sets.append(key)
+            self._json_skill_sets.append(json.dumps(list(key), ensure_ascii=False))
+        return idx
+
+    def append(self, data):
+        """Append a pal from its raw ``SaveParameter`` properties."""
+        owner = hexuid_to_decimal(data["OwnerPlayerUId"]["value"])
+        is_lucky = bool(data["IsRarePal"]["value"]) if data.get("IsRarePal") else False
+        flags = FLAG_LUCKY if is_lucky else 0
+        if data.get("CharacterID"):
+            typename = data["CharacterID"]["value"]
+            typename_upper = typename.upper()
+            if typename_upper[:5] == "BOSS_":
+                typename_upper = typename_upper.replace("BOSS_", "")
+                if not is_lucky:
+                    flags |= FLAG_BOSS
+            if typename_upper.startswith("GYM_"):
+                flags |= FLAG_TOWER
+        else:
+            typename = "Unknow"
+
+        row = len(self.level)
+        rows = self._owner_rows.get(owner)
+        if rows is None:
+            rows = self._owner_rows[owner] = array("I")
+        rows.append(row)
+
+        self.nickname.append(
+            self.intern(data["NickName"]["value"] if data.get("NickName") else "")
+        )
+        self.type.append(self.intern(typename))
+        self.gender.append(
+            self.intern(
+                data["Gender"]["value"]["value"].split("::")[-1]
+                if data.get("Gender")
+                else "Unknow"
+            )
+        )
+        self.skills.append(
+            self.intern_skills(
+                data["PassiveSkillList"]["value"]["values"]
+                if data.get("PassiveSkillList")
+                else ()
+            )
+        )
+        self.flags.append(flags)
+        self.level.append(_byte(data, "Level", 1))
+        self.exp.append(_int(data, "Exp"))
+        self.hp.append(_fixed(data, "HP"))
+        self.max_hp.append(_fixed(data, "MaxHP"))
+        self.workspeed.append(_int(data, "CraftSpeed"))
+        self.melee.append(_int(data, "Talent_Melee"))
+        self.ranged.append(_byte(data, "Talent_Shot"))
+        self.defense.append(_byte(data, "Talent_Defense"))
+        self.rank.append(_byte(data, "Rank", 1))
+        self.rank_attack.append(_byte(data, "Rank_Attack"))
+        self.rank_defence.append(_byte(data, "Rank_Defence"))
+        self.rank_craftspeed.append(_byte(data, "Rank_CraftSpeed"))
+
+    def owners(self):
+        return self._owner_rows.keys()
+
+    def count(self, owner):
+        rows = self._owner_rows.get(owner)
+        return len(rows) if rows is not None else 0
+
+    def row(self, i):
+        strings = self._strings
+        flags = self.flags[i]
+        return {
+            "nickname": strings[self.nickname[i]],
+            "level": self.level[i],
+            "exp": self.exp[i],
+            "hp": self.hp[i],
+            "max_hp": self.max_hp[i],
+            "type": strings[self.type[i]],
+            "gender": strings[self.gender[i]],
+            "is_lucky": bool(flags & FLAG_LUCKY),
+            "is_boss": bool(flags & FLAG_BOSS),
+            "is_tower": bool(flags & FLAG_TOWER),
+            "workspeed": self.workspeed[i],
+            "melee": self.melee[i],
+            "ranged": self.ranged[i],
+            "defense": self.defense[i],
+            "rank": self.rank[i],
+            "rank_attack": self.rank_attack[i],
+            "rank_defence": self.rank_defence[i],
+            "rank_craftspeed": self.rank_craftspeed[i],
+            "skills": list(self._skill_sets[self.skills[i]]),
+        }
+
+    def pals_of(self, owner):
+        """Pals of ``owner`` as a list of dicts."""
+        return [self.row(i) for i in self._owner_rows.get(owner, ())]
+
+    def pals_json(self, owner):
+        """Pals of ``owner`` rendered directly to a JSON array."""
+        rows = self._owner_rows.get(owner)
+        if not rows:
+            return "[]"
+        js = self._json_strings
+        jskills = self._json_skill_sets
+        bools = ("false", "true")
+        nickname, type_, gender = self.nickname, self.type, self.gender
+        flags, skills = self.flags, self.skills
+        level, exp, hp, max_hp = self.level, self.exp, self.hp, self.max_hp
+        workspeed, melee, ranged, defense = (
+            self.workspeed,
+            self.melee,
+            self.ranged,
+            self.defense,
+        )
+        rank, rank_attack, rank_defence, rank_craftspeed = (
+            self.rank,
+            self.rank_attack,
+            self.rank_defence,
+            self.rank_craftspeed,
+        )
+        out = []
+        for i in rows:
+            f = flags[i]
+            out.append(
+                PAL_JSON
+                % (
+                    js[nickname[i]],
+                    level[i],
+                    exp[i],
+                    hp[i],
+                    max_hp[i],
+                    js[type_[i]],
+                    js[gender[i]],
+                    bools[f & FLAG_LUCKY],
+                    bools[(f & FLAG_BOSS) >> 1],
+                    bools[(f & FLAG_TOWER) >> 2],
+                    workspeed[i],
+                    melee[i],
+                    ranged[i],
+                    defense[i],
+                    rank[i],
+                    rank_attack[i],
+                    rank_defence[i],
+                    rank_craftspeed[i],
+                    jskills[skills[i]],
+                )
+            )
+        return "[" + ",".join(out) + "]"
+
+    def player_json(self, player):
+        """One player as compact JSON with its pals spliced in.
+
+        ``player`` must not carry a ``pals`` key.
+        """
+        head = json.dumps(player, ensure_ascii=False, separators=(",", ":"))
+        return head[:-1] + ',"pals":' + self.pals_json(player["player_uid"]) + "}"
+
+    def dumps_players(self, players):
+        """Serialise players to the JSON body expected by ``PUT /api/player``."""
+        return "[" + ",".join(self.player_json(player) for player in players) + "]"
@@ -1,4 +1,5 @@
 import io
+import logging
 import math
 import os
 import struct
@@ -6,6 +7,8 @@ import sys
 import uuid
 from typing import Any, Callable, Optional, Sequence, Union
 
+from palworld_save_tools.diagnostics import anomaly, logger
+
 # Alias stdlib types to avoid name conflicts
 _float = float
 _bytes = bytes
@@ -16,8 +19,7 @@ except ImportError:
     pass
 
 if os.getenv("FORCE_STDLIB_ONLY") or "recordclass" not in sys.modules:
-    if os.getenv("DEBUG"):
-        print("Using stdlib-compatible UUID class")
+    logger.debug("Using stdlib-compatible UUID class")
 
     class UUID:
         """Wrapper around uuid.UUID to delay evaluation of UUIDs until necessary"""
@@ -107,8 +109,7 @@ if os.getenv("FORCE_STDLIB_ONLY") or "recordclass" not in sys.modules:
             return hash(str(self))
 
 else:
-    if os.getenv("DEBUG"):
-        print("Using recordclass-based UUID class")
+    logger.debug("Using recordclass-based UUID class")
 
     @as_dataclass(hashable=True, fast_new=True)
     class UUID:  # type: ignore[no-redef]
@@ -214,6 +215,8 @@ class FArchiveReader:
     type_hints: dict[str, str]
     custom_properties: dict[str, tuple[Callable, Callable]]
     debug: bool
+    # property being read, for diagnostics
+    path: str
 
     def __init__(
         self,
@@ -229,6 +232,7 @@ class FArchiveReader:
         self.custom_properties = custom_properties
         self.debug = debug
         self.allow_nan = allow_nan
+        self.path = ""
 
     def __enter__(self):
         self.data.seek(0)
@@ -238,19 +242,29 @@ class FArchiveReader:
         self.data.close()
 
     def internal_copy(self, data, debug: bool) -> "FArchiveReader":
-        return FArchiveReader(
+        copy = FArchiveReader(
             data,
             self.type_hints,
             self.custom_properties,
             debug=debug,
             allow_nan=self.allow_nan,
         )
+        copy.path = self.path
+        return copy
 
     def get_type_or(self, path: str, default: str):
         if path in self.type_hints:
             return self.type_hints[path]
         else:
-            print(f"Struct type for {path} not found, assuming {default}")
+            anomaly(
+                "type_hint_fallback",
+                path,
+                default,
+                "Struct type for %s not found, assuming %s",
+                path,
+                default,
+                level=logging.INFO,
+            )
             return default
 
     def eof(self) -> bool:
@@ -288,8 +302,14 @@ class FArchiveReader:
         except Exception as e:
             try:
                 escaped = data.decode(encoding, errors="surrogatepass")
-                print(
-                    f"Error decoding {encoding} string of length {size}, data loss may occur! {bytes(data)!r}"
+                anomaly(
+                    "string_data_loss",
+                    self.path,
+                    encoding,
+                    "Error decoding %s string of length %d, data loss may occur! %r",
+                    encoding,
+                    size,
+                    data,
                 )
                 return escaped
             except Exception as e:
@@ -386,9 +406,35 @@ class FArchiveReader:
             properties[name] = self.property(type_name, size, f"{path}.{name}")
         return properties
 
+    def skip_property(self, type_name: str, size: int) -> None:
+        # Step over a property using only its tag, without decoding the value
+        if type_name == "StructProperty":
+            self.fstring()
+            self.guid()
+            self.optional_guid()
+        elif type_name == "MapProperty":
+            self.fstring()
+            self.fstring()
+            self.optional_guid()
+        elif type_name in (
+            "ArrayProperty",
+            "SetProperty",
+            "EnumProperty",
+            "ByteProperty",
+        ):
+            self.fstring()
+            self.optional_guid()
+        elif type_name == "BoolProperty":
+            self.bool()
+            self.optional_guid()
+        else:
+            self.optional_guid()
+        self.skip(size)
+
     def property(
         self, type_name: str, size: int, path: str, nested_caller_path: str = ""
     ) -> dict[str, Any]:
+        self.path = path
         value = {}
         if path in self.custom_properties and (
             path is not nested_caller_path or nested_caller_path == ""
@@ -571,7 +617,7 @@ class FArchiveReader:
             }
         else:
             if self.debug:
-                print(f"Assuming struct type: {struct_type} ({path})")
+                logger.debug("Assuming struct type: %s (%s)", struct_type, path)
             return self.properties_until_end(path)
 
     def array_property(self, array_type: str, size: int, path: str):
@@ -975,7 +1021,7 @@ class FArchiveWriter:
             self.float(value["a"])
         else:
             if self.debug:
-                print(f"Assuming struct type: {struct_type}")
+                logger.debug("Assuming struct type: %s", struct_type)
             return self.properties(value)
 
     def prop_value(self, type_name: str, struct_type_name: str, value):
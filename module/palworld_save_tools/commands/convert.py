@@ -4,6 +4,7 @@ import argparse
 import json
 import os
 
+from palworld_save_tools import diagnostics
 from palworld_save_tools.gvas import GvasFile
 from palworld_save_tools.json_tools import CustomEncoder
 from palworld_save_tools.palsav import compress_gvas_to_sav, decompress_sav_to_gvas
@@ -54,8 +55,37 @@ def main():
     )
 
     parser.add_argument("--minify-json", action="store_true", help="Minify JSON output")
+    parser.add_argument(
+        "--decode-profile",
+        metavar="PREFIX",
+        help="Profile the SAV decode per property path, writing PREFIX.txt and a flamegraph-compatible PREFIX.collapsed",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="Profile the whole conversion with cProfile, writing PREFIX.pstats, a PREFIX.txt summary and a flamegraph-compatible PREFIX.collapsed",
+    )
+    parser.add_argument(
+        "--profile-sample",
+        action="store_true",
+        help="Profile with a stack sampler instead of cProfile, which slows the conversion down less but writes no PREFIX.pstats",
+    )
     args = parser.parse_args()
 
+    if args.profile:
+        from palworld_save_tools.profiling import Profiler
+
+        profiler = Profiler(sample=args.profile_sample)
+        try:
+            with profiler:
+                convert(args)
+        finally:
+            print("Wrote profile to %s" % ", ".join(profiler.write_files(args.profile)))
+    else:
+        convert(args)
+
+
+def convert(args):
     if args.to_json and args.from_json:
         print("Cannot specify both --to-json and --from-json")
         exit(1)
@@ -79,7 +109,9 @@ def main():
             minify=args.minify_json,
             allow_nan=(not args.convert_nan_to_null),
             custom_properties_keys=args.custom_properties,
+            decode_profile=args.decode_profile,
         )
+        diagnostics.log_anomalies()
 
     if args.from_json or args.filename.endswith(".json"):
         if not args.output:
@@ -96,6 +128,7 @@ def convert_sav_to_json(
     minify=False,
     allow_nan=True,
     custom_properties_keys=["all"],
+    decode_profile=None,
 ):
     print(f"Converting {filename} to JSON, saving to {output_path}")
     if os.path.exists(output_path):
@@ -115,9 +148,20 @@ def convert_sav_to_json(
         for prop in PALWORLD_CUSTOM_PROPERTIES:
             if prop in custom_properties_keys:
                 custom_properties[prop] = PALWORLD_CUSTOM_PROPERTIES[prop]
+    profile = None
+    if decode_profile:
+        from palworld_save_tools.decode_profile import DecodeProfile
+
+        profile = DecodeProfile()
     gvas_file = GvasFile.read(
-        raw_gvas, PALWORLD_TYPE_HINTS, custom_properties, allow_nan=allow_nan
+        raw_gvas,
+        PALWORLD_TYPE_HINTS,
+        custom_properties,
+        allow_nan=allow_nan,
+        profile=profile,
     )
+    if profile is not None:
+        print("Wrote decode profile to %s and %s" % profile.write_files(decode_profile))
     print(f"Writing JSON to {output_path}")
     with open(output_path, "w", encoding="utf8") as f:
         indent = None if minify else "\t"
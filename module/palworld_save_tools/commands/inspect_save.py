@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import sys
+
+from palworld_save_tools.size_tree import WORLD_PATH, size_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="palworld-save-inspect",
+        description="Prints where the bytes of a Palworld save go, reading property headers only",
+    )
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Largest map and array entries shown per path (default: 5)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=2,
+        help="Levels of the tree shown under the root (default: 2)",
+    )
+    parser.add_argument(
+        "--root",
+        default=WORLD_PATH,
+        help=f"Property path the tree starts at (default: {WORLD_PATH})",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print every path with its sizes and the parse estimate as JSON",
+    )
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.filename):
+        print(f"{args.filename} is not a file")
+        exit(1)
+    with open(args.filename, "rb") as f:
+        tree = size_tree(f.read(), top=args.top)
+    if args.json:
+        json.dump(tree.dump(), sys.stdout, indent=2)
+        print()
+    else:
+        tree.report(sys.stdout, root=args.root, depth=args.depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import time
+from typing import Any, Optional, TextIO
+
+from palworld_save_tools.archive import FArchiveReader
+
+# Reads counted per property path; composite reads (bool, vector, ...) are
+# counted through the primitives they call
+PRIMITIVES = (
+    "fstring",
+    "guid",
+    "optional_guid",
+    "i16",
+    "u16",
+    "i32",
+    "u32",
+    "i64",
+    "u64",
+    "float",
+    "double",
+    "byte",
+    "byte_list",
+    "read",
+    "read_to_end",
+    "skip",
+)
+
+
+class PathStats:
+    __slots__ = ("count", "bytes", "seconds", "self_seconds", "calls")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.self_seconds = 0.0
+        self.calls: dict[str, int] = {}
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "self_seconds": self.self_seconds,
+            "calls": dict(self.calls),
+        }
+
+
+class DecodeProfile:
+    """Bytes, time, occurrences and primitive reads per property path.
+
+    Filled in by a ProfilingFArchiveReader. Nested paths are timed inside
+    their parents, so ``seconds`` is inclusive and ``self_seconds`` is what
+    is left once the nested paths are taken out.
+    """
+
+    def __init__(self) -> None:
+        self.paths: dict[str, PathStats] = {}
+        # self time per stack of paths, for flamegraphs
+        self.stacks: dict[tuple[str, ...], float] = {}
+        # [path, start, seconds spent in nested paths, stats, reader path]
+        self.stack: list[list[Any]] = []
+        self.current: Optional[PathStats] = None
+
+    def enter(self, reader_path: str) -> None:
+        path = reader_path
+        if self.stack and not path.startswith(self.stack[-1][0]):
+            # rawdata decoders restart paths from "" in their own reader
+            path = self.stack[-1][0] + path
+        stats = self.paths.get(path)
+        if stats is None:
+            stats = self.paths[path] = PathStats()
+        self.stack.append([path, time.perf_counter(), 0.0, stats, reader_path])
+        self.current = stats
+
+    def exit(self, consumed: int) -> None:
+        path, start, nested, stats, _ = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        stats.count += 1
+        stats.bytes += consumed
+        stats.seconds += elapsed
+        stats.self_seconds += elapsed - nested
+        key = tuple(frame[0] for frame in self.stack) + (path,)
+        self.stacks[key] = self.stacks.get(key, 0.0) + elapsed - nested
+        if self.stack:
+            self.stack[-1][2] += elapsed
+            self.current = self.stack[-1][3]
+        else:
+            self.current = None
+
+    def count_call(self, name: str) -> None:
+        stats = self.current
+        if stats is not None:
+            stats.calls[name] = stats.calls.get(name, 0) + 1
+
+    def dump(self) -> dict[str, Any]:
+        return {path: stats.dump() for path, stats in self.paths.items()}
+
+    def report(self, out: TextIO, top: int = 50, sort: str = "self_seconds") -> None:
+        paths = sorted(
+            self.paths.items(), key=lambda item: getattr(item[1], sort), reverse=True
+        )
+        out.write(f"{'self s':>9} {'total s':>9} {'count':>9} {'bytes':>13}  path\n")
+        for path, stats in paths[:top]:
+            calls = ", ".join(
+                f"{name} {count}"
+                for name, count in sorted(
+                    stats.calls.items(), key=lambda item: item[1], reverse=True
+                )[:4]
+            )
+            out.write(
+                f"{stats.self_seconds:9.3f} {stats.seconds:9.3f} "
+                f"{stats.count:9d} {stats.bytes:13,d}  {path}"
+                + (f"  [{calls}]" if calls else "")
+                + "\n"
+            )
+
+    def write_collapsed(self, out: TextIO) -> None:
+        """Self time per stack in microseconds, as flamegraph.pl takes it."""
+        for stack, seconds in sorted(self.stacks.items()):
+            # each frame relative to the one it sits in
+            frames = [stack[0]] + [
+                path[len(parent) :] for parent, path in zip(stack, stack[1:])
+            ]
+            micros = round(seconds * 1e6)
+            if micros > 0:
+                out.write(";".join(f.replace(";", ":") for f in frames))
+                out.write(f" {micros}\n")
+
+    def write_files(self, prefix: str) -> tuple[str, str]:
+        """Write the report to PREFIX.txt and the stacks to PREFIX.collapsed."""
+        report_path, collapsed_path = f"{prefix}.txt", f"{prefix}.collapsed"
+        with open(report_path, "w", encoding="utf8") as f:
+            self.report(f, top=100)
+        with open(collapsed_path, "w", encoding="utf8") as f:
+            self.write_collapsed(f)
+        return report_path, collapsed_path
+
+
+def _counting(name: str):
+    primitive = getattr(FArchiveReader, name)
+
+    def counted(self, *args, **kwargs):
+        self.profile.count_call(name)
+        return primitive(self, *args, **kwargs)
+
+    counted.__name__ = name
+    return counted
+
+
+class ProfilingFArchiveReader(FArchiveReader):
+    """FArchiveReader that records every property it reads in a profile.
+
+    The plain FArchiveReader is untouched, so profiling costs nothing
+    unless this reader is used.
+    """
+
+    profile: DecodeProfile
+
+    def __init__(self, data, *args, profile: DecodeProfile, **kwargs):
+        super().__init__(data, *args, **kwargs)
+        self.profile = profile
+
+    def internal_copy(self, data, debug: bool) -> "FArchiveReader":
+        copy = ProfilingFArchiveReader(
+            data,
+            self.type_hints,
+            self.custom_properties,
+            debug=debug,
+            allow_nan=self.allow_nan,
+            profile=self.profile,
+        )
+        copy.path = self.path
+        return copy
+
+    def property(
+        self, type_name: str, size: int, path: str, nested_caller_path: str = ""
+    ) -> dict[str, Any]:
+        stack = self.profile.stack
+        if stack and stack[-1][4] == path:
+            # a custom decoder reading its own property's value
+            return super().property(type_name, size, path, nested_caller_path)
+        start = self.data.tell()
+        self.profile.enter(path)
+        try:
+            return super().property(type_name, size, path, nested_caller_path)
+        finally:
+            self.profile.exit(self.data.tell() - start)
+
+
+for _name in PRIMITIVES:
+    setattr(ProfilingFArchiveReader, _name, _counting(_name))
@@ -0,0 +1,204 @@
+"""Level-gated diagnostics of the reader and the rawdata decoders.
+
+Messages go to the ``palworld_save_tools`` logger with %-style arguments,
+so a message below the configured level costs one cached level check and
+is never formatted. Arguments that are costly to render, such as byte
+dumps, are wrapped in ``hexdump`` so they are only rendered when written.
+
+By default WARNING and above go to stderr. ``configure`` can send them to a
+size-rotated file instead, written in batches by a background thread.
+
+Anomalies that repeat once per record, such as unknown map objects or
+trailing bytes, are reported with ``anomaly`` instead: they are counted
+per (kind, path, identifier) with the first message of each kind kept as
+a sample, and ``log_anomalies`` writes one line per key at the end of a
+run. Each occurrence is still logged at DEBUG.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Any, Optional, Sequence, Union
+
+logger = logging.getLogger("palworld_save_tools")
+logger.propagate = False
+
+OFF = logging.CRITICAL + 10
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "off": OFF,
+}
+
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+logger.addHandler(_stderr_handler)
+logger.setLevel(logging.WARNING)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# (kind, path, identifier) -> occurrences
+_anomaly_counts: dict[tuple[str, str, str], int] = {}
+# (kind, path, identifier) -> (level, msg, args) of the first occurrence
+_anomaly_samples: dict[tuple[str, str, str], tuple[int, str, tuple]] = {}
+
+
+class hexdump:
+    """Renders bytes as hex when a message is formatted, not before."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Sequence[int]) -> None:
+        self.data = data
+
+    def __str__(self) -> str:
+        return bytes(self.data).hex()
+
+
+def anomaly(
+    kind: str,
+    path: str,
+    identifier: Any,
+    msg: str,
+    *args: Any,
+    level: int = logging.WARNING,
+) -> None:
+    """Count one occurrence of an anomaly; ``msg`` % ``args`` describes it.
+
+    Only the first occurrence per (kind, path, identifier) keeps its
+    message, so ``args`` may hold byte dumps without piling them up.
+    """
+    key = (kind, path, str(identifier))
+    count = _anomaly_counts.get(key)
+    if count is None:
+        _anomaly_counts[key] = 1
+        _anomaly_samples[key] = (level, msg, args)
+    else:
+        _anomaly_counts[key] = count + 1
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(msg, *args)
+
+
+def anomalies() -> list[dict[str, Any]]:
+    """Counted anomalies, most frequent first, each with its sample."""
+    result = []
+    for key, count in sorted(_anomaly_counts.items(), key=lambda i: -i[1]):
+        level, msg, args = _anomaly_samples[key]
+        kind, path, identifier = key
+        result.append(
+            {
+                "kind": kind,
+                "path": path,
+                "identifier": identifier,
+                "count": count,
+                "level": logging.getLevelName(level),
+                "sample": msg % args if args else msg,
+            }
+        )
+    return result
+
+
+def log_anomalies(top: int = 50) -> int:
+    """Log one line per counted anomaly, at the level of its sample, and
+    forget them. Returns the number of occurrences."""
+    total = sum(_anomaly_counts.values())
+    if total:
+        entries = sorted(_anomaly_counts.items(), key=lambda i: -i[1])
+        for key, count in entries[:top]:
+            level, msg, args = _anomaly_samples[key]
+            kind, path, identifier = key
+            logger.log(
+                level,
+                "%d x %s at %s [%s], first: " + msg,
+                count,
+                kind,
+                path or "?",
+                identifier,
+                *args,
+            )
+        if len(entries) > top:
+            logger.warning(
+                "%d more anomaly kinds not shown, %d anomalies in total",
+                len(entries) - top,
+                total,
+            )
+    reset_anomalies()
+    return total
+
+
+def reset_anomalies() -> None:
+    _anomaly_counts.clear()
+    _anomaly_samples.clear()
+
+
+def configure(
+    level: Union[str, int] = "warning",
+    path: Optional[str] = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backups: int = 3,
+    buffer: int = 1000,
+) -> None:
+    """Set the diagnostics level and where messages go.
+
+    With a ``path``, messages are handed to a background thread that writes
+    them to ``path`` in batches of up to ``buffer`` records, rotating the
+    file once it passes ``max_bytes``; ERROR messages are written at once.
+    Without one they go to stderr.
+    """
+    shutdown()
+    if isinstance(level, str):
+        level = LEVELS[level.lower()]
+    logger.setLevel(level)
+    if path is None or level >= OFF:
+        logger.addHandler(_stderr_handler)
+        return
+    global _listener
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(message)s", "%Y/%m/%d - %H:%M:%S"
+        )
+    )
+    buffered = logging.handlers.MemoryHandler(
+        buffer, flushLevel=logging.ERROR, target=file_handler
+    )
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, buffered)
+    _listener.start()
+
+
+def shutdown() -> None:
+    """Write out pending messages and detach every handler."""
+    global _listener
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+            target = getattr(handler, "target", None)
+            if target is not None:
+                target.close()
+        _listener = None
+
+
+def _after_fork() -> None:
+    # the writer thread does not survive a fork, children log to stderr
+    global _listener
+    _listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(_stderr_handler)
+
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
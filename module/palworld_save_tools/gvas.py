@@ -1,7 +1,12 @@
 import base64
-from typing import Any, Callable
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
+from palworld_save_tools.diagnostics import logger
+
+if TYPE_CHECKING:
+    from palworld_save_tools.decode_profile import DecodeProfile
 
 
 def custom_version_reader(reader: FArchiveReader):
@@ -119,9 +124,15 @@ class GvasFile:
         type_hints: dict[str, str] = {},
         custom_properties: dict[str, tuple[Callable, Callable]] = {},
         allow_nan: bool = True,
+        profile: Optional["DecodeProfile"] = None,
     ) -> "GvasFile":
         gvas_file = GvasFile()
-        with FArchiveReader(
+        reader_class: Callable[..., FArchiveReader] = FArchiveReader
+        if profile is not None:
+            from palworld_save_tools.decode_profile import ProfilingFArchiveReader
+
+            reader_class = partial(ProfilingFArchiveReader, profile=profile)
+        with reader_class(
             data,
             type_hints=type_hints,
             custom_properties=custom_properties,
@@ -131,8 +142,9 @@ class GvasFile:
             gvas_file.properties = reader.properties_until_end()
             gvas_file.trailer = reader.read_to_end()
             if gvas_file.trailer != b"\x00\x00\x00\x00":
-                print(
-                    f"{len(gvas_file.trailer)} bytes of trailer data, file may not have fully parsed"
+                logger.warning(
+                    "%d bytes of trailer data, file may not have fully parsed",
+                    len(gvas_file.trailer),
                 )
         return gvas_file
 
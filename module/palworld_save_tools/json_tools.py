@@ -1,5 +1,6 @@
 import json
 import uuid
+from collections.abc import Mapping
 
 from palworld_save_tools.archive import UUID
 
@@ -10,4 +11,11 @@ class CustomEncoder(json.JSONEncoder):
             return str(obj)
         if isinstance(obj, uuid.UUID):
             return str(obj)
+        if isinstance(obj, Mapping):
+            # read-only views such as foliage_model_instance.FoliageInstance
+            return dict(obj)
+        dump = getattr(obj, "dump", None)
+        if dump is not None:
+            # foliage_model_instance.FoliageInstances columns
+            return dump()
         return super(CustomEncoder, self).default(obj)
@@ -6,6 +6,8 @@ import struct
 from enum import IntEnum
 from typing import Tuple, Optional
 
+from palworld_save_tools.diagnostics import logger
+
 # Default compressor dan level
 OODLE_COMPRESSOR = 8  # Kraken
 OODLE_LEVEL = 6       # Optimal2
@@ -117,7 +119,7 @@ class OodleLib:
         try:
             self.oodle_lib = ctypes.CDLL(lib_path)
             self._setup_oodle_functions()
-            print(f"Successfully loaded Oodle library: {lib_path}")
+            logger.debug("Successfully loaded Oodle library: %s", lib_path)
         except Exception as e:
             raise RuntimeError(f"Failed to load Oodle library: {e}")
 
@@ -158,9 +160,10 @@ class OodleLib:
         self.oodle_lib.OodleLZ_Compress.restype = ctypes.c_long
         
         self.oodle_lib.OodleLZ_GetCompressedBufferSizeNeeded.argtypes = (
-            ctypes.c_uint,  # rawSize
+            Compressor,  # compressor
+            ctypes.c_ssize_t,  # rawSize (SINTa)
         )
-        self.oodle_lib.OodleLZ_GetCompressedBufferSizeNeeded.restype = ctypes.c_uint
+        self.oodle_lib.OodleLZ_GetCompressedBufferSizeNeeded.restype = ctypes.c_ssize_t
         
         self.oodle_lib.OodleLZ_CompressOptions_GetDefault.argtypes = (
             Compressor,  # compressor
@@ -246,19 +249,22 @@ class OodleLib:
         elif format_result == -1:
             raise ValueError("Unknown SAV file format")
 
-        print("Detected PLM format (Oodle), starting decompression...")
+        logger.debug("Detected PLM format (Oodle), starting decompression...")
 
         # Parse header
         uncompressed_len, compressed_len, magic, save_type, data_offset = (
             self._parse_sav_header(sav_data)
         )
 
-        print(f"File information:")
-        print(f"  Magic bytes: {magic.decode('ascii', errors='ignore')}")
-        print(f"  Save type: 0x{save_type:02X}")
-        print(f"  Compressed size: {compressed_len:,} bytes")
-        print(f"  Uncompressed size: {uncompressed_len:,} bytes")
-        print(f"  Data offset: {data_offset} bytes")
+        logger.debug(
+            "File information: magic bytes %r, save type 0x%02X, compressed size "
+            "%d bytes, uncompressed size %d bytes, data offset %d bytes",
+            magic,
+            save_type,
+            compressed_len,
+            uncompressed_len,
+            data_offset,
+        )
 
         # Check if the data is complete
         if len(sav_data) < data_offset + compressed_len:
@@ -269,7 +275,7 @@ class OodleLib:
         compressed_data = sav_data[data_offset : data_offset + compressed_len]
         gvas_buffer = ctypes.create_string_buffer(uncompressed_len)
 
-        print("Calling Oodle decompression...")
+        logger.debug("Calling Oodle decompression...")
         result = self.oodle_lib.OodleLZ_Decompress(
             compressed_data,  # compressed buffer
             compressed_len,  # compressed size
@@ -297,7 +303,7 @@ class OodleLib:
 
         gvas_data = gvas_buffer.raw[:result]
 
-        print(f"Decompression successful! GVAS size: {len(gvas_data):,} bytes")
+        logger.debug("Decompression successful! GVAS size: %d bytes", len(gvas_data))
 
         return gvas_data, save_type
 
@@ -312,14 +318,14 @@ class OodleLib:
         Returns:
             int: Save type
         """
-        print(f"Reading SAV file: {sav_file_path}")
+        logger.debug("Reading SAV file: %s", sav_file_path)
 
         with open(sav_file_path, "rb") as f:
             sav_data = f.read()
 
         gvas_data, save_type = self.decompress_sav_to_gvas(sav_data)
 
-        print(f"Writing GVAS file: {gvas_file_path}")
+        logger.debug("Writing GVAS file: %s", gvas_file_path)
         with open(gvas_file_path, "wb") as f:
             f.write(gvas_data)
 
@@ -342,7 +348,9 @@ class OodleLib:
   
         src_array = (ctypes.c_char * src_len).from_buffer_copy(gvas_data)
 
-        max_comp_len = self.oodle_lib.OodleLZ_GetCompressedBufferSizeNeeded(src_len)
+        max_comp_len = self.oodle_lib.OodleLZ_GetCompressedBufferSizeNeeded(
+            OODLE_COMPRESSOR, src_len
+        )
         comp_array = ctypes.create_string_buffer(max_comp_len)
 
         # CompressOptions default (optional)
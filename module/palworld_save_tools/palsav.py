@@ -4,12 +4,24 @@ from palworld_save_tools.oodle_lib import OodleLib
 
 MAGIC_BYTES = b"PlZ"
 
+_oodle_lib = None
+
+
+def get_oodle_lib() -> OodleLib:
+    """The process wide OodleLib, loaded on first use."""
+    global _oodle_lib
+    if _oodle_lib is None:
+        _oodle_lib = OodleLib()
+    return _oodle_lib
+
 
 def decompress_sav_to_gvas(data: bytes, zlib: bool = False) -> tuple[bytes, int]:
-    if zlib:
+    # PlZ saves are zlib compressed whatever the caller expects
+    magic_offset = 20 if data[8:11] == b"CNK" else 8
+    if zlib or data[magic_offset : magic_offset + 3] == MAGIC_BYTES:
         return decompress_sav_to_gvas_with_zlib(data)
 
-    return OodleLib().decompress_sav_to_gvas(data)
+    return get_oodle_lib().decompress_sav_to_gvas(data)
 
 
 def decompress_sav_to_gvas_with_zlib(data: bytes) -> tuple[bytes, int]:
@@ -65,7 +77,7 @@ def compress_gvas_to_sav(data: bytes, save_type: int, zlib: bool = False) -> byt
     if zlib:
         return compress_gvas_to_sav_with_zlib(data, save_type)
 
-    return OodleLib().compress_gvas_to_sav(data, save_type)
+    return get_oodle_lib().compress_gvas_to_sav(data, save_type)
 
 def compress_gvas_to_sav_with_zlib(data: bytes, save_type: int) -> bytes:
     uncompressed_len = len(data)
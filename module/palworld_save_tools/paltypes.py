@@ -1,22 +1,43 @@
+import importlib
+import time
 from typing import Any, Callable
 
 from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
-from palworld_save_tools.rawdata import (
-    base_camp,
-    base_camp_module,
-    character,
-    character_container,
-    dynamic_item,
-    foliage_model,
-    foliage_model_instance,
-    group,
-    item_container,
-    item_container_slots,
-    map_object,
-    work,
-    work_collection,
-    worker_director,
-)
+
+# Seconds spent importing each rawdata module, filled in on first use
+RAWDATA_IMPORT_TIMES: dict[str, float] = {}
+
+
+def _lazy_codec(
+    name: str,
+) -> tuple[
+    Callable[[FArchiveReader, str, int, str], dict[str, Any]],
+    Callable[[FArchiveWriter, str, dict[str, Any]], int],
+]:
+    # Defer importing a rawdata module until a save actually reaches its path.
+    # PyInstaller cannot follow this import, the build scripts bundle the
+    # package with --collect-submodules palworld_save_tools.rawdata
+    codec: list[Callable] = []
+
+    def load() -> list[Callable]:
+        start = time.perf_counter()
+        module = importlib.import_module(f"palworld_save_tools.rawdata.{name}")
+        RAWDATA_IMPORT_TIMES[name] = time.perf_counter() - start
+        codec[:] = [module.decode, module.encode]
+        return codec
+
+    def decode(
+        reader: FArchiveReader, type_name: str, size: int, path: str
+    ) -> dict[str, Any]:
+        return (codec or load())[0](reader, type_name, size, path)
+
+    def encode(
+        writer: FArchiveWriter, property_type: str, properties: dict[str, Any]
+    ) -> int:
+        return (codec or load())[1](writer, property_type, properties)
+
+    return decode, encode
+
 
 PALWORLD_TYPE_HINTS: dict[str, str] = {
     ".worldSaveData.CharacterContainerSaveData.Key": "StructProperty",
@@ -60,59 +81,37 @@ PALWORLD_CUSTOM_PROPERTIES: dict[
         Callable[[FArchiveWriter, str, dict[str, Any]], int],
     ],
 ] = {
-    ".worldSaveData.GroupSaveDataMap": (group.decode, group.encode),
-    ".worldSaveData.CharacterSaveParameterMap.Value.RawData": (
-        character.decode,
-        character.encode,
-    ),
-    ".worldSaveData.ItemContainerSaveData.Value.RawData": (
-        item_container.decode,
-        item_container.encode,
-    ),
-    ".worldSaveData.ItemContainerSaveData.Value.Slots.Slots.RawData": (
-        item_container_slots.decode,
-        item_container_slots.encode,
+    ".worldSaveData.GroupSaveDataMap": _lazy_codec("group"),
+    ".worldSaveData.CharacterSaveParameterMap.Value.RawData": _lazy_codec("character"),
+    ".worldSaveData.ItemContainerSaveData.Value.RawData": _lazy_codec("item_container"),
+    ".worldSaveData.ItemContainerSaveData.Value.Slots.Slots.RawData": _lazy_codec(
+        "item_container_slots"
     ),
     # This isn't actually serialised into at all?
     # ".worldSaveData.CharacterContainerSaveData.Value.RawData": (debug.decode, debug.encode),
     # This duplicates the data already serialised into the Slots UObject?
-    ".worldSaveData.CharacterContainerSaveData.Value.Slots.Slots.RawData": (
-        character_container.decode,
-        character_container.encode,
-    ),
-    ".worldSaveData.DynamicItemSaveData.DynamicItemSaveData.RawData": (
-        dynamic_item.decode,
-        dynamic_item.encode,
-    ),
-    ".worldSaveData.FoliageGridSaveDataMap.Value.ModelMap.Value.RawData": (
-        foliage_model.decode,
-        foliage_model.encode,
-    ),
-    ".worldSaveData.FoliageGridSaveDataMap.Value.ModelMap.Value.InstanceDataMap.Value.RawData": (
-        foliage_model_instance.decode,
-        foliage_model_instance.encode,
+    ".worldSaveData.CharacterContainerSaveData.Value.Slots.Slots.RawData": _lazy_codec(
+        "character_container"
     ),
-    ".worldSaveData.BaseCampSaveData.Value.RawData": (
-        base_camp.decode,
-        base_camp.encode,
+    ".worldSaveData.DynamicItemSaveData.DynamicItemSaveData.RawData": _lazy_codec(
+        "dynamic_item"
     ),
-    ".worldSaveData.BaseCampSaveData.Value.WorkerDirector.RawData": (
-        worker_director.decode,
-        worker_director.encode,
+    ".worldSaveData.FoliageGridSaveDataMap.Value.ModelMap.Value.RawData": _lazy_codec(
+        "foliage_model"
     ),
-    ".worldSaveData.BaseCampSaveData.Value.WorkCollection.RawData": (
-        work_collection.decode,
-        work_collection.encode,
+    ".worldSaveData.FoliageGridSaveDataMap.Value.ModelMap.Value.InstanceDataMap.Value.RawData": _lazy_codec(
+        "foliage_model_instance"
     ),
-    ".worldSaveData.BaseCampSaveData.Value.ModuleMap": (
-        base_camp_module.decode,
-        base_camp_module.encode,
+    ".worldSaveData.BaseCampSaveData.Value.RawData": _lazy_codec("base_camp"),
+    ".worldSaveData.BaseCampSaveData.Value.WorkerDirector.RawData": _lazy_codec(
+        "worker_director"
     ),
-    ".worldSaveData.WorkSaveData": (work.decode, work.encode),
-    ".worldSaveData.MapObjectSaveData": (
-        map_object.decode,
-        map_object.encode,
+    ".worldSaveData.BaseCampSaveData.Value.WorkCollection.RawData": _lazy_codec(
+        "work_collection"
     ),
+    ".worldSaveData.BaseCampSaveData.Value.ModuleMap": _lazy_codec("base_camp_module"),
+    ".worldSaveData.WorkSaveData": _lazy_codec("work"),
+    ".worldSaveData.MapObjectSaveData": _lazy_codec("map_object"),
 }
 
 # List of properties that are not working with newer versions
@@ -0,0 +1,176 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from typing import Any, Optional, TextIO
+
+# Deepest stack written to collapsed output, deeper frames are cut
+MAX_DEPTH = 200
+# Smallest share of the run a rebuilt cProfile stack may have
+MIN_SHARE = 1e-4
+
+
+def _label(filename: str, lineno: int, name: str) -> str:
+    if filename == "~":
+        # builtins, "<built-in method ...>"
+        return name
+    short = os.path.join(*os.path.normpath(filename).split(os.sep)[-2:])
+    return f"{name} ({short}:{lineno})"
+
+
+def _write_collapsed(out: TextIO, stacks: dict[tuple[str, ...], float]) -> None:
+    for stack, weight in sorted(stacks.items()):
+        weight = round(weight)
+        if weight > 0:
+            out.write(";".join(frame.replace(";", ":") for frame in stack))
+            out.write(f" {weight}\n")
+
+
+class Sampler:
+    """Records the stack of one thread every ``interval`` seconds.
+
+    Costs a thread waking up per interval rather than a hook on every call,
+    so timings stay close to an unprofiled run.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples = 0
+        self.stacks: dict[tuple[str, ...], int] = {}
+        self._labels: dict[Any, str] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target = 0
+
+    def enable(self) -> None:
+        self._target = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def disable(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        labels = self._labels
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _label(
+                        code.co_filename, code.co_firstlineno, code.co_name
+                    )
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                key = tuple(stack)
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def report(self, out: TextIO, top: int = 50) -> None:
+        own: dict[str, int] = {}
+        total: dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for frame in set(stack):
+                total[frame] = total.get(frame, 0) + count
+        out.write(
+            f"{self.samples} samples every {self.interval * 1000:g}ms\n"
+            f"{'self':>7} {'total':>7}  function\n"
+        )
+        samples = self.samples or 1
+        for frame, count in sorted(own.items(), key=lambda i: i[1], reverse=True)[:top]:
+            out.write(
+                f"{count / samples:7.1%} {total[frame] / samples:7.1%}  {frame}\n"
+            )
+
+
+def cprofile_stacks(stats: pstats.Stats) -> dict[tuple[str, ...], float]:
+    """Self time per call stack in microseconds, rebuilt from a call graph.
+
+    cProfile keeps caller -> callee totals only, so the time of a function
+    is shared among the stacks leading to it in proportion to how much of
+    it each caller accounts for. Stacks under ``MIN_SHARE`` of the total
+    are dropped, which keeps the walk bounded on large call graphs.
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Any, list[tuple[Any, float]]] = {}
+    roots = []
+    for func, (_, _, _, cumulative, callers) in entries.items():
+        if not callers:
+            roots.append((func, cumulative))
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    labels = {func: _label(*func) for func in entries}
+    min_seconds = sum(cumulative for _, cumulative in roots) * MIN_SHARE
+    stacks: dict[tuple[str, ...], float] = {}
+
+    def walk(func: Any, seconds: float, stack: tuple[str, ...], seen: set) -> None:
+        _, _, own, cumulative, _ = entries[func]
+        stack = stack + (labels[func],)
+        share = seconds / cumulative if cumulative > 0 else 0.0
+        stacks[stack] = stacks.get(stack, 0.0) + own * share * 1e6
+        if len(stack) >= MAX_DEPTH:
+            return
+        seen.add(func)
+        for callee, edge_seconds in callees.get(func, ()):
+            # recursion is already counted in the frame it started from
+            if callee not in seen and edge_seconds * share >= min_seconds:
+                walk(callee, edge_seconds * share, stack, seen)
+        seen.discard(func)
+
+    for func, cumulative in roots:
+        walk(func, cumulative, (), set())
+    return stacks
+
+
+class Profiler:
+    """Profiles the calling thread with cProfile, or with a Sampler when
+    ``sample`` is set.
+
+    Worker processes are not followed.
+    """
+
+    def __init__(self, sample: bool = False, interval: float = 0.005) -> None:
+        self.sample = sample
+        self.profiler: Any = Sampler(interval) if sample else cProfile.Profile()
+
+    def start(self) -> None:
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def write_files(self, prefix: str) -> tuple[str, ...]:
+        """Write PREFIX.txt, PREFIX.collapsed for flamegraph.pl and, for
+        cProfile, PREFIX.pstats. Returns the paths written."""
+        report_path, collapsed_path = f"{prefix}.txt", f"{prefix}.collapsed"
+        if self.sample:
+            with open(report_path, "w", encoding="utf8") as f:
+                self.profiler.report(f)
+            with open(collapsed_path, "w", encoding="utf8") as f:
+                _write_collapsed(f, self.profiler.stacks)
+            return report_path, collapsed_path
+        pstats_path = f"{prefix}.pstats"
+        self.profiler.dump_stats(pstats_path)
+        with open(report_path, "w", encoding="utf8") as f:
+            stats = pstats.Stats(self.profiler, stream=f)
+            stats.sort_stats("cumulative").print_stats(50)
+        with open(collapsed_path, "w", encoding="utf8") as f:
+            _write_collapsed(f, cprofile_stacks(stats))
+        return pstats_path, report_path, collapsed_path
@@ -1,6 +1,7 @@
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
 
 
 def decode(
@@ -10,12 +11,12 @@ def decode(
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
     data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value["value"] = decode_bytes(reader, data_bytes, path=path)
     return value
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, b_bytes: Sequence[int]
+    parent_reader: FArchiveReader, b_bytes: Sequence[int], path: str = ""
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(bytes(b_bytes), debug=False)
     data = {
@@ -29,7 +30,13 @@ def decode_bytes(
         "owner_map_object_instance_id": reader.guid(),
     }
     if not reader.eof():
-        # raise Exception("Warning: EOF not reached")
+        anomaly(
+            "trailing_unparsed_data",
+            path,
+            "",
+            "EOF not reached, %d bytes left",
+            reader.size - reader.data.tell(),
+        )
         data["trailing_unparsed_data"] = [b for b in reader.read_to_end()]
     return data
 
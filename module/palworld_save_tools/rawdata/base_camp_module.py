@@ -1,6 +1,7 @@
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly, hexdump
 from palworld_save_tools.rawdata.common import (
     pal_item_and_num_read,
     pal_item_and_slot_writer,
@@ -24,11 +25,12 @@ def decode(
     value = reader.property(type_name, size, path, nested_caller_path=path)
     # module map
     module_map = value["value"]
+    raw_data_path = f"{path}.Value.RawData"
     for module in module_map:
         module_type = module["key"]
         module_bytes = module["value"]["RawData"]["value"]["values"]
         module["value"]["RawData"]["value"] = decode_bytes(
-            reader, module_bytes, module_type
+            reader, module_bytes, module_type, path=raw_data_path
         )
     return value
 
@@ -59,7 +61,10 @@ def module_passive_effect_reader(reader: FArchiveReader) -> dict[str, Any]:
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, b_bytes: Sequence[int], module_type: str
+    parent_reader: FArchiveReader,
+    b_bytes: Sequence[int],
+    module_type: str,
+    path: str = "",
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(bytes(b_bytes), debug=False)
     data: dict[str, Any] = {}
@@ -71,8 +76,13 @@ def decode_bytes(
                 transport_item_character_info_reader
             )
         except Exception as e:
-            print(
-                f"Warning: Failed to decode transport item director, please report this: {e} ({bytes(b_bytes)!r})"
+            anomaly(
+                "module_decode_failed",
+                path,
+                module_type,
+                "Failed to decode transport item director, please report this: %s (%s)",
+                e,
+                hexdump(b_bytes),
             )
             return {"values": b_bytes}
     elif module_type == "EPalBaseCampModuleType::PassiveEffect":
@@ -80,16 +90,33 @@ def decode_bytes(
             data["passive_effects"] = reader.tarray(module_passive_effect_reader)
         except Exception as e:
             reader.data.seek(0)
-            print(
-                f"Warning: Failed to decode passive effect, please report this: {e} ({bytes(b_bytes)!r})"
+            anomaly(
+                "module_decode_failed",
+                path,
+                module_type,
+                "Failed to decode passive effect, please report this: %s (%s)",
+                e,
+                hexdump(b_bytes),
             )
             return {"values": b_bytes}
     else:
-        print(f"Warning: Unknown base camp module type {module_type}, skipping")
+        anomaly(
+            "unknown_module_type",
+            path,
+            module_type,
+            "Unknown base camp module type %s, skipping",
+            module_type,
+        )
         return {"values": b_bytes}
 
     if not reader.eof():
-        print(f"Warning: EOF not reached for {module_type}")
+        anomaly(
+            "trailing_unparsed_data",
+            path,
+            module_type,
+            "EOF not reached for %s",
+            module_type,
+        )
 
     return data
 
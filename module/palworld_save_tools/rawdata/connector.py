@@ -1,6 +1,8 @@
+import logging
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
 
 
 def decode(
@@ -10,7 +12,7 @@ def decode(
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
     data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value["value"] = decode_bytes(reader, data_bytes, path=path)
     return value
 
 
@@ -27,7 +29,7 @@ def connect_info_item_writer(writer: FArchiveWriter, properties: dict[str, Any])
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, c_bytes: Sequence[int]
+    parent_reader: FArchiveReader, c_bytes: Sequence[int], path: str = ""
 ) -> Optional[dict[str, Any]]:
     if len(c_bytes) == 0:
         return {"values": []}
@@ -54,12 +56,23 @@ def decode_bytes(
                     }
                 )
             if len(data["other_connectors"]) not in [2, 4]:
-                print(
-                    f"Warning: unknown connector type with {len(data['other_connectors'])} connectors"
+                anomaly(
+                    "unknown_connector_count",
+                    path,
+                    len(data["other_connectors"]),
+                    "Unknown connector type with %d connectors",
+                    len(data["other_connectors"]),
                 )
         return data
     except Exception as e:
-        print(f"Error in decode_bytes: {e}")
+        anomaly(
+            "decode_failed",
+            path,
+            type(e).__name__,
+            "Error in decode_bytes: %s",
+            e,
+            level=logging.ERROR,
+        )
         return {"raw_bytes": c_bytes}
 
 
@@ -1,6 +1,7 @@
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
 
 
 def decode(
@@ -10,12 +11,12 @@ def decode(
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
     data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value["value"] = decode_bytes(reader, data_bytes, path=path)
     return value
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, c_bytes: Sequence[int]
+    parent_reader: FArchiveReader, c_bytes: Sequence[int], path: str = ""
 ) -> Optional[dict[str, Any]]:
     if len(c_bytes) == 0:
         return None
@@ -47,8 +48,13 @@ def decode_bytes(
                 raise Exception("Warning: EOF not reached")
             data |= temp_data
         except Exception as e:
-            print(
-                f"Warning: Failed to parse weapon data, continuing as raw data {buf!r}: {e}"
+            anomaly(
+                "weapon_parse_failed",
+                path,
+                type(e).__name__,
+                "Failed to parse weapon data, continuing as raw data %r: %s",
+                buf,
+                e,
             )
             reader.data.seek(cur_pos)
             data["trailer"] = [int(b) for b in reader.read_to_end()]
@@ -1,6 +1,17 @@
-from typing import Any, Sequence
+from collections.abc import Mapping
+from typing import Any, Iterator, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GRID_PATH = ".worldSaveData.FoliageGridSaveDataMap"
+PATH = GRID_PATH + ".Value.ModelMap.Value.InstanceDataMap.Value.RawData"
+ROTATOR_SCALE = 360.0 / 65536.0
 
 
 def decode(
@@ -10,12 +21,12 @@ def decode(
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
     data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value["value"] = decode_bytes(reader, data_bytes, path=path)
     return value
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, b_bytes: Sequence[int]
+    parent_reader: FArchiveReader, b_bytes: Sequence[int], path: str = ""
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(bytes(b_bytes), debug=False)
     data: dict[str, Any] = {}
@@ -37,6 +48,13 @@ def decode_bytes(
     }
     data["hp"] = reader.i32()
     if not reader.eof():
+        anomaly(
+            "trailing_unparsed_data",
+            path,
+            "",
+            "EOF not reached, %d bytes left",
+            reader.size - reader.data.tell(),
+        )
         data["trailing_unparsed_data"] = [b for b in reader.read_to_end()]
     return data
 
@@ -73,3 +91,270 @@ def encode_bytes(p: dict[str, Any]) -> bytes:
         writer.write(bytes(p["trailing_unparsed_data"]))
     encoded_bytes = writer.bytes()
     return encoded_bytes
+
+
+# Columnar decoding, needs numpy. Instances are grouped by byte layout, which
+# only varies with the rotator components present and the packed vector
+# header, and each group is decoded with one array operation per field.
+
+
+def columnar_properties(
+    custom_properties: dict[str, tuple[Callable, Callable]],
+) -> dict[str, tuple[Callable, Callable]]:
+    """``custom_properties`` with FoliageGridSaveDataMap decoded by column.
+
+    Each grid cell entry gets an ``instances`` FoliageInstances holding the
+    instances of all its models, and each instance RawData value becomes a
+    view of its row that reads like a ``decode_bytes`` dict.
+    """
+    if np is None:
+        raise ImportError("numpy is required to decode foliage instances by column")
+    properties = dict(custom_properties)
+    properties[GRID_PATH] = (decode_grid, encode_grid)
+    properties[PATH] = (decode_raw, encode)
+    return properties
+
+
+def decode_grid(
+    reader: FArchiveReader, type_name: str, size: int, path: str
+) -> dict[str, Any]:
+    if type_name != "MapProperty":
+        raise Exception(f"Expected MapProperty, got {type_name}")
+    value = reader.property(type_name, size, path, nested_caller_path=path)
+    raw_data_path = f"{path}.Value.ModelMap.Value.InstanceDataMap.Value.RawData"
+    for cell in value["value"]:
+        raw_data = [
+            instance["value"]["RawData"]
+            for model in cell["value"]["ModelMap"]["value"]
+            for instance in model["value"]["InstanceDataMap"]["value"]
+        ]
+        instances = decode_columns(
+            [raw["value"]["values"] for raw in raw_data], path=raw_data_path
+        )
+        for index, raw in enumerate(raw_data):
+            raw["value"] = FoliageInstance(instances, index)
+        cell["instances"] = instances
+    return value
+
+
+def encode_grid(
+    writer: FArchiveWriter, property_type: str, properties: dict[str, Any]
+) -> int:
+    if property_type != "MapProperty":
+        raise Exception(f"Expected MapProperty, got {property_type}")
+    del properties["custom_type"]
+    return writer.property_inner(property_type, properties)
+
+
+def decode_raw(
+    reader: FArchiveReader, type_name: str, size: int, path: str
+) -> dict[str, Any]:
+    # Keep the instance as one bytes slice for decode_grid to batch
+    if type_name != "ArrayProperty":
+        raise Exception(f"Expected ArrayProperty, got {type_name}")
+    array_type = reader.fstring()
+    if array_type != "ByteProperty":
+        raise Exception(f"Expected ByteProperty array, got {array_type}")
+    _id = reader.optional_guid()
+    count = reader.u32()
+    if count != size - 4:
+        raise Exception("Labelled ByteProperty not implemented")
+    return {
+        "array_type": array_type,
+        "id": _id,
+        "value": {"values": reader.read(count)},
+    }
+
+
+class FoliageInstances:
+    """Foliage instances decoded column by column into numpy arrays.
+
+    ``model_instance_id`` is an (n, 16) uint8 array of GUID bytes,
+    ``rotator`` (pitch, yaw, roll) and ``location`` (x, y, z) are (n, 3)
+    float64 arrays, ``scale_x`` is float32 and ``hp`` int32.
+    ``location_int`` marks locations packed without scaling, which
+    ``decode_bytes`` returns as ints. Bytes left after an instance are kept
+    in ``trailing`` by index. ``instances[i]`` is a read-only view of row i
+    that reads like the ``decode_bytes`` dict.
+    """
+
+    def __init__(self, count: int) -> None:
+        self.model_instance_id = np.zeros((count, 16), np.uint8)
+        self.rotator = np.zeros((count, 3), np.float64)
+        self.location = np.zeros((count, 3), np.float64)
+        self.location_int = np.zeros(count, np.bool_)
+        self.scale_x = np.zeros(count, np.float32)
+        self.hp = np.zeros(count, np.int32)
+        self.trailing: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.hp)
+
+    def __getitem__(self, index: int) -> "FoliageInstance":
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return FoliageInstance(self, index % len(self))
+
+    def __iter__(self) -> Iterator["FoliageInstance"]:
+        for index in range(len(self)):
+            yield FoliageInstance(self, index)
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            "model_instance_id": [
+                str(UUID(bytes(row))) for row in self.model_instance_id
+            ],
+            "rotator": self.rotator.tolist(),
+            "location": self.location.tolist(),
+            "scale_x": self.scale_x.tolist(),
+            "hp": self.hp.tolist(),
+            "trailing": {index: list(data) for index, data in self.trailing.items()},
+        }
+
+
+class FoliageInstance(Mapping):
+    """Row ``index`` of a FoliageInstances, keyed like ``decode_bytes``."""
+
+    __slots__ = ("instances", "index")
+
+    def __init__(self, instances: FoliageInstances, index: int) -> None:
+        self.instances = instances
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        instances, index = self.instances, self.index
+        if key == "model_instance_id":
+            return UUID(bytes(instances.model_instance_id[index]))
+        if key == "world_transform":
+            pitch, yaw, roll = instances.rotator[index].tolist()
+            location = instances.location[index].tolist()
+            if instances.location_int[index]:
+                location = [int(v) for v in location]
+            x, y, z = location
+            return {
+                "rotator": {"pitch": pitch, "yaw": yaw, "roll": roll},
+                "location": {"x": x, "y": y, "z": z},
+                "scale_x": float(instances.scale_x[index]),
+            }
+        if key == "hp":
+            return int(instances.hp[index])
+        if key == "trailing_unparsed_data" and index in instances.trailing:
+            return list(instances.trailing[index])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "model_instance_id"
+        yield "world_transform"
+        yield "hp"
+        if self.index in self.instances.trailing:
+            yield "trailing_unparsed_data"
+
+    def __len__(self) -> int:
+        return 4 if self.index in self.instances.trailing else 3
+
+
+def _layout(blob: bytes) -> Optional[tuple]:
+    # (rotator components present, packed vector header, size), None where
+    # the instance does not end right after hp
+    pos = 16
+    present = []
+    for _ in range(3):
+        if pos >= len(blob):
+            return None
+        present.append(blob[pos] > 0)
+        pos += 3 if blob[pos] else 1
+    if pos + 4 > len(blob):
+        return None
+    header = int.from_bytes(blob[pos : pos + 4], "little")
+    bits = header & 63
+    if bits:
+        pos += 4 + 3 * ((bits + 7) // 8)
+    else:
+        pos += 4 + (24 if header >> 6 else 12)
+    if pos + 8 != len(blob):
+        return None
+    return tuple(present), header, len(blob)
+
+
+def _column(rows: Any, pos: int, dtype: str) -> Any:
+    size = np.dtype(dtype).itemsize
+    return np.ascontiguousarray(rows[:, pos : pos + size]).view(dtype)[:, 0]
+
+
+def _decode_group(
+    instances: FoliageInstances, layout: tuple, blobs: list[bytes], index: Any
+) -> None:
+    present, header, size = layout
+    rows = np.frombuffer(b"".join(blobs), np.uint8).reshape(len(blobs), size)
+    instances.model_instance_id[index] = rows[:, :16]
+    pos = 16
+    for axis, is_present in enumerate(present):
+        pos += 1
+        if is_present:
+            instances.rotator[index, axis] = _column(rows, pos, "<u2") * ROTATOR_SCALE
+            pos += 2
+    bits = header & 63
+    pos += 4
+    if bits:
+        width = (bits + 7) // 8
+        sign_bit = 1 << (bits - 1)
+        for axis in range(3):
+            value = np.zeros(len(blobs), np.int64)
+            for byte in range(width):
+                value |= rows[:, pos + byte].astype(np.int64) << (8 * byte)
+            # same as serializeint masking the top byte to the bits used
+            value &= (1 << bits) - 1
+            instances.location[index, axis] = (value & (sign_bit - 1)) - (
+                value & sign_bit
+            )
+            pos += width
+        instances.location_int[index] = not header >> 6
+    else:
+        dtype = "<f8" if header >> 6 else "<f4"
+        for axis in range(3):
+            instances.location[index, axis] = _column(rows, pos, dtype)
+            pos += np.dtype(dtype).itemsize
+    instances.scale_x[index] = _column(rows, pos, "<f4")
+    instances.hp[index] = _column(rows, pos + 4, "<i4")
+
+
+def _decode_one(
+    instances: FoliageInstances, blob: bytes, index: int, path: str
+) -> None:
+    data = decode_bytes(FArchiveReader(b""), blob, path=path)
+    transform = data["world_transform"]
+    instances.model_instance_id[index] = np.frombuffer(
+        data["model_instance_id"].raw_bytes, np.uint8
+    )
+    instances.rotator[index] = [
+        transform["rotator"][k] for k in ("pitch", "yaw", "roll")
+    ]
+    location = [transform["location"][k] for k in ("x", "y", "z")]
+    instances.location[index] = location
+    instances.location_int[index] = all(isinstance(v, int) for v in location)
+    instances.scale_x[index] = transform["scale_x"]
+    instances.hp[index] = data["hp"]
+    if "trailing_unparsed_data" in data:
+        instances.trailing[index] = bytes(data["trailing_unparsed_data"])
+
+
+def decode_columns(blobs: Sequence[bytes], path: str = "") -> FoliageInstances:
+    """Decode instance RawData blobs into one FoliageInstances."""
+    if np is None:
+        raise ImportError("numpy is required to decode foliage instances by column")
+    instances = FoliageInstances(len(blobs))
+    groups: dict[Optional[tuple], list[int]] = {}
+    for index, blob in enumerate(blobs):
+        groups.setdefault(_layout(blob), []).append(index)
+    for layout, indices in groups.items():
+        if layout is None:
+            for index in indices:
+                _decode_one(instances, bytes(blobs[index]), index, path)
+        else:
+            _decode_group(
+                instances,
+                layout,
+                [bytes(blobs[index]) for index in indices],
+                np.array(indices),
+            )
+    return instances
@@ -1,6 +1,8 @@
+import logging
 from typing import Any, Sequence, Optional
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly
 
 
 def decode(
@@ -11,15 +13,30 @@ def decode(
     value = reader.property(type_name, size, path, nested_caller_path=path)
     # Decode the raw bytes and replace the raw data
     group_map = value["value"]
+    raw_data_path = f"{path}.Value.RawData"
     for group in group_map:
         try:
             group_type = group["value"]["GroupType"]["value"]["value"]
             group_bytes = group["value"]["RawData"]["value"]["values"]
             group["value"]["RawData"]["value"] = decode_bytes(
-                reader, group_bytes, group_type
+                reader, group_bytes, group_type, path=raw_data_path
             )
         except Exception as e:
-            print(f"Error decoding group of type {group.get('value', {}).get('GroupType', {}).get('value', {}).get('value', 'unknown')}: {e}")
+            group_type = (
+                group.get("value", {})
+                .get("GroupType", {})
+                .get("value", {})
+                .get("value", "unknown")
+            )
+            anomaly(
+                "decode_failed",
+                raw_data_path,
+                group_type,
+                "Error decoding group of type %s: %s",
+                group_type,
+                e,
+                level=logging.ERROR,
+            )
             # Keep the raw bytes if we can't decode
             if "value" in group and "RawData" in group["value"] and "value" in group["value"]["RawData"]:
                 group["value"]["RawData"]["value"] = {"values": group_bytes, "error": str(e)}
@@ -27,7 +44,10 @@ def decode(
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, group_bytes: Sequence[int], group_type: str
+    parent_reader: FArchiveReader,
+    group_bytes: Sequence[int],
+    group_type: str,
+    path: str = "",
 ) -> dict[str, Any]:
     if len(group_bytes) == 0:
         return {"values": []}
@@ -49,14 +69,26 @@ def decode_bytes(
         ]:
             # Check that we have enough data before reading
             if reader.data.tell() + 1 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read org_type for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read org_type for %s",
+                    group_type,
+                )
                 group_data["org_type"] = 0  # Default value
             else:
                 group_data["org_type"] = reader.byte()
 
             # Check that we have enough data for the tarray header
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read base_ids for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read base_ids for %s",
+                    group_type,
+                )
                 group_data["base_ids"] = []  # Empty list
             else:
                 group_data["base_ids"] = reader.tarray(uuid_reader)
@@ -64,19 +96,37 @@ def decode_bytes(
         # Handle guild-specific data
         if group_type in ["EPalGroupType::Guild", "EPalGroupType::IndependentGuild"]:
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read base_camp_level for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read base_camp_level for %s",
+                    group_type,
+                )
                 group_data["base_camp_level"] = 0  # Default value
             else:
                 group_data["base_camp_level"] = reader.i32()
 
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read map_object_instance_ids_base_camp_points for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read map_object_instance_ids_base_camp_points for %s",
+                    group_type,
+                )
                 group_data["map_object_instance_ids_base_camp_points"] = []  # Empty list
             else:
                 group_data["map_object_instance_ids_base_camp_points"] = reader.tarray(uuid_reader)
 
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read guild_name for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read guild_name for %s",
+                    group_type,
+                )
                 group_data["guild_name"] = ""  # Empty string
             else:
                 group_data["guild_name"] = reader.fstring()
@@ -84,19 +134,37 @@ def decode_bytes(
         # Handle independent guild data
         if group_type == "EPalGroupType::IndependentGuild":
             if reader.data.tell() + 16 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read player_uid for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read player_uid for %s",
+                    group_type,
+                )
                 group_data["player_uid"] = UUID(bytes(b'\0' * 16))  # Default UUID
             else:
                 group_data["player_uid"] = reader.guid()
 
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read guild_name_2 for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read guild_name_2 for %s",
+                    group_type,
+                )
                 group_data["guild_name_2"] = ""  # Empty string
             else:
                 group_data["guild_name_2"] = reader.fstring()
 
             if reader.data.tell() + 12 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read player_info for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read player_info for %s",
+                    group_type,
+                )
                 group_data["player_info"] = {
                     "last_online_real_time": 0,
                     "player_name": "",
@@ -110,20 +178,38 @@ def decode_bytes(
         # Handle guild data
         if group_type == "EPalGroupType::Guild":
             if reader.data.tell() + 16 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read admin_player_uid for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read admin_player_uid for %s",
+                    group_type,
+                )
                 group_data["admin_player_uid"] = UUID(bytes(b'\0' * 16))  # Default UUID
             else:
                 group_data["admin_player_uid"] = reader.guid()
 
             if reader.data.tell() + 4 > len(reader.data.getvalue()):
-                print(f"Warning: Not enough data to read player_count for {group_type}")
+                anomaly(
+                    "truncated",
+                    path,
+                    group_type,
+                    "Not enough data to read player_count for %s",
+                    group_type,
+                )
                 group_data["players"] = []  # Empty list
             else:
                 player_count = reader.i32()
                 group_data["players"] = []
                 for _ in range(player_count):
                     if reader.data.tell() + 16 > len(reader.data.getvalue()):
-                        print(f"Warning: Not enough data to read player_uid in players for {group_type}")
+                        anomaly(
+                            "truncated",
+                            path,
+                            group_type,
+                            "Not enough data to read player_uid in players for %s",
+                            group_type,
+                        )
                         break
 
                     try:
@@ -136,16 +222,40 @@ def decode_bytes(
                         }
                         group_data["players"].append(player)
                     except Exception as e:
-                        print(f"Error reading player in players for {group_type}: {e}")
+                        anomaly(
+                            "decode_failed",
+                            path,
+                            group_type,
+                            "Error reading player in players for %s: %s",
+                            group_type,
+                            e,
+                            level=logging.ERROR,
+                        )
                         break
 
         # Store any trailing data
         if not reader.eof():
+            anomaly(
+                "trailing_unparsed_data",
+                path,
+                group_type,
+                "EOF not reached for %s, %d bytes left",
+                group_type,
+                reader.size - reader.data.tell(),
+            )
             group_data["trailing_unparsed_data"] = [b for b in reader.read_to_end()]
 
         return group_data
     except Exception as e:
-        print(f"Error decoding group data of type {group_type}: {e}")
+        anomaly(
+            "decode_failed",
+            path,
+            group_type,
+            "Error decoding group data of type %s: %s",
+            group_type,
+            e,
+            level=logging.ERROR,
+        )
         # Return what we have with an error flag
         return {"group_type": group_type, "values": group_bytes, "error": str(e)}
 
@@ -1,6 +1,7 @@
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly, hexdump
 from palworld_save_tools.rawdata.common import (
     pal_item_and_num_read,
     pal_item_and_slot_writer,
@@ -350,7 +351,10 @@ NO_OP_TYPES = set(
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, m_bytes: Sequence[int], object_id: str
+    parent_reader: FArchiveReader,
+    m_bytes: Sequence[int],
+    object_id: str,
+    path: str = "",
 ) -> Optional[dict[str, Any]]:
     if len(m_bytes) == 0:
         return {"values": []}
@@ -358,7 +362,13 @@ def decode_bytes(
     data: dict[str, Any] = {}
 
     if object_id.lower() not in MAP_OBJECT_NAME_TO_CONCRETE_MODEL_CLASS:
-        print(f"Warning: Map object '{object_id}' not in database, skipping")
+        anomaly(
+            "unknown_map_object",
+            path,
+            object_id,
+            "Map object '%s' not in database, skipping",
+            object_id,
+        )
         return {"values": m_bytes}
 
     # Base handling
@@ -445,14 +455,25 @@ def decode_bytes(
     elif map_object_concrete_model == "PalMapObjectBaseCampPoint":
         data["base_camp_id"] = reader.guid()
     else:
-        print(
-            f"Warning: Unknown map object concrete model {map_object_concrete_model}, skipping"
+        anomaly(
+            "unknown_concrete_model",
+            path,
+            map_object_concrete_model,
+            "Unknown map object concrete model %s, skipping",
+            map_object_concrete_model,
         )
         return {"values": m_bytes}
 
     if not reader.eof():
-        print(
-            f"Warning: EOF not reached for {object_id} {map_object_concrete_model}: ori: {''.join(f'{b:02x}' for b in m_bytes)} remaining: {reader.size - reader.data.tell()}"
+        anomaly(
+            "trailing_unparsed_data",
+            path,
+            map_object_concrete_model,
+            "EOF not reached for %s %s: ori: %s remaining: %d",
+            object_id,
+            map_object_concrete_model,
+            hexdump(m_bytes),
+            reader.size - reader.data.tell(),
         )
         data["trailing_unparsed_data"] = [b for b in reader.read_to_end()]
     return data
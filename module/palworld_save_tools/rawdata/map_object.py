@@ -16,10 +16,15 @@ def decode(
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
+    model_path = f"{path}.MapObjectSaveData.Model.RawData"
+    connector_path = f"{path}.MapObjectSaveData.Model.Connector.RawData"
+    concrete_model_path = f"{path}.MapObjectSaveData.ConcreteModel.RawData"
     for map_object in value["value"]["values"]:
         # Decode Model
         map_object["Model"]["value"]["RawData"]["value"] = map_model.decode_bytes(
-            reader, map_object["Model"]["value"]["RawData"]["value"]["values"]
+            reader,
+            map_object["Model"]["value"]["RawData"]["value"]["values"],
+            path=model_path,
         )
         # Decode Model.Connector
         map_object["Model"]["value"]["Connector"]["value"]["RawData"]["value"] = (
@@ -28,6 +33,7 @@ def decode(
                 map_object["Model"]["value"]["Connector"]["value"]["RawData"]["value"][
                     "values"
                 ],
+                path=connector_path,
             )
         )
         # Decode Model.BuildProcess
@@ -46,6 +52,7 @@ def decode(
                 reader,
                 map_object["ConcreteModel"]["value"]["RawData"]["value"]["values"],
                 map_object_id,
+                path=concrete_model_path,
             )
         )
         # Decode ConcreteModel.ModuleMap
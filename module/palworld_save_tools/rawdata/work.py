@@ -1,6 +1,7 @@
 from typing import Any, Sequence
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.diagnostics import anomaly, hexdump, logger
 
 WORK_BASE_TYPES = set(
     [
@@ -29,20 +30,27 @@ def decode(
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
     value = reader.property(type_name, size, path, nested_caller_path=path)
+    raw_data_path = f"{path}.WorkSaveData.RawData"
+    assign_path = f"{path}.WorkSaveData.WorkAssignMap.Value.RawData"
     for work_element in value["value"]["values"]:
         work_bytes = work_element["RawData"]["value"]["values"]
         work_type = work_element["WorkableType"]["value"]["value"]
-        work_element["RawData"]["value"] = decode_bytes(reader, work_bytes, work_type)
+        work_element["RawData"]["value"] = decode_bytes(
+            reader, work_bytes, work_type, path=raw_data_path
+        )
         for work_assign in work_element["WorkAssignMap"]["value"]:
             work_assign_bytes = work_assign["value"]["RawData"]["value"]["values"]
             work_assign["value"]["RawData"]["value"] = decode_work_assign_bytes(
-                reader, work_assign_bytes
+                reader, work_assign_bytes, path=assign_path
             )
     return value
 
 
 def decode_bytes(
-    parent_reader: FArchiveReader, b_bytes: Sequence[int], work_type: str
+    parent_reader: FArchiveReader,
+    b_bytes: Sequence[int],
+    work_type: str,
+    path: str = "",
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(bytes(b_bytes), debug=False)
     data: dict[str, Any] = {}
@@ -102,7 +110,13 @@ def decode_bytes(
             data["target_map_object_model_id"] = reader.guid()
 
     if len(data.keys()) == 0:
-        print(f"Warning, unable to parse {work_type}, falling back to raw bytes")
+        anomaly(
+            "work_unparsed",
+            path,
+            work_type,
+            "Unable to parse %s, falling back to raw bytes",
+            work_type,
+        )
         return {"values": b_bytes}
     # UPalWorkProgressTransformBase->SerializeProperties
     transform_type = reader.byte()
@@ -116,8 +130,14 @@ def decode_bytes(
         data["transform"]["instance_id"] = reader.guid()
     else:
         remaining_data = reader.read_to_end()
-        print(
-            f"Unknown EPalWorkTransformType, please report this: {transform_type}: {work_type}: {''.join(f'{b:02x}' for b in remaining_data)}"
+        anomaly(
+            "unknown_transform_type",
+            path,
+            transform_type,
+            "Unknown EPalWorkTransformType, please report this: %s: %s: %s",
+            transform_type,
+            work_type,
+            hexdump(remaining_data),
         )
         data["transform"]["raw_data"] = [b for b in remaining_data]
 
@@ -130,7 +150,7 @@ def decode_bytes(
 
 
 def decode_work_assign_bytes(
-    parent_reader: FArchiveReader, b_bytes: Sequence[int]
+    parent_reader: FArchiveReader, b_bytes: Sequence[int], path: str = ""
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(bytes(b_bytes), debug=False)
     data: dict[str, Any] = {}
@@ -146,8 +166,14 @@ def decode_work_assign_bytes(
     data["fixed"] = reader.u32() > 0
 
     if not reader.eof():
+        anomaly(
+            "trailing_unparsed_data",
+            path,
+            "",
+            "EOF not reached, %d bytes left",
+            reader.size - reader.data.tell(),
+        )
         data["trailing_unparsed_data"] = [b for b in reader.read_to_end()]
-        # raise Exception("Warning: EOF not reached")
 
     return data
 
@@ -249,8 +275,10 @@ def encode_bytes(p: dict[str, Any], work_type: str) -> bytes:
         writer.guid(p["transform"]["guid"])
         writer.guid(p["transform"]["instance_id"])
     else:
-        print(
-            f"Unknown EPalWorkTransformType, please report this: {transform_type}: {work_type}"
+        logger.warning(
+            "Unknown EPalWorkTransformType, please report this: %s: %s",
+            transform_type,
+            work_type,
         )
         # Convert list to bytes if necessary
         if isinstance(p["transform"]["raw_data"], list):
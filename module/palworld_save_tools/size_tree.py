@@ -0,0 +1,316 @@
+"""Size breakdown of a save read from property tags alone.
+
+Every property tag carries the size of its value, so a save can be walked
+by reading tags and seeking past the values. Struct bodies are entered to
+reach the tags inside them and the entries of maps and struct arrays are
+walked one by one to size them; everything else, raw data included, is
+skipped without being decoded.
+"""
+
+import heapq
+from typing import Any, Optional, TextIO
+
+from palworld_save_tools.archive import UUID, FArchiveReader
+from palworld_save_tools.gvas import GvasHeader
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_TYPE_HINTS
+
+# Struct types read as fixed-size values rather than property lists
+FIXED_STRUCTS = {
+    "Vector": 24,
+    "DateTime": 8,
+    "Guid": 16,
+    "Quat": 32,
+    "LinearColor": 16,
+}
+FIXED_VALUES = {"IntProperty": 4, "BoolProperty": 1}
+
+WORLD_PATH = ".worldSaveData"
+# Seconds and bytes of memory a full GvasFile.read with the Palworld custom
+# properties costs per byte of each worldSaveData section, measured on
+# synthetic worlds (bench.synth). Time varies with the host, so estimates
+# are best compared with each other rather than taken as wall times.
+SECTION_COSTS = {
+    "CharacterSaveParameterMap": (1.5e-7, 8.5),
+    "ItemContainerSaveData": (3.0e-7, 11.0),
+    "MapObjectSaveData": (1.6e-7, 8.0),
+    "GroupSaveDataMap": (1.0e-7, 11.5),
+}
+DEFAULT_COST = (2.0e-7, 10.0)
+
+
+class PathSize:
+    __slots__ = ("count", "bytes", "tags", "entries", "largest")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.bytes = 0
+        # property tags at or under the path
+        self.tags = 0
+        # map or struct array entries
+        self.entries = 0
+        # min-heap of (bytes, label) of the largest entries
+        self.largest: list[tuple[int, str]] = []
+
+    def dump(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "count": self.count,
+            "bytes": self.bytes,
+            "tags": self.tags,
+        }
+        if self.entries:
+            data["entries"] = self.entries
+            data["largest"] = [
+                {"key": label, "bytes": size}
+                for size, label in sorted(self.largest, reverse=True)
+            ]
+        return data
+
+
+class SizeTree:
+    """Bytes, occurrences and tags per property path of one save."""
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.paths: dict[str, PathSize] = {}
+        self.header: Optional[GvasHeader] = None
+        self.gvas_bytes = 0
+        self.sav_bytes = 0
+        self.tags = 0
+
+    def stats(self, path: str) -> PathSize:
+        stats = self.paths.get(path)
+        if stats is None:
+            stats = self.paths[path] = PathSize()
+        return stats
+
+    def add(self, path: str, size: int, tags: int, entries: int) -> None:
+        stats = self.stats(path)
+        stats.count += 1
+        stats.bytes += size
+        stats.tags += tags
+        stats.entries += entries
+
+    def entry(self, path: str, label: str, size: int) -> None:
+        largest = self.stats(path).largest
+        if len(largest) < self.top:
+            heapq.heappush(largest, (size, label))
+        elif size > largest[0][0]:
+            heapq.heapreplace(largest, (size, label))
+
+    def sections(self) -> dict[str, PathSize]:
+        prefix = WORLD_PATH + "."
+        return {
+            path[len(prefix) :]: stats
+            for path, stats in self.paths.items()
+            if path.startswith(prefix) and "." not in path[len(prefix) :]
+        }
+
+    def estimate(self) -> dict[str, float]:
+        """Rough time and memory a full parse of the save takes."""
+        # the decompressed save stays in memory while it is parsed
+        seconds, memory = 0.0, float(self.gvas_bytes)
+        rest = self.gvas_bytes
+        for name, stats in self.sections().items():
+            per_byte_seconds, per_byte_memory = SECTION_COSTS.get(name, DEFAULT_COST)
+            seconds += stats.bytes * per_byte_seconds
+            memory += stats.bytes * per_byte_memory
+            rest -= stats.bytes
+        seconds += rest * DEFAULT_COST[0]
+        memory += rest * DEFAULT_COST[1]
+        return {"parse_seconds": seconds, "memory_bytes": memory}
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            "save_game_class_name": (
+                self.header.save_game_class_name if self.header else None
+            ),
+            "sav_bytes": self.sav_bytes,
+            "gvas_bytes": self.gvas_bytes,
+            "tags": self.tags,
+            "estimate": self.estimate(),
+            "paths": {path: stats.dump() for path, stats in self.paths.items()},
+        }
+
+    def children(self) -> dict[str, list[str]]:
+        """Paths under their nearest recorded ancestor, largest first."""
+        children: dict[str, list[str]] = {}
+        for path in self.paths:
+            parent = path
+            while parent:
+                parent = parent.rsplit(".", 1)[0]
+                if parent in self.paths:
+                    break
+            children.setdefault(parent, []).append(path)
+        for paths in children.values():
+            paths.sort(key=lambda p: self.paths[p].bytes, reverse=True)
+        return children
+
+    def report(self, out: TextIO, root: str = WORLD_PATH, depth: int = 2) -> None:
+        estimate = self.estimate()
+        out.write(
+            f"{self.sav_bytes:,d} bytes compressed, {self.gvas_bytes:,d} bytes "
+            f"decompressed, {self.tags:,d} property tags\n"
+            f"full parse estimate: {estimate['parse_seconds']:.1f}s, "
+            f"{estimate['memory_bytes'] / (1 << 20):,.0f}MB\n"
+            f"{'bytes':>13} {'share':>6} {'count':>8} {'entries':>8}  path\n"
+        )
+        children = self.children()
+        parent_of = {
+            child: parent for parent, paths in children.items() for child in paths
+        }
+        total = self.gvas_bytes or 1
+
+        def write(path: str, level: int) -> None:
+            stats = self.paths[path]
+            name = path if level == 0 else path[len(parent_of[path]) :]
+            entries = f"{stats.entries:8d}" if stats.entries else f"{'':8}"
+            out.write(
+                f"{stats.bytes:13,d} {stats.bytes / total:6.1%} {stats.count:8d} "
+                f"{entries}  {'  ' * level}{name}\n"
+            )
+            for size, label in sorted(stats.largest, reverse=True):
+                out.write(
+                    f"{size:13,d} {size / total:6.1%} {'':8} {'':8}  "
+                    f"{'  ' * (level + 1)}[{label}]\n"
+                )
+            if level < depth:
+                for child in children.get(path, ()):
+                    write(child, level + 1)
+
+        roots = [root] if root in self.paths else children.get(root, [])
+        for path in roots:
+            write(path, 0)
+
+
+def _ranked(path: str) -> bool:
+    # entries are ranked in the top level sections only, nested maps and
+    # arrays repeat once per entry of their section
+    return path.count(".") <= 2
+
+
+def _key_label(key: Any) -> str:
+    if isinstance(key, dict):
+        # struct keys, e.g. PlayerUId and InstanceId
+        return ", ".join(
+            f"{name}={prop['value']}"
+            for name, prop in key.items()
+            if isinstance(prop.get("value"), (str, int, UUID)) and prop["value"] != ""
+        )
+    return str(key)
+
+
+class SizeWalker:
+    """Fills a SizeTree from decompressed save data."""
+
+    def __init__(
+        self,
+        data: bytes,
+        type_hints: dict[str, str] = PALWORLD_TYPE_HINTS,
+        top: int = 10,
+    ) -> None:
+        self.reader = FArchiveReader(data, type_hints=type_hints)
+        self.type_hints = type_hints
+        self.tree = SizeTree(top)
+        self.tree.gvas_bytes = len(data)
+
+    def walk(self) -> SizeTree:
+        self.tree.header = GvasHeader.read(self.reader)
+        self.tree.tags = self.properties("")
+        return self.tree
+
+    def properties(self, path: str) -> int:
+        reader = self.reader
+        tags = 0
+        while True:
+            start = reader.data.tell()
+            name = reader.fstring()
+            if name == "None":
+                break
+            type_name = reader.fstring()
+            size = reader.u64()
+            tags += self.property(type_name, size, f"{path}.{name}", start)
+        return tags
+
+    def property(self, type_name: str, size: int, path: str, start: int) -> int:
+        reader = self.reader
+        tags = 1
+        entries = 0
+        if type_name == "StructProperty":
+            struct_type = reader.fstring()
+            reader.guid()
+            reader.optional_guid()
+            end = reader.data.tell() + size
+            if struct_type not in FIXED_STRUCTS:
+                tags += self.properties(path)
+        elif type_name == "ArrayProperty":
+            array_type = reader.fstring()
+            reader.optional_guid()
+            end = reader.data.tell() + size
+            if array_type == "StructProperty":
+                entries = reader.u32()
+                prop_name = reader.fstring()
+                reader.fstring()
+                reader.u64()
+                struct_type = reader.fstring()
+                reader.guid()
+                reader.skip(1)
+                if struct_type not in FIXED_STRUCTS:
+                    tags += self.elements(path, f"{path}.{prop_name}", entries)
+        elif type_name == "MapProperty":
+            key_type = reader.fstring()
+            value_type = reader.fstring()
+            reader.optional_guid()
+            end = reader.data.tell() + size
+            reader.u32()
+            entries = reader.u32()
+            tags += self.map_entries(path, key_type, value_type, entries)
+        else:
+            reader.skip_property(type_name, size)
+            end = reader.data.tell()
+        reader.data.seek(end)
+        self.tree.add(path, end - start, tags, entries)
+        return tags
+
+    def elements(self, path: str, element_path: str, count: int) -> int:
+        data = self.reader.data
+        ranked = _ranked(path)
+        tags = 0
+        for i in range(count):
+            start = data.tell()
+            tags += self.properties(element_path)
+            if ranked:
+                self.tree.entry(path, str(i), data.tell() - start)
+        return tags
+
+    def map_entries(self, path: str, key_type: str, value_type: str, count: int) -> int:
+        reader = self.reader
+        key_path, value_path = f"{path}.Key", f"{path}.Value"
+        key_struct_type = self.type_hints.get(key_path, "Guid")
+        value_struct_type = self.type_hints.get(value_path, "StructProperty")
+        ranked = _ranked(path)
+        tags = 0
+        for _ in range(count):
+            start = reader.data.tell()
+            # keys are small and name the entry, so they are decoded
+            key = reader.prop_value(key_type, key_struct_type, key_path)
+            if value_type == "StructProperty":
+                if value_struct_type in FIXED_STRUCTS:
+                    reader.skip(FIXED_STRUCTS[value_struct_type])
+                else:
+                    tags += self.properties(value_path)
+            elif value_type in FIXED_VALUES:
+                reader.skip(FIXED_VALUES[value_type])
+            else:
+                reader.fstring()
+            if ranked:
+                self.tree.entry(path, _key_label(key), reader.data.tell() - start)
+        return tags
+
+
+def size_tree(data: bytes, top: int = 10) -> SizeTree:
+    """Size tree of the contents of a .sav file."""
+    gvas, _ = decompress_sav_to_gvas(data)
+    tree = SizeWalker(gvas, top=top).walk()
+    tree.sav_bytes = len(data)
+    return tree
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+
+CACHE_VERSION = 1
+
+
+class PlayerCache:
+    """Inventory results of Players/*.sav kept on disk between runs.
+
+    Entries are stored per file name rather than full path, since the backend
+    copies saves into a fresh temporary directory for every sync. A file is a
+    hit when its size and mtime_ns match the entry; with ``hash_content`` a
+    stat mismatch falls back to comparing a blake2b digest of the file, which
+    keeps copies that lost their mtime cacheable.
+    """
+
+    def __init__(self, cache_dir, hash_content=False):
+        self.cache_dir = cache_dir
+        self.hash_content = hash_content
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, sav_file):
+        name = os.path.splitext(os.path.basename(sav_file))[0]
+        return os.path.join(self.cache_dir, name + ".json")
+
+    @staticmethod
+    def _digest(sav_file):
+        h = hashlib.blake2b(digest_size=16)
+        with open(sav_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def get(self, sav_file):
+        """Look up ``sav_file``, returning ``(value, key)``.
+
+        ``value`` is None on a miss. ``key`` describes the file as it was
+        before parsing and is handed back to ``put``, so a file rewritten
+        while it is being parsed is not cached under its new stat.
+        """
+        try:
+            st = os.stat(sav_file)
+        except OSError:
+            return None, None
+        key = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": None}
+        try:
+            with open(self._entry_path(sav_file), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = {}
+        if self.hash_content:
+            if entry.get("mtime_ns") != st.st_mtime_ns or entry.get("hash") is None:
+                key["hash"] = self._digest(sav_file)
+            else:
+                key["hash"] = entry["hash"]
+        if (
+            entry.get("version") != CACHE_VERSION
+            or entry.get("size") != key["size"]
+            or (
+                entry.get("mtime_ns") != key["mtime_ns"]
+                and (key["hash"] is None or entry.get("hash") != key["hash"])
+            )
+        ):
+            self.misses += 1
+            return None, key
+        if entry["mtime_ns"] != key["mtime_ns"]:
+            # same content under a new mtime, refresh the entry
+            self.put(sav_file, key, entry["value"])
+        self.hits += 1
+        return entry["value"], key
+
+    def put(self, sav_file, key, value):
+        if key is None:
+            return
+        entry = {"version": CACHE_VERSION, **key, "value": value}
+        entry_path = self._entry_path(sav_file)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -4,14 +4,45 @@ import json
 import shutil
 import time
 import argparse
-from urllib.parse import urljoin
-import requests
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-from structurer import convert_sav, structure_player, structure_guild
+from startup import timed_import, process_age, report as startup_report
+
+with timed_import("structurer"):
+    import structurer
+    from structurer import convert_sav, structure_player, structure_guild
+from player_cache import PlayerCache
+from metrics import Metrics
+from memory import MB, MemoryMonitor, MemoryLimitExceeded
+from output import write_structure
+from watcher import find_level_sav, open_watcher, save_complete
+from sync_state import (
+    SyncState,
+    source_files,
+    source_fingerprint,
+    same_source,
+    player_fingerprint,
+    guild_fingerprint,
+)
 from logger import log
+from palworld_save_tools import diagnostics
 
-if __name__ == "__main__":
-    start = time.time()
+# Exit status telling the backend the save was unchanged and nothing was sent
+EXIT_UNCHANGED = 3
+# Longest a stream of writes may hold back a sync in watch mode, in seconds
+WATCH_MAX_SETTLE = 60
+
+
+class JobError(Exception):
+    pass
+
+
+class Unchanged(Exception):
+    """The save files match the last successful sync."""
+
+
+def build_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--file", "-f", help="File to convert", type=str, default="Level.sav"
@@ -20,27 +51,297 @@ if __name__ == "__main__":
     parser.add_argument(
         "--output", "-o", help="Output file", type=str, default="structure.json"
     )
+    parser.add_argument("--pretty", help="Indent the output file", action="store_true")
+    parser.add_argument(
+        "--gzip", help="Gzip the output file (.json.gz)", action="store_true"
+    )
     parser.add_argument("--request", "-r", help="Request", type=str, default="")
     parser.add_argument("--token", "-t", help="Request token", type=str, default="")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--state-file",
+        help="Fingerprints of the last sync, only changed records are uploaded",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--full-sync",
+        help="Upload every record even if a state file says it is unchanged",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--force",
+        help="Convert the save even if its files are unchanged since the last sync",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-compress",
+        help="Send uploads without gzip Content-Encoding",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        help="Processes used to read Players/*.sav (worlds with --batch), "
+        "defaults to the CPU count",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory caching Players/*.sav results between runs",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--cache-hash",
+        help="Compare content hashes when a cached player file's mtime changed",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--startup-report",
+        help="Log how long startup and each import group took",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--decode-profile",
+        help="Profile Level.sav decoding per property path, writing PREFIX.txt "
+        "and a flamegraph-compatible PREFIX.collapsed",
+        metavar="PREFIX",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        help="Write phase times, record counts and cache hit rates of each "
+        "job to this JSON file",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        help="Write the same metrics to this Prometheus textfile collector file",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--memory-report",
+        help="Log RSS and the top tracemalloc allocation sites after each phase",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        help="Abort a job with a diagnostic once its RSS passes this many MB, "
+        "0 disables the guard",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile the run with cProfile, writing PREFIX.pstats, a PREFIX.txt "
+        "summary and a flamegraph-compatible PREFIX.collapsed",
+        metavar="PREFIX",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--profile-sample",
+        help="Profile with a stack sampler instead of cProfile, which slows "
+        "the run down less but writes no PREFIX.pstats",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--diagnostics-level",
+        help="Lowest level of decoder diagnostics written",
+        choices=("debug", "info", "warning", "error", "off"),
+        default="warning",
+    )
+    parser.add_argument(
+        "--diagnostics-file",
+        help="Size-rotated file decoder diagnostics are written to, "
+        "empty for stderr",
+        type=str,
+        default="save-tools-out.txt",
+    )
+    parser.add_argument(
+        "--watch",
+        help="Save directory to watch, syncing after every game save",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--debounce",
+        help="Seconds the save must be quiet before a watch sync starts",
+        type=float,
+        default=5.0,
+    )
+    parser.add_argument(
+        "--poll-interval",
+        help="Seconds between checks where inotify is unavailable",
+        type=float,
+        default=2.0,
+    )
+    parser.add_argument(
+        "--watch-for",
+        help="Stop watching after this many seconds, 0 watches forever",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--batch",
+        help="JSON manifest of worlds to convert, see batch() for its format",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--serve",
+        help="Stay resident and read JSON jobs from stdin, one per line",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--inspect",
+        help="Print the size of each part of the save and an estimate of the "
+        "time and memory converting it takes as JSON, reading property headers "
+        "only",
+        action="store_true",
+    )
+    return parser
+
+
+def run_job(args, player_cache=None, executor=None, metrics=None):
+    """Convert one save and write or upload the result.
+
+    Returns the wall time of each phase in seconds. Finer phase times,
+    record counts, cache hit rates and decode anomalies are gathered in
+    ``metrics`` and written to ``--metrics-json`` and ``--metrics-prom``
+    whether the job succeeds or not. Anomalies are also logged as a summary.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    diagnostics.reset_anomalies()
+    memory = None
+    if args.memory_report or args.memory_limit:
+        memory = MemoryMonitor(
+            trace=args.memory_report, limit=int(args.memory_limit * MB)
+        )
+        metrics.memory = memory
+        memory.start()
+    try:
+        timings = convert_job(args, player_cache, executor, metrics)
+    except Unchanged:
+        metrics.finish("unchanged")
+        raise
+    except MemoryLimitExceeded as e:
+        metrics.finish("error")
+        raise JobError(str(e)) from None
+    except KeyboardInterrupt:
+        metrics.finish("error")
+        if memory is not None and memory.take_interrupt():
+            # interrupted by the memory guard, which logged the diagnostic
+            raise JobError(memory.diagnostic()) from None
+        raise
+    except BaseException:
+        metrics.finish("error")
+        raise
+    else:
+        metrics.finish()
+    finally:
+        late = None
+        if memory is not None:
+            try:
+                memory.stop()
+            except MemoryLimitExceeded as e:
+                # the guard interrupted the job as it was ending
+                metrics.finish("error")
+                late = e
+            if args.memory_report:
+                memory.report()
+        metrics.anomalies = diagnostics.anomalies()
+        diagnostics.log_anomalies()
+        write_metrics(args, metrics)
+        if late is not None:
+            raise JobError(str(late)) from None
+    return timings
+
+
+def write_metrics(args, metrics):
+    try:
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+    except OSError as e:
+        log(f"Cannot write metrics: {e}", "WARNING")
+
+
+def convert_job(args, player_cache, executor, metrics):
+    timings = {}
+    start = time.perf_counter()
 
     if args.request == "":
         output = args.output
-        if not args.output.endswith(".json"):
-            output = args.output + ".json"
+        if args.gzip:
+            if output.endswith(".json"):
+                output += ".gz"
+            elif not output.endswith(".json.gz"):
+                output += ".json.gz"
+        elif not output.endswith(".json"):
+            output += ".json"
 
     if not os.path.exists(args.file):
-        log(f"File not exists: {args.file}", "ERROR")
-        sys.exit(1)
-
-    convert_sav(args.file)
-    filetime = os.stat(args.file).st_mtime
+        raise JobError(f"File not exists: {args.file}")
 
     # 同路径下的Players文件夹
     dir_path = os.path.join(os.path.dirname(args.file), "Players")
 
-    players = structure_player(dir_path, filetime=filetime)
-    guilds = structure_guild(filetime)
+    state = None
+    source = None
+    if args.request != "" and args.state_file:
+        state = SyncState(args.state_file)
+        source = source_fingerprint(args.file, state.source)
+        if not (args.force or args.full_sync) and same_source(state.source, source):
+            clear_input(args, dir_path)
+            log(
+                f"Save unchanged since the last sync, skipped in "
+                f"{time.perf_counter() - start:.3f}s"
+            )
+            raise Unchanged()
+
+    profile = None
+    if args.decode_profile:
+        from palworld_save_tools.decode_profile import DecodeProfile
+
+        profile = DecodeProfile()
+    convert_sav(args.file, profile=profile, metrics=metrics)
+    if profile is not None:
+        log(
+            "Decode profile written to %s and %s"
+            % profile.write_files(args.decode_profile)
+        )
+    filetime = os.stat(args.file).st_mtime
+    timings["convert"] = time.perf_counter() - start
+
+    if player_cache is None and args.cache_dir:
+        player_cache = PlayerCache(args.cache_dir, hash_content=args.cache_hash)
+
+    t = time.perf_counter()
+    with metrics.phase("structure", "structure_player"):
+        players = structure_player(
+            dir_path,
+            filetime=filetime,
+            with_pals=False,
+            workers=args.workers,
+            cache=player_cache,
+            executor=executor,
+            metrics=metrics,
+        )
+    timings["players"] = time.perf_counter() - t
+    t = time.perf_counter()
+    with metrics.phase("structure", "structure_guild"):
+        guilds = structure_guild(filetime)
+    timings["guilds"] = time.perf_counter() - t
+    metrics.count("players", len(players))
+    metrics.count("pals", len(structurer.pal_table))
+    metrics.count("guilds", len(guilds))
 
     # Add last_online to players
     for player in players:
@@ -51,36 +352,31 @@ if __name__ == "__main__":
                     player["save_last_online"] = guild_player["last_online"]
                     break
 
+    t = time.perf_counter()
     if args.request == "":
-        with open(output, "w", encoding="utf-8") as f:
-            json.dump(
-                {"players": players, "guilds": guilds}, f, indent=4, ensure_ascii=False
+        with metrics.phase("serialise"):
+            write_structure(
+                output,
+                players,
+                guilds,
+                structurer.pal_table,
+                pretty=args.pretty,
+                compress=args.gzip,
             )
         log(f"Players: {len(players)}")
         log(f"Guilds: {len(guilds)}")
     else:
-        player_url = urljoin(args.request, "player")
-        guild_url = urljoin(args.request, "guild")
-        log(f"Put players to {player_url} with Players: {len(players)}")
-        player_res = requests.put(
-            player_url,
-            headers={"Authorization": f"Bearer {args.token}"},
-            json=players,
-            timeout=10,
-        )
-        if player_res.status_code != 200:
-            log(f"Put Players data error: {player_res.text}")
-
-        log(f"Put guilds to {guild_url} with Guilds: {len(guilds)}")
-        guild_res = requests.put(
-            guild_url,
-            headers={"Authorization": f"Bearer {args.token}"},
-            json=guilds,
-            timeout=10,
-        )
-        if guild_res.status_code != 200:
-            log(f"Put Guilds data error: {guild_res.text}")
+        upload(args, players, guilds, structurer.pal_table, state, source, metrics)
+    timings["output"] = time.perf_counter() - t
 
+    clear_input(args, dir_path)
+
+    timings["total"] = time.perf_counter() - start
+    log(f"Done in {round(timings['total'], 3)}s")
+    return timings
+
+
+def clear_input(args, dir_path):
     try:
         if args.clear:
             os.remove(args.file)
@@ -91,4 +387,426 @@ if __name__ == "__main__":
     except FileNotFoundError:
         pass
 
-    log(f"Done in {round(time.time() - start, 3)}s")
+
+def upload_players(uploader, changed, players, pal_table):
+    """Upload ``changed`` players in NDJSON batches, then drop the ones no
+    longer saved and resend any the server does not have.
+
+    Returns True if the server ended up with every player.
+    """
+    complete = uploader.put_batches(
+        "player/batch", (pal_table.player_json(player) for player in changed)
+    )
+    if not complete:
+        log("Players upload incomplete, keeping players missing from it", "WARNING")
+        return False
+    missing = uploader.commit(
+        "player/commit",
+        json.dumps({"player_uids": [player["player_uid"] for player in players]}),
+    )
+    if missing is None:
+        return False
+    if not missing:
+        return True
+    log(f"Server is missing {len(missing)} players, uploading them")
+    return uploader.put_batches(
+        "player/batch",
+        (
+            pal_table.player_json(player)
+            for player in players
+            if player["player_uid"] in missing
+        ),
+    )
+
+
+def upload_guilds(uploader, changed, guilds):
+    """Upload ``changed`` guilds, then drop the ones no longer saved and
+    resend any the server does not have."""
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    if changed and not uploader.ok(uploader.put("guild", dumps(changed))):
+        return False
+    missing = uploader.commit(
+        "guild/commit",
+        dumps({"admin_player_uids": [guild["admin_player_uid"] for guild in guilds]}),
+    )
+    if missing is None:
+        return False
+    if not missing:
+        return True
+    log(f"Server is missing {len(missing)} guilds, uploading them")
+    return uploader.ok(
+        uploader.put(
+            "guild",
+            dumps([g for g in guilds if g["admin_player_uid"] in missing]),
+        )
+    )
+
+
+def upload(args, players, guilds, pal_table, state=None, source=None, metrics=None):
+    """Send players and guilds to the API, only what changed since ``state``
+    when one is given."""
+    if metrics is None:
+        metrics = Metrics()
+    # only uploads need requests, which is slow to import
+    with timed_import("requests"):
+        from uploader import Uploader
+
+    # uploads encode their JSON as they stream, inside the upload phase
+    with metrics.phase("fingerprint"):
+        player_prints = {
+            player["player_uid"]: player_fingerprint(player, pal_table)
+            for player in players
+        }
+        guild_prints = {
+            guild["admin_player_uid"]: guild_fingerprint(guild) for guild in guilds
+        }
+    if state is None or args.full_sync:
+        changed_players, changed_guilds = players, guilds
+    else:
+        changed_uids = SyncState.changed(state.players, player_prints)
+        changed_players = [p for p in players if p["player_uid"] in changed_uids]
+        changed_uids = SyncState.changed(state.guilds, guild_prints)
+        changed_guilds = [g for g in guilds if g["admin_player_uid"] in changed_uids]
+    log(
+        f"Put players to {args.request} with Players: "
+        f"{len(changed_players)}/{len(players)}"
+    )
+    log(
+        f"Put guilds to {args.request} with Guilds: "
+        f"{len(changed_guilds)}/{len(guilds)}"
+    )
+
+    metrics.count("players_uploaded", len(changed_players))
+    metrics.count("guilds_uploaded", len(changed_guilds))
+
+    with metrics.phase("upload"), Uploader(
+        args.request, args.token, compress=not args.no_compress
+    ) as uploader:
+        players_ok, guilds_ok = uploader.run_all(
+            lambda: upload_players(uploader, changed_players, players, pal_table),
+            lambda: upload_guilds(uploader, changed_guilds, guilds),
+        )
+    metrics.count("upload_bytes", uploader.bytes_sent)
+    if state is not None and players_ok and guilds_ok:
+        state.save(source, player_prints, guild_prints)
+
+
+def release_world():
+    """Drop the decoded world between jobs of a resident process."""
+    structurer.wsd = None
+    structurer.gvas_file = None
+    structurer.pal_table = None
+
+
+def renew_executor(executor, workers):
+    """``executor``, or a new one if a worker of it died during the last job.
+
+    Player files fall back to serial reads when the pool breaks, so without
+    this every later job of a resident process would stay serial.
+    """
+    if executor is None or structurer.broken_executor is not executor:
+        return executor
+    log("Process pool broken, starting a new one", "WARNING")
+    structurer.broken_executor = None
+    executor.shutdown()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def watch(args):
+    """Convert the save under ``args.watch`` every time the game writes it.
+
+    A sync starts once Level.sav and Players/ have been quiet for
+    ``--debounce`` seconds and their headers say they are fully written.
+    ``--full-sync`` and ``--force`` only apply to the first sync.
+    """
+    level_file = find_level_sav(args.watch)
+    if level_file is None:
+        raise JobError(f"Level.sav not found in {args.watch}")
+    job_args = argparse.Namespace(**vars(args))
+    job_args.file = level_file
+    # never delete the live save
+    job_args.clear = False
+
+    player_cache = None
+    if args.cache_dir:
+        player_cache = PlayerCache(args.cache_dir, hash_content=args.cache_hash)
+    workers = args.workers if args.workers is not None else os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    deadline = time.monotonic() + args.watch_for if args.watch_for > 0 else None
+
+    watcher = open_watcher(level_file, args.poll_interval)
+    # sync once on start
+    pending = True
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            if not pending:
+                timeout = 3600 if deadline is None else deadline - time.monotonic()
+                pending = watcher.wait(max(timeout, 0))
+                continue
+            settle_until = time.monotonic() + WATCH_MAX_SETTLE
+            while watcher.wait(args.debounce) and time.monotonic() < settle_until:
+                pass
+            if not all(save_complete(path) for _, path in source_files(level_file)):
+                log("Save is still being written, waiting")
+                continue
+            pending = False
+            try:
+                run_job(job_args, player_cache, executor)
+            except Unchanged:
+                pass
+            except Exception as e:
+                log(f"Job failed: {e}", "ERROR")
+            finally:
+                release_world()
+                executor = renew_executor(executor, workers)
+            job_args.full_sync = job_args.force = False
+    finally:
+        watcher.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+def job_namespace(args, job):
+    """``args`` with the options given in the ``job`` dict applied."""
+    job_args = argparse.Namespace(**vars(args))
+    for key, value in job.items():
+        key = key.replace("-", "_")
+        if key not in vars(job_args) or key in (
+            "serve",
+            "watch",
+            "batch",
+            "inspect",
+            "profile",
+            "profile_sample",
+            "diagnostics_level",
+            "diagnostics_file",
+        ):
+            raise JobError(f"Unknown job option: {key}")
+        setattr(job_args, key, value)
+    return job_args
+
+
+# PlayerCache per (cache_dir, cache_hash), kept by each batch worker process
+_batch_caches = {}
+
+
+def batch_world(args, world):
+    """Convert one manifest entry, returning its summary entry."""
+    world = dict(world)
+    result = {
+        "name": world.pop("name", None) or world.get("file", ""),
+        "ok": False,
+        "unchanged": False,
+        "error": "",
+        "timings": {},
+    }
+    try:
+        job_args = job_namespace(args, world)
+        # worlds run in parallel, the players of one world are read serially
+        job_args.workers = 1
+        cache = None
+        if job_args.cache_dir:
+            cache_key = (job_args.cache_dir, job_args.cache_hash)
+            if cache_key not in _batch_caches:
+                _batch_caches[cache_key] = PlayerCache(*cache_key)
+            cache = _batch_caches[cache_key]
+        result["timings"] = run_job(job_args, cache)
+        result["ok"] = True
+    except Unchanged:
+        result["ok"] = True
+        result["unchanged"] = True
+    except SystemExit as e:
+        result["error"] = f"job exited with status {e.code}"
+    except Exception as e:
+        log(f"{result['name']} failed: {e}", "ERROR")
+        result["error"] = str(e)
+    finally:
+        release_world()
+    return result
+
+
+def batch(args):
+    """Convert every world listed in the ``args.batch`` manifest.
+
+    The manifest is a JSON list of objects carrying the same keys as serve
+    jobs (``file``, ``request``, ``token``, ``state_file``, ``cache_dir``...)
+    plus an optional ``name``. Up to ``--workers`` worlds are converted at
+    once, each worker process keeping its imports, Oodle library and player
+    caches warm across worlds. Returns the summary ``{"ok", "workers",
+    "total", "worlds": [{"name", "ok", "unchanged", "error", "timings"}]}``
+    with worlds in manifest order.
+    """
+    start = time.perf_counter()
+    try:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            worlds = json.load(f)
+    except (OSError, ValueError) as e:
+        raise JobError(f"Cannot read batch manifest {args.batch}: {e}")
+    if not isinstance(worlds, list) or not all(isinstance(w, dict) for w in worlds):
+        raise JobError("Batch manifest must be a JSON list of objects")
+
+    workers = args.workers if args.workers is not None else os.cpu_count() or 1
+    workers = max(min(workers, len(worlds)), 1)
+    log(f"Converting {len(worlds)} worlds with {workers} workers")
+    if workers == 1:
+        results = [batch_world(args, world) for world in worlds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(batch_world, [args] * len(worlds), worlds))
+    return {
+        "ok": all(result["ok"] for result in results),
+        "workers": workers,
+        "total": time.perf_counter() - start,
+        "worlds": results,
+    }
+
+
+def serve(args, ready_age=None):
+    """Run jobs read from stdin, one JSON object per line.
+
+    A job carries the same keys as the command line options (``file``,
+    ``request``, ``token``, ``output``, ``clear``...); missing keys fall back
+    to the options sav_cli was started with. Each job is answered with one
+    line ``{"id", "ok", "unchanged", "error", "timings", "metrics"}`` on
+    stdout, ``metrics`` being ``Metrics.dump()``. Logs go to stderr.
+    """
+    responses = sys.stdout
+    # keep stray prints off the response stream
+    sys.stdout = sys.stderr
+
+    player_cache = None
+    if args.cache_dir:
+        player_cache = PlayerCache(args.cache_dir, hash_content=args.cache_hash)
+    workers = args.workers if args.workers is not None else os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    log("Serving jobs on stdin")
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job_id = None
+            response = {
+                "ok": False,
+                "unchanged": False,
+                "error": "",
+                "timings": {},
+                "metrics": {},
+            }
+            metrics = Metrics()
+            try:
+                job = json.loads(line)
+                job_id = job.pop("id", None)
+                job_args = job_namespace(args, job)
+                cache = player_cache
+                if (job_args.cache_dir, job_args.cache_hash) != (
+                    args.cache_dir,
+                    args.cache_hash,
+                ):
+                    cache = None
+                response["timings"] = run_job(job_args, cache, executor, metrics)
+                response["ok"] = True
+            except Unchanged:
+                response["ok"] = True
+                response["unchanged"] = True
+            except SystemExit as e:
+                response["error"] = f"job exited with status {e.code}"
+            except Exception as e:
+                log(f"Job failed: {e}", "ERROR")
+                response["error"] = str(e)
+            finally:
+                release_world()
+                executor = renew_executor(executor, workers)
+            response["metrics"] = metrics.dump()
+            response["id"] = job_id
+            responses.write(json.dumps(response) + "\n")
+            responses.flush()
+            if args.startup_report and ready_age is not None:
+                startup_report(ready_age)
+                ready_age = None
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def main(args, ready_age=None):
+    """Run the mode picked by ``args``, returning the exit status."""
+    if args.serve:
+        serve(args, ready_age)
+        return 0
+
+    if args.batch:
+        # the summary is the only thing written to stdout
+        summary_out = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            summary = batch(args)
+        except JobError as e:
+            log(str(e), "ERROR")
+            return 1
+        summary_out.write(json.dumps(summary) + "\n")
+        summary_out.flush()
+        return 0 if summary["ok"] else 1
+
+    if args.inspect:
+        return inspect_save(args)
+
+    if args.watch:
+        try:
+            watch(args)
+        except JobError as e:
+            log(str(e), "ERROR")
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    try:
+        run_job(args)
+    except Unchanged:
+        return EXIT_UNCHANGED
+    except JobError as e:
+        log(str(e), "ERROR")
+        return 1
+    finally:
+        if args.startup_report:
+            startup_report(ready_age)
+    return 0
+
+
+def inspect_save(args):
+    """Print the size tree and parse estimate of ``args.file`` as JSON."""
+    from palworld_save_tools.size_tree import size_tree
+
+    try:
+        with open(args.file, "rb") as f:
+            tree = size_tree(f.read())
+    except OSError as e:
+        log(f"Cannot read {args.file}: {e}", "ERROR")
+        return 1
+    print(json.dumps(tree.dump()))
+    return 0
+
+
+def profiled_main(args, ready_age=None):
+    """``main`` run under a profiler, writing its files even if it fails."""
+    from palworld_save_tools.profiling import Profiler
+
+    profiler = Profiler(sample=args.profile_sample)
+    try:
+        with profiler:
+            return main(args, ready_age)
+    finally:
+        log("Profile written to " + ", ".join(profiler.write_files(args.profile)))
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = build_parser()
+    args = parser.parse_args()
+    ready_age = process_age()
+    diagnostics.configure(args.diagnostics_level, args.diagnostics_file or None)
+
+    if args.profile:
+        sys.exit(profiled_main(args, ready_age))
+    sys.exit(main(args, ready_age))
@@ -0,0 +1,46 @@
+import os
+import time
+from contextlib import contextmanager
+
+from logger import log
+
+# Seconds spent in each timed import group, in the order they were hit
+IMPORT_TIMES = {}
+
+
+@contextmanager
+def timed_import(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        IMPORT_TIMES[name] = IMPORT_TIMES.get(name, 0.0) + time.perf_counter() - start
+
+
+def process_age():
+    """Seconds since this process was started, None where it can't be told.
+
+    For the one-file binary this includes unpacking and interpreter start.
+    """
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # the command name may contain spaces, fields follow the last ")"
+            fields = f.read().rsplit(b")", 1)[1].split()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return max(uptime - started, 0.0)
+
+
+def report(ready_age=None):
+    """Log the import breakdown gathered so far."""
+    from palworld_save_tools.paltypes import RAWDATA_IMPORT_TIMES
+
+    if ready_age is not None:
+        log(f"Startup: process ready after {ready_age * 1000:.1f}ms")
+    for name, seconds in IMPORT_TIMES.items():
+        log(f"Startup: import {name} {seconds * 1000:.1f}ms")
+    for name, seconds in RAWDATA_IMPORT_TIMES.items():
+        log(f"Startup: lazy import rawdata.{name} {seconds * 1000:.1f}ms")
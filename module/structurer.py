@@ -1,12 +1,13 @@
-import copy
 import os
 import sys
 import zlib
 import json
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 
-from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.gvas import GvasFile, GvasHeader
 from palworld_save_tools.palsav import decompress_sav_to_gvas
 from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
 from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
@@ -14,8 +15,10 @@ import item_container_slots
 import base_camp
 import group
 
-from world_types import Player, Pal, Guild, BaseCamp
-from logger import log, redirect_stdout_stderr
+from world_types import Player, Guild, BaseCamp
+from pal_table import PalTable
+from metrics import Metrics
+from logger import log
 
 PALWORLD_CUSTOM_PROPERTIES[
     ".worldSaveData.ItemContainerSaveData.Value.Slots.Slots.RawData"
@@ -30,13 +33,29 @@ PALWORLD_CUSTOM_PROPERTIES[
     base_camp.encode,
 )
 PALWORLD_CUSTOM_PROPERTIES[".worldSaveData.GroupSaveDataMap"] = (
-    group.decode,
+    group.decode_guilds,
     group.encode,
 )
+PALWORLD_CUSTOM_PROPERTIES[".worldSaveData.GroupSaveDataMap.Value.RawData"] = (
+    group.decode_raw_data,
+    group.encode_raw_data,
+)
+
 
+INVENTORY_CONTAINERS = (
+    "CommonContainerId",
+    "DropSlotContainerId",
+    "EssentialContainerId",
+    "FoodEquipContainerId",
+    "PlayerEquipArmorContainerId",
+    "WeaponLoadOutContainerId",
+)
 
 wsd = None
 gvas_file = None
+pal_table = None
+# a long-lived executor whose worker died, for its owner to replace
+broken_executor = None
 
 
 def skip_decode(
@@ -137,11 +156,10 @@ def load_skiped_decode(wsd, skip_paths, recursive=True):
         if "skip_type" not in properties:
             continue
         parse_skiped_item(properties, skip_path, recursive)
-        if ".worldSaveData.%s" % skip_path in SKP_PALWORLD_CUSTOM_PROPERTIES:
-            del SKP_PALWORLD_CUSTOM_PROPERTIES[".worldSaveData.%s" % skip_path]
 
 
-SKP_PALWORLD_CUSTOM_PROPERTIES = copy.deepcopy(PALWORLD_CUSTOM_PROPERTIES)
+# values are immutable (decode, encode) tuples, a shallow copy is enough
+SKP_PALWORLD_CUSTOM_PROPERTIES = dict(PALWORLD_CUSTOM_PROPERTIES)
 SKP_PALWORLD_CUSTOM_PROPERTIES[".worldSaveData.MapObjectSaveData"] = (
     skip_decode,
     skip_encode,
@@ -193,33 +211,52 @@ SKP_PALWORLD_CUSTOM_PROPERTIES[".worldSaveData.InLockerCharacterInstanceIDArray"
 )
 
 
-def convert_sav(file):
+def convert_sav(file, profile=None, metrics=None):
     global gvas_file, wsd
+    if metrics is None:
+        metrics = Metrics()
     if file.endswith(".sav.json"):
         log("Loading...")
         with open(file, "r", encoding="utf-8") as f:
             return f.read()
     log("Converting...")
-    with redirect_stdout_stderr():
-        try:
+    try:
+        with metrics.phase("read"):
             with open(file, "rb") as f:
                 data = f.read()
-                raw_gvas, _ = decompress_sav_to_gvas(data)
+        with metrics.phase("decompress"):
+            raw_gvas, _ = decompress_sav_to_gvas(data)
+        with metrics.phase("parse"):
             gvas_file = GvasFile.read(
-                raw_gvas, PALWORLD_TYPE_HINTS, SKP_PALWORLD_CUSTOM_PROPERTIES
+                raw_gvas,
+                PALWORLD_TYPE_HINTS,
+                SKP_PALWORLD_CUSTOM_PROPERTIES,
+                profile=profile,
             )
-        except zlib.error:
-            log("This .sav file is corrupted. :(", "ERROR")
-            sys.exit(1)
+    except zlib.error:
+        log("This .sav file is corrupted. :(", "ERROR")
+        sys.exit(1)
     # return json.dumps(gvas_file.dump(), cls=CustomEncoder)
     wsd = gvas_file.properties["worldSaveData"]["value"]
 
 
-def structure_player(dir_path, data_source=None, filetime: int = -1):
+def structure_player(
+    dir_path,
+    data_source=None,
+    filetime: int = -1,
+    with_pals=True,
+    workers=None,
+    cache=None,
+    executor=None,
+    metrics=None,
+):
     log("Structuring players...")
-    global wsd
+    global wsd, pal_table
+    if metrics is None:
+        metrics = Metrics()
     if data_source is None:
         data_source = wsd
+    pal_table = PalTable()
     if not data_source.get("CharacterSaveParameterMap"):
         return []
     uid_character = (
@@ -230,17 +267,37 @@ def structure_player(dir_path, data_source=None, filetime: int = -1):
         for c in wsd["CharacterSaveParameterMap"]["value"]
     )
 
-    players = []
-    pals = []
-    ticks = wsd["GameTimeSaveData"]["value"]["RealDateTimeTicks"]["value"]
+    player_characters = []
     for uid, c in uid_character:
         if c.get("IsPlayer") and c["IsPlayer"]["value"]:
-            c["Items"] = getPlayerItems(uid, dir_path)
-            players.append(Player(uid, c).to_dict())
+            player_characters.append((uid, c))
         else:
             if not c.get("OwnerPlayerUId"):
                 continue
-            pals.append(Pal(c, ticks, filetime).to_dict())
+            pal_table.append(c)
+
+    with metrics.phase("player_files"):
+        inventories = load_player_inventories(
+            [uid for uid, _ in player_characters], dir_path, workers, cache, executor
+        )
+    if cache is not None:
+        metrics.cache("players", cache.hits, cache.misses)
+    item_containers = None
+    containers = 0
+    players = []
+    for uid, c in player_characters:
+        container_ids = inventories[uid]
+        if container_ids is None:
+            c["Items"] = None
+        else:
+            if item_containers is None:
+                item_containers = load_item_containers()
+            c["Items"] = getPlayerItems(container_ids, item_containers)
+            containers += sum(
+                1 for cid in container_ids.values() if cid in item_containers
+            )
+        players.append(Player(uid, c).to_dict())
+    metrics.count("containers", containers)
 
     unique_players_dict = {}
     for player in players:
@@ -253,12 +310,12 @@ def structure_player(dir_path, data_source=None, filetime: int = -1):
             unique_players_dict[player_uid] = player
 
     unique_players = list(unique_players_dict.values())
-    for pal in pals:
-        for player in unique_players:
-            if player["player_uid"] == pal["owner"]:
-                pal.pop("owner")
-                player["pals"].append(pal)
-                break
+    # without pals attached, callers render them straight from pal_table
+    for player in unique_players:
+        if with_pals:
+            player["pals"] = pal_table.pals_of(player["player_uid"])
+        else:
+            player.pop("pals", None)
 
     sorted_players = sorted(unique_players, key=lambda p: p["level"], reverse=True)
 
@@ -353,49 +410,144 @@ def parse_item(properties, skip_path):
     return properties
 
 
-def getPlayerItems(player_uid, dir_path):
-    load_skiped_decode(wsd, ["ItemContainerSaveData"], False)
-    item_containers = {}
-    for item_container in wsd["ItemContainerSaveData"]["value"]:
-        item_containers[str(item_container["key"]["ID"]["value"])] = item_container
+def player_sav_path(dir_path, player_uid):
+    return os.path.join(dir_path, str(player_uid).upper().replace("-", "") + ".sav")
 
-    player_sav_file = os.path.join(
-        dir_path, str(player_uid).upper().replace("-", "") + ".sav"
-    )
+
+def _seek_property(reader: FArchiveReader, name: str):
+    # Skip over the properties of the current struct until `name`
+    while True:
+        property_name = reader.fstring()
+        if property_name == "None":
+            return None
+        type_name = reader.fstring()
+        size = reader.u64()
+        if property_name == name:
+            return type_name, size
+        reader.skip_property(type_name, size)
+
+
+def read_inventory_info(raw_gvas):
+    """Read SaveData.InventoryInfo of a player save, ignoring everything after it"""
+    with FArchiveReader(
+        raw_gvas, PALWORLD_TYPE_HINTS, PALWORLD_CUSTOM_PROPERTIES
+    ) as reader:
+        GvasHeader.read(reader)
+        if _seek_property(reader, "SaveData") is None:
+            return None
+        # SaveData struct header
+        reader.fstring()
+        reader.guid()
+        reader.optional_guid()
+        tag = _seek_property(reader, "InventoryInfo")
+        if tag is None:
+            return None
+        return reader.property(*tag, ".SaveData.InventoryInfo")
+
+
+def read_player_inventory(player_sav_file):
+    """Item container ids of one Players/<uid>.sav, None if unreadable.
+
+    Runs in pool workers, so it only takes and returns plain data.
+    """
     if not os.path.exists(player_sav_file):
         # log("Player Sav file Not exists: %s" % player_sav_file)
-        return
-    else:
-        with redirect_stdout_stderr():
-            try:
-                with open(player_sav_file, "rb") as f:
-                    raw_gvas, _ = decompress_sav_to_gvas(f.read())
-                    player_gvas_file = GvasFile.read(
-                        raw_gvas, PALWORLD_TYPE_HINTS, PALWORLD_CUSTOM_PROPERTIES
+        return None
+    try:
+        with open(player_sav_file, "rb") as f:
+            raw_gvas, _ = decompress_sav_to_gvas(f.read())
+        inventory_info = read_inventory_info(raw_gvas)
+    except Exception as e:
+        log(
+            f"Player Sav file is corrupted: {os.path.basename(player_sav_file)}: {str(e)}",
+            "ERROR",
+        )
+        return None
+    container_ids = {}
+    if inventory_info is None:
+        return container_ids
+    for idx_key in INVENTORY_CONTAINERS:
+        container = inventory_info["value"].get(idx_key)
+        if container is not None:
+            container_ids[idx_key] = str(container["value"]["ID"]["value"])
+    return container_ids
+
+
+def load_player_inventories(
+    player_uids, dir_path, workers=None, cache=None, executor=None
+):
+    """Read the inventories of all players, keyed by player UID.
+
+    Player saves are independent, so they are parsed in a process pool;
+    decoding is pure Python and would otherwise hold the GIL. With a
+    PlayerCache only files changed since the last run are parsed. A
+    long-lived ``executor`` may be passed in to reuse its workers; if one
+    of them dies, players are read serially and the executor is left in
+    ``broken_executor``.
+    """
+    global broken_executor
+    sav_files = {uid: player_sav_path(dir_path, uid) for uid in player_uids}
+    inventories = {}
+    cache_keys = {}
+    if cache is not None:
+        cache.hits = cache.misses = 0
+        for uid, path in list(sav_files.items()):
+            value, key = cache.get(path)
+            if value is not None:
+                inventories[uid] = value
+                del sav_files[uid]
+            else:
+                cache_keys[uid] = key
+        log(f"Player cache: {cache.hits} hits, {cache.misses} misses")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(sav_files))
+    results = None
+    if workers > 1:
+        chunksize = max(1, len(sav_files) // (workers * 4))
+        shared = executor
+        try:
+            if executor is not None:
+                results = list(
+                    executor.map(
+                        read_player_inventory, sav_files.values(), chunksize=chunksize
                     )
-                player_gvas = player_gvas_file.properties["SaveData"]["value"]
-            except Exception as e:
-                log(
-                    f"Player Sav file is corrupted: {os.path.basename(player_sav_file)}: {str(e)}",
-                    "ERROR",
                 )
-                return
-    containers_data = {
-        "CommonContainerId": [],
-        "DropSlotContainerId": [],
-        "EssentialContainerId": [],
-        "FoodEquipContainerId": [],
-        "PlayerEquipArmorContainerId": [],
-        "WeaponLoadOutContainerId": [],
-    }
-    for idx_key in containers_data.keys():
-        if player_gvas.get("InventoryInfo") is None:
-            continue
-        if player_gvas["InventoryInfo"]["value"].get(idx_key) is None:
-            continue
-        container_id = str(
-            player_gvas["InventoryInfo"]["value"][idx_key]["value"]["ID"]["value"]
-        )
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(
+                        executor.map(
+                            read_player_inventory,
+                            sav_files.values(),
+                            chunksize=chunksize,
+                        )
+                    )
+        except (OSError, BrokenProcessPool) as e:
+            log(f"Process pool unavailable, reading players serially: {e}", "WARNING")
+            if shared is not None and isinstance(e, BrokenProcessPool):
+                broken_executor = shared
+    if results is None:
+        results = [read_player_inventory(path) for path in sav_files.values()]
+
+    for (uid, path), container_ids in zip(sav_files.items(), results):
+        inventories[uid] = container_ids
+        if cache is not None and container_ids is not None:
+            cache.put(path, cache_keys[uid], container_ids)
+    return inventories
+
+
+def load_item_containers():
+    load_skiped_decode(wsd, ["ItemContainerSaveData"], False)
+    item_containers = {}
+    for item_container in wsd["ItemContainerSaveData"]["value"]:
+        item_containers[str(item_container["key"]["ID"]["value"])] = item_container
+    return item_containers
+
+
+def getPlayerItems(container_ids, item_containers):
+    containers_data = {idx_key: [] for idx_key in INVENTORY_CONTAINERS}
+    for idx_key, container_id in container_ids.items():
         if container_id in item_containers:
             # 解析对应的物品容器数据
             item_container = parse_item(
@@ -456,18 +608,24 @@ def structure_guild(filetime: int = -1):
         valid_guilds, key=lambda g: g["base_camp_level"], reverse=True
     )
 
+    camp_positions = {camp["id"]: pos for pos, camp in enumerate(base_camps)}
     for guild in sorted_guilds:
-        guild["base_camp"] = [] 
-        for camp in base_camps:
-            if camp["id"] in guild["base_ids"]:
-                guild["base_camp"].append(
-                    {
-                        "id": camp["id"],
-                        "area": camp["area_range"],
-                        "location_x": camp["transform"]["x"],
-                        "location_y": camp["transform"]["y"],
-                    }
-                )
+        positions = sorted(
+            {
+                camp_positions[base_id]
+                for base_id in guild["base_ids"]
+                if base_id in camp_positions
+            }
+        )
+        guild["base_camp"] = [
+            {
+                "id": base_camps[pos]["id"],
+                "area": base_camps[pos]["area_range"],
+                "location_x": base_camps[pos]["transform"]["x"],
+                "location_y": base_camps[pos]["transform"]["y"],
+            }
+            for pos in positions
+        ]
     return list(sorted_guilds)
 
 
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+
+from logger import log
+
+STATE_VERSION = 1
+
+
+def fingerprint(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _minute(timestamp):
+    # "2006-01-02T15:04:05Z" -> "2006-01-02T15:04"; last online times are
+    # rebuilt from the save's mtime each run and jitter by a second or so
+    return timestamp[:16] if timestamp else timestamp
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_files(level_file):
+    """``(name, path)`` of Level.sav and the Players/*.sav next to it."""
+    yield os.path.basename(level_file), level_file
+    players_dir = os.path.join(os.path.dirname(level_file), "Players")
+    try:
+        names = sorted(os.listdir(players_dir))
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith(".sav"):
+            yield f"Players/{name}", os.path.join(players_dir, name)
+
+
+def source_fingerprint(level_file, previous=None):
+    """Size, mtime and digest of every save file a sync reads.
+
+    Digests are taken over the compressed bytes and reused from
+    ``previous`` for files whose size and mtime did not change, so an idle
+    server costs one stat per file.
+    """
+    previous = previous or {}
+    files = {}
+    for name, path in source_files(level_file):
+        st = os.stat(path)
+        old = previous.get(name)
+        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            digest = old["hash"]
+        else:
+            digest = file_digest(path)
+        files[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+    return files
+
+
+def same_source(previous, current):
+    if not previous or previous.keys() != current.keys():
+        return False
+    return all(previous[name]["hash"] == f["hash"] for name, f in current.items())
+
+
+def player_fingerprint(player, pal_table):
+    """Fingerprint of a player record together with its pals."""
+    if player.get("save_last_online"):
+        player = {**player, "save_last_online": _minute(player["save_last_online"])}
+    return fingerprint(pal_table.player_json(player))
+
+
+def guild_fingerprint(guild):
+    guild = {
+        **guild,
+        "players": [
+            {**p, "last_online": _minute(p["last_online"])} for p in guild["players"]
+        ],
+    }
+    return fingerprint(json.dumps(guild, ensure_ascii=False, separators=(",", ":")))
+
+
+class SyncState:
+    """Fingerprints of the entities sent by the last successful sync.
+
+    Stored as one small JSON file: ``{"version", "source": {file: {size,
+    mtime_ns, hash}}, "players": {uid: hash}, "guilds": {admin_player_uid:
+    hash}}``. A missing or unreadable file simply means everything is
+    uploaded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.source = {}
+        self.players = {}
+        self.guilds = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                self.source = state.get("source") or {}
+                self.players = state["players"]
+                self.guilds = state["guilds"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            log(f"Ignoring unreadable sync state {path}: {e}", "WARNING")
+
+    @staticmethod
+    def changed(previous, current):
+        """Keys of ``current`` that are new or differ from ``previous``."""
+        return {key for key, value in current.items() if previous.get(key) != value}
+
+    def save(self, source, players, guilds):
+        self.source = source
+        self.players = players
+        self.guilds = guilds
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": STATE_VERSION,
+                        "source": source,
+                        "players": players,
+                        "guilds": guilds,
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # the next sync then just uploads more than it needs to
+            log(f"Could not save sync state {self.path}: {e}", "WARNING")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
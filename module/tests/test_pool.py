@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import structurer
+from sav_cli import renew_executor
+
+
+@pytest.fixture
+def broken_pool():
+    executor = ProcessPoolExecutor(max_workers=2)
+    with pytest.raises(BrokenProcessPool):
+        # a worker dying, as when the OOM killer hits it
+        executor.submit(os._exit, 1).result()
+    yield executor
+    executor.shutdown()
+    structurer.broken_executor = None
+
+
+def test_broken_pool_is_reported_and_replaced(tmp_path, broken_pool):
+    inventories = structurer.load_player_inventories(
+        ["a", "b"], str(tmp_path), workers=2, executor=broken_pool
+    )
+    assert inventories == {"a": None, "b": None}
+    assert structurer.broken_executor is broken_pool
+
+    executor = renew_executor(broken_pool, 2)
+    try:
+        assert executor is not broken_pool
+        assert structurer.broken_executor is None
+        assert executor.submit(abs, -1).result() == 1
+    finally:
+        executor.shutdown()
+
+
+def test_healthy_pool_is_kept():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert renew_executor(executor, 2) is executor
+    assert renew_executor(None, 2) is None
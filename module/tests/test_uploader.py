@@ -0,0 +1,200 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sav_cli import upload_guilds, upload_players
+from uploader import Uploader
+
+
+class StandInApi:
+    """A local PST API that records requests and answers from a script.
+
+    ``responses`` maps a path to a list of (status, body, content type)
+    answers used in turn, the last one repeating. Paths without a script
+    answer 200 with an empty JSON object.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = {}
+        self.lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def handle_request(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                path = self.path.lstrip("/")
+                with api.lock:
+                    api.requests.append((self.command, path, dict(self.headers), body))
+                    answers = api.responses.get(path, [(200, "{}", None)])
+                    status, text, content_type = (
+                        answers.pop(0) if len(answers) > 1 else answers[0]
+                    )
+                data = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type or "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_PUT = do_POST = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def bodies(self, path):
+        """Decompressed bodies sent to ``path``."""
+        return [
+            gzip.decompress(body) if headers.get("Content-Encoding") == "gzip" else body
+            for _, p, headers, body in self.requests
+            if p == path
+        ]
+
+
+@pytest.fixture
+def api():
+    api = StandInApi()
+    api.thread.start()
+    yield api
+    api.server.shutdown()
+    api.server.server_close()
+
+
+@pytest.fixture
+def uploader(api):
+    with Uploader(api.url, "token", backoff=0, timeout=5) as uploader:
+        yield uploader
+
+
+class PalTable:
+    def player_json(self, player):
+        return json.dumps(player)
+
+
+def player_uids(ndjson):
+    return [json.loads(line)["player_uid"] for line in ndjson.splitlines()]
+
+
+def test_bodies_are_gzip_compressed(api, uploader):
+    body = json.dumps([{"player_uid": "1", "nickname": "a" * 1000}])
+    assert uploader.ok(uploader.put("player", body))
+
+    method, path, headers, sent = api.requests[0]
+    assert (method, path) == ("PUT", "api/player")
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Authorization"] == "Bearer token"
+    assert gzip.decompress(sent) == body.encode("utf-8")
+    assert uploader.bytes_sent == len(sent) < len(body)
+
+
+def test_bodies_are_sent_as_is_without_compression(api):
+    with Uploader(api.url, "token", compress=False) as uploader:
+        assert uploader.ok(uploader.put("guild", "[]"))
+    _, _, headers, sent = api.requests[0]
+    assert "Content-Encoding" not in headers
+    assert sent == b"[]"
+
+
+def test_retries_on_5xx(api, uploader):
+    api.responses["api/guild"] = [(503, "", None), (502, "", None), (200, "{}", None)]
+    assert uploader.ok(uploader.put("guild", "[]"))
+    assert len(api.requests) == 3
+
+
+def test_gives_up_after_retries(api, uploader):
+    api.responses["api/guild"] = [(503, "busy", "text/plain")]
+    res = uploader.put("guild", "[]")
+    assert res.status_code == 503
+    assert not uploader.ok(res)
+    assert len(api.requests) == 4
+
+
+def test_put_batches_splits_ndjson(api, uploader):
+    lines = [json.dumps({"player_uid": str(i), "pad": "x" * 50}) for i in range(20)]
+    assert uploader.put_batches("player/batch", lines, max_bytes=300)
+
+    bodies = api.bodies("api/player/batch")
+    assert len(bodies) > 1
+    assert all(len(body) <= 300 for body in bodies)
+    assert b"".join(bodies).decode("utf-8").splitlines() == lines
+    assert all(
+        headers["Content-Type"] == "application/x-ndjson"
+        for _, _, headers, _ in api.requests
+    )
+
+
+def test_put_batches_reports_a_rejected_batch(api, uploader):
+    api.responses["api/player/batch"] = [(200, "{}", None), (400, "bad", None)]
+    lines = [json.dumps({"player_uid": str(i)}) for i in range(3)]
+    assert not uploader.put_batches("player/batch", lines, max_bytes=20)
+    assert len(api.requests) == 3
+
+
+def test_players_missing_from_commit_are_resent(api, uploader):
+    players = [{"player_uid": str(i)} for i in range(4)]
+    api.responses["api/player/commit"] = [(200, '{"missing": ["0", "3"]}', None)]
+
+    assert upload_players(uploader, players[1:3], players, PalTable())
+
+    paths = [path for _, path, _, _ in api.requests]
+    assert paths == ["api/player/batch", "api/player/commit", "api/player/batch"]
+    first, resent = api.bodies("api/player/batch")
+    assert player_uids(first) == ["1", "2"]
+    assert player_uids(resent) == ["0", "3"]
+    (commit,) = api.bodies("api/player/commit")
+    assert json.loads(commit) == {"player_uids": ["0", "1", "2", "3"]}
+
+
+def test_commit_is_skipped_after_a_failed_batch(api, uploader):
+    api.responses["api/player/batch"] = [(500, "error", None)]
+    players = [{"player_uid": "1"}]
+    assert not upload_players(uploader, players, players, PalTable())
+    assert all(path == "api/player/batch" for _, path, _, _ in api.requests)
+
+
+def test_guilds_missing_from_commit_are_resent(api, uploader):
+    guilds = [{"admin_player_uid": str(i)} for i in range(3)]
+    api.responses["api/guild/commit"] = [(200, '{"missing": ["2"]}', None)]
+
+    assert upload_guilds(uploader, [], guilds)
+
+    paths = [path for _, path, _, _ in api.requests]
+    assert paths == ["api/guild/commit", "api/guild"]
+    assert json.loads(api.bodies("api/guild")[0]) == [{"admin_player_uid": "2"}]
+
+
+@pytest.mark.parametrize(
+    "status,body,content_type",
+    [
+        (200, "<html>Bad Gateway</html>", "text/html"),
+        (200, "", "text/plain"),
+        (200, "[]", None),
+        (204, "", None),
+    ],
+)
+def test_non_json_commit_response_fails_the_upload(
+    api, uploader, status, body, content_type
+):
+    api.responses["api/guild/commit"] = [(status, body, content_type)]
+    guilds = [{"admin_player_uid": "1"}]
+
+    assert uploader.commit("guild/commit", "{}") is None
+    assert not upload_guilds(uploader, guilds, guilds)
+
+
+def test_bytes_sent_counts_concurrent_requests(api, uploader):
+    bodies = [json.dumps({"n": i}) * (i + 1) for i in range(8)]
+    results = uploader.run_all(
+        *(lambda body=body: uploader.put("guild", body) for body in bodies)
+    )
+    assert all(uploader.ok(res) for res in results)
+    assert uploader.bytes_sent == sum(len(body) for _, _, _, body in api.requests)
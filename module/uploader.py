@@ -0,0 +1,149 @@
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from logger import log
+
+# Upper bound of one NDJSON upload body before compression
+BATCH_BYTES = 4 * 1024 * 1024
+
+
+class Uploader:
+    """Sends structured results to the PST API.
+
+    One keep-alive session is shared by all requests. Bodies are gzip
+    compressed and retried with exponential backoff on connection errors
+    and 502/503/504 responses.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        token,
+        compress=True,
+        retries=3,
+        backoff=0.5,
+        timeout=30,
+    ):
+        self.base_url = base_url
+        self.compress = compress
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"PUT", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # bytes_sent is added to by the run_all workers
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method, path, body, content_type="application/json"):
+        """Send a ``body`` (str or bytes) to ``path`` under the API root.
+
+        Returns the response, or None when the request failed outright.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = {"Content-Type": content_type}
+        if self.compress:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        url = urljoin(self.base_url, path)
+        start = time.perf_counter()
+        try:
+            res = self.session.request(
+                method, url, data=body, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            log(f"{method.capitalize()} {path} failed: {e}", "ERROR")
+            return None
+        with self._lock:
+            self.bytes_sent += len(body)
+        log(
+            f"{method.capitalize()} {path}: {res.status_code}, {len(body)} bytes "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        if res.status_code != 200:
+            log(f"{method.capitalize()} {path} data error: {res.text}", "ERROR")
+        return res
+
+    @staticmethod
+    def ok(res):
+        return res is not None and res.status_code == 200
+
+    def put(self, path, body):
+        return self.request("PUT", path, body)
+
+    def post(self, path, body):
+        return self.request("POST", path, body)
+
+    def commit(self, path, body):
+        """POST ``body`` to the commit endpoint ``path``.
+
+        Returns the set of ids the server says it is missing, or None when
+        the commit failed or its response is not a JSON object.
+        """
+        res = self.post(path, body)
+        if not self.ok(res):
+            return None
+        try:
+            missing = res.json().get("missing")
+        except (ValueError, AttributeError):
+            log(f"Post {path} data error: {res.text}", "ERROR")
+            return None
+        return set(missing or ())
+
+    def put_batches(self, path, lines, max_bytes=BATCH_BYTES):
+        """PUT JSON ``lines`` as NDJSON bodies of at most ``max_bytes`` each.
+
+        Only one batch is held at a time. Returns True if every batch was
+        accepted.
+        """
+        ok = True
+        batch = []
+        size = 0
+        for line in lines:
+            line = line.encode("utf-8") + b"\n"
+            if batch and size + len(line) > max_bytes:
+                ok = self._put_batch(path, batch) and ok
+                batch = []
+                size = 0
+            batch.append(line)
+            size += len(line)
+        if batch:
+            ok = self._put_batch(path, batch) and ok
+        return ok
+
+    def _put_batch(self, path, batch):
+        return self.ok(
+            self.request("PUT", path, b"".join(batch), "application/x-ndjson")
+        )
+
+    @staticmethod
+    def run_all(*calls):
+        """Run the zero-argument ``calls`` concurrently, returning their results."""
+        with ThreadPoolExecutor(max_workers=len(calls) or 1) as executor:
+            futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
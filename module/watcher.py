@@ -0,0 +1,180 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from logger import log
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def find_level_sav(path):
+    """Level.sav in ``path`` or the first one found below it."""
+    if os.path.isfile(path):
+        return path
+    level_file = os.path.join(path, "Level.sav")
+    if os.path.isfile(level_file):
+        return level_file
+    for root, _, files in os.walk(path):
+        if "Level.sav" in files:
+            return os.path.join(root, "Level.sav")
+    return None
+
+
+def save_complete(path):
+    """Whether ``path`` looks fully written.
+
+    The header's compressed length is compared with the file size. Double
+    zlib saves (type 0x32) only record the inner length, so for them only
+    the header itself is checked.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return False
+    if len(header) < 12:
+        return False
+    uncompressed_len, compressed_len = struct.unpack_from("<II", header)
+    magic, save_type, offset = header[8:11], header[11], 12
+    if magic == b"CNK":
+        if len(header) < 24:
+            return False
+        uncompressed_len, compressed_len = struct.unpack_from("<II", header, 12)
+        magic, save_type, offset = header[20:23], header[23], 24
+    if magic not in (b"PlZ", b"PlM") or uncompressed_len == 0:
+        return False
+    if save_type == 0x32:
+        return size > offset
+    return compressed_len == size - offset
+
+
+class PollingWatcher:
+    """Notices changes by comparing the stat of the save files."""
+
+    def __init__(self, level_file, interval=2.0):
+        from sync_state import source_files
+
+        self._source_files = source_files
+        self.level_file = level_file
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for name, path in self._source_files(self.level_file):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[name] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds, True if a save file changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._snapshot()
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Notices writes to Level.sav and Players/ through inotify."""
+
+    def __init__(self, level_file):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.world_dir = os.path.dirname(os.path.abspath(level_file))
+        self.level_name = os.path.basename(level_file)
+        self.players_dir = os.path.join(self.world_dir, "Players")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self._add_watch(self.world_dir)
+        self._add_watch(self.players_dir)
+
+    def _add_watch(self, path):
+        if path in self.watches.values() or not os.path.isdir(path):
+            return
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {path} failed")
+        self.watches[wd] = path
+
+    def _relevant(self, data):
+        relevant = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                relevant = True
+            elif self.watches.get(wd) == self.players_dir:
+                relevant = relevant or name.endswith(".sav")
+            elif name == "Players":
+                # the Players directory appeared (or went away) after start
+                self.watches = {
+                    w: p for w, p in self.watches.items() if p != self.players_dir
+                }
+                self._add_watch(self.players_dir)
+                relevant = True
+            elif name == self.level_name:
+                relevant = True
+        return relevant
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds, True if a save file changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            data = b""
+            while True:
+                try:
+                    data += os.read(self.fd, 65536)
+                except BlockingIOError:
+                    break
+            if self._relevant(data):
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(level_file, poll_interval=2.0):
+    """An inotify watcher where the platform has one, polling otherwise."""
+    try:
+        watcher = InotifyWatcher(level_file)
+    except (OSError, AttributeError, TypeError) as e:
+        log(f"inotify unavailable ({e}), polling every {poll_interval}s")
+        return PollingWatcher(level_file, poll_interval)
+    log(f"Watching {watcher.world_dir} with inotify")
+    return watcher
@@ -20,7 +20,45 @@ def tick2local(tick, real_date_time_ticks, filetime):
     return t.strftime("%Y-%m-%dT%H:%M:%SZ%z").replace("+0000", "")
 
 
-class Player:
+def _make_to_dict(fields):
+    body = ", ".join(f"{field!r}: self.{field}" for field in fields)
+    namespace = {}
+    exec(f"def to_dict(self):\n    return {{{body}}}", namespace)
+    return namespace["to_dict"]
+
+
+class Record:
+    """Base for structured records.
+
+    Subclasses list their output fields once in ``_fields``; they double as
+    ``__slots__`` and ``to_dict`` is generated from them at class creation.
+    """
+
+    __slots__ = ()
+    _fields: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.to_dict = _make_to_dict(cls._fields)
+
+
+class Player(Record):
+    __slots__ = _fields = (
+        "player_uid",
+        "nickname",
+        "level",
+        "exp",
+        "hp",
+        "max_hp",
+        "shield_hp",
+        "shield_max_hp",
+        "max_status_point",
+        "status_point",
+        "full_stomach",
+        "pals",
+        "items",
+    )
+
     def __init__(self, uid, data):
         self.player_uid = hexuid_to_decimal(uid)
         self.nickname = data["NickName"]["value"] if data.get("NickName") else ""
@@ -65,136 +103,18 @@ class Player:
             }
         )
 
-        self.__order = [
-            "player_uid",
-            "nickname",
-            "level",
-            "exp",
-            "hp",
-            "max_hp",
-            "shield_hp",
-            "shield_max_hp",
-            "max_status_point",
-            "status_point",
-            "full_stomach",
-            "pals",
-            "items",
-        ]
 
-    def to_dict(self):
-        return {
-            attr: getattr(self, attr)
-            for attr in self.__order
-            if not attr.startswith("_") and not callable(getattr(self, attr))
-        }
+class Guild(Record):
+    __slots__ = _fields = (
+        "name",
+        "base_camp_level",
+        "admin_player_uid",
+        "players",
+        "base_ids",
+        "base_camp",
+    )
 
-
-class Pal:
     def __init__(self, data, real_date_time_ticks, filetime):
-        self.owner = hexuid_to_decimal(data["OwnerPlayerUId"]["value"])
-        self.nickname = data["NickName"]["value"] if data.get("NickName") else ""
-        self.level = int(data["Level"]["value"]["value"]) if data.get("Level") else 1
-        self.exp = int(data["Exp"]["value"]) if data.get("Exp") else 0
-        self.hp = int(data["HP"]["value"]["Value"]["value"]) if data.get("HP") else 0
-        self.max_hp = (
-            int(data["MaxHP"]["value"]["Value"]["value"]) if data.get("MaxHP") else 0
-        )
-        self.gender = (
-            data["Gender"]["value"]["value"].split("::")[-1]
-            if data.get("Gender")
-            else "Unknow"
-        )
-        self.is_lucky = data["IsRarePal"]["value"] if data.get("IsRarePal") else False
-        self.is_boss = False
-
-        if data.get("CharacterID"):
-            typename = data["CharacterID"]["value"]
-            typename_upper = typename.upper()
-            if typename_upper[:5] == "BOSS_":
-                typename_upper = typename_upper.replace("BOSS_", "")
-                self.is_boss = not self.is_lucky
-            self.is_tower = typename_upper.startswith("GYM_")
-            self.type = typename
-        else:
-            self.is_tower = False
-            self.type = "Unknow"
-        self.workspeed = data["CraftSpeed"]["value"] if data.get("CraftSpeed") else 0
-        self.melee = (
-            int(data["Talent_Melee"]["value"]) if data.get("Talent_Melee") else 0
-        )
-        self.ranged = (
-            int(data["Talent_Shot"]["value"]["value"]) if data.get("Talent_Shot") else 0
-        )
-        self.defense = (
-            int(data["Talent_Defense"]["value"]["value"])
-            if data.get("Talent_Defense")
-            else 0
-        )
-        self.rank = int(data["Rank"]["value"]["value"]) if data.get("Rank") else 1
-        self.rank_attack = (
-            int(data["Rank_Attack"]["value"]["value"]) if data.get("Rank_Attack") else 0
-        )
-        self.rank_defence = (
-            int(data["Rank_Defence"]["value"]["value"])
-            if data.get("Rank_Defence")
-            else 0
-        )
-        self.rank_craftspeed = (
-            int(data["Rank_CraftSpeed"]["value"]["value"])
-            if data.get("Rank_CraftSpeed")
-            else 0
-        )
-
-        # self.owned_time = (
-        #     tick2local(
-        #         data["OwnedTime"]["value"],
-        #         real_date_time_ticks,
-        #         filetime,
-        #     )
-        #     if data.get("OwnedTime")
-        #     else ""
-        # )
-        self.skills = (
-            data["PassiveSkillList"]["value"]["values"]
-            if data.get("PassiveSkillList")
-            else []
-        )
-
-        self.__order = [
-            "owner",
-            "nickname",
-            "level",
-            "exp",
-            "hp",
-            "max_hp",
-            "type",
-            "gender",
-            "is_lucky",
-            "is_boss",
-            "is_tower",
-            "workspeed",
-            "melee",
-            "ranged",
-            "defense",
-            "rank",
-            "rank_attack",
-            "rank_defence",
-            "rank_craftspeed",
-            # "owned_time",
-            "skills",
-        ]
-
-    def to_dict(self):
-        return {
-            attr: getattr(self, attr)
-            for attr in self.__order
-            if not attr.startswith("_") and not callable(getattr(self, attr))
-        }
-
-
-class Guild:
-    def __init__(self, data, real_date_time_ticks, filetime):
-        print(data)
         self.name = "default"
         self.base_camp_level = data["base_camp_level"]
         self.admin_player_uid = hexuid_to_decimal(data["admin_player_uid"])
@@ -216,24 +136,20 @@ class Guild:
         ]
         self.base_ids = [hexuid_to_decimal(x) for x in data["base_ids"]]
         self.base_camp = []
-        self.__order = [
-            "name",
-            "base_camp_level",
-            "admin_player_uid",
-            "players",
-            "base_ids",
-            "base_camp",
-        ]
 
-    def to_dict(self):
-        return {
-            attr: getattr(self, attr)
-            for attr in self.__order
-            if not attr.startswith("_") and not callable(getattr(self, attr))
-        }
 
+class BaseCamp(Record):
+    __slots__ = _fields = (
+        "id",
+        # "name",
+        "state",
+        "transform",
+        "area_range",
+        "group_id_belong_to",
+        # "fast_travel_local_transform",
+        "owner_map_object_instance_id",
+    )
 
-class BaseCamp:
     def __init__(self, data):
         self.id = hexuid_to_decimal(data["id"])
         # self.name = data["name"]
@@ -265,21 +181,3 @@ class BaseCamp:
         self.owner_map_object_instance_id = hexuid_to_decimal(
             data["owner_map_object_instance_id"]
         )
-
-        self.__order = [
-            "id",
-            # "name",
-            "state",
-            "transform",
-            "area_range",
-            "group_id_belong_to",
-            # "fast_travel_local_transform",
-            "owner_map_object_instance_id",
-        ]
-
-    def to_dict(self):
-        return {
-            attr: getattr(self, attr)
-            for attr in self.__order
-            if not attr.startswith("_") and not callable(getattr(self, attr))
-        }
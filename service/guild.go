@@ -23,6 +23,29 @@ func PutGuilds(db *bbolt.DB, guilds []database.Guild) error {
 	})
 }
 
+// PruneGuilds deletes every guild whose admin is not in adminPlayerUids and
+// returns the admin uids that have no stored guild.
+func PruneGuilds(db *bbolt.DB, adminPlayerUids []string) ([]string, error) {
+	keep := make(map[string]struct{}, len(adminPlayerUids))
+	for _, uid := range adminPlayerUids {
+		keep[uid] = struct{}{}
+	}
+	missing := make([]string, 0)
+	err := db.Update(func(tx *bbolt.Tx) error {
+		b := tx.Bucket([]byte("guilds"))
+		if err := deleteExcept(b, keep); err != nil {
+			return err
+		}
+		for uid := range keep {
+			if b.Get([]byte(uid)) == nil {
+				missing = append(missing, uid)
+			}
+		}
+		return nil
+	})
+	return missing, err
+}
+
 func ListGuilds(db *bbolt.DB) ([]database.Guild, error) {
 	guilds := make([]database.Guild, 0)
 	err := db.View(func(tx *bbolt.Tx) error {
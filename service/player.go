@@ -14,66 +14,82 @@ func PutPlayers(db *bbolt.DB, players []database.Player) error {
 	return db.Update(func(tx *bbolt.Tx) error {
 		b := tx.Bucket([]byte("players"))
 
-		// get existing players
-		existingPlayers := make(map[string]database.Player)
-		err := b.ForEach(func(k, v []byte) error {
-			var player database.Player
-			if err := json.Unmarshal(v, &player); err != nil {
+		// build new players map
+		newPlayers := make(map[string]struct{}, len(players))
+		for _, p := range players {
+			newPlayers[p.PlayerUid] = struct{}{}
+			if err := mergePlayer(b, p); err != nil {
 				return err
 			}
-			existingPlayers[player.PlayerUid] = player
-			return nil
-		})
-		if err != nil {
-			return err
 		}
 
-		// build new players map
-		newPlayers := make(map[string]database.Player)
-		for _, p := range players {
-			newPlayers[p.PlayerUid] = p
-		}
+		return deleteExcept(b, newPlayers)
+	})
+}
 
-		// process new and existing players
+// UpsertPlayers merges one batch of a save sync into the players bucket
+// without removing anyone; PrunePlayers finishes the sync.
+func UpsertPlayers(db *bbolt.DB, players []database.Player) error {
+	return db.Update(func(tx *bbolt.Tx) error {
+		b := tx.Bucket([]byte("players"))
 		for _, p := range players {
-			existingPlayer, exists := existingPlayers[p.PlayerUid]
-
-			if exists {
-				if p.SteamId == "" {
-					p.SteamId = existingPlayer.SteamId
-				}
-				p.Ip = existingPlayer.Ip
-				p.Ping = existingPlayer.Ping
-				p.LocationX = existingPlayer.LocationX
-				p.LocationY = existingPlayer.LocationY
-			}
-
-			if p.SaveLastOnline != "" {
-				if parsedTime, err := time.Parse(time.RFC3339, p.SaveLastOnline); err == nil {
-					p.LastOnline = parsedTime
-				}
-			}
-
-			v, err := json.Marshal(p)
-			if err != nil {
-				return err
-			}
-			if err := b.Put([]byte(p.PlayerUid), v); err != nil {
+			if err := mergePlayer(b, p); err != nil {
 				return err
 			}
 		}
+		return nil
+	})
+}
 
-		// delete old players
-		for uid := range existingPlayers {
-			if _, exists := newPlayers[uid]; !exists {
-				if err := b.Delete([]byte(uid)); err != nil {
-					return err
-				}
+// PrunePlayers deletes every player not in playerUids and returns the
+// uids that are not stored, so the caller can upload them again.
+func PrunePlayers(db *bbolt.DB, playerUids []string) ([]string, error) {
+	keep := make(map[string]struct{}, len(playerUids))
+	for _, uid := range playerUids {
+		keep[uid] = struct{}{}
+	}
+	missing := make([]string, 0)
+	err := db.Update(func(tx *bbolt.Tx) error {
+		b := tx.Bucket([]byte("players"))
+		if err := deleteExcept(b, keep); err != nil {
+			return err
+		}
+		for uid := range keep {
+			if b.Get([]byte(uid)) == nil {
+				missing = append(missing, uid)
 			}
 		}
-
 		return nil
 	})
+	return missing, err
+}
+
+func mergePlayer(b *bbolt.Bucket, p database.Player) error {
+	if v := b.Get([]byte(p.PlayerUid)); v != nil {
+		var existingPlayer database.TersePlayer
+		if err := json.Unmarshal(v, &existingPlayer); err != nil {
+			return err
+		}
+		if p.SteamId == "" {
+			p.SteamId = existingPlayer.SteamId
+		}
+		p.Ip = existingPlayer.Ip
+		p.Ping = existingPlayer.Ping
+		p.LocationX = existingPlayer.LocationX
+		p.LocationY = existingPlayer.LocationY
+	}
+
+	if p.SaveLastOnline != "" {
+		if parsedTime, err := time.Parse(time.RFC3339, p.SaveLastOnline); err == nil {
+			p.LastOnline = parsedTime
+		}
+	}
+
+	v, err := json.Marshal(p)
+	if err != nil {
+		return err
+	}
+	return b.Put([]byte(p.PlayerUid), v)
 }
 
 func PutPlayersOnline(db *bbolt.DB, players []database.OnlinePlayer) error {
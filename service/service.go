@@ -1,5 +1,29 @@
 package service
 
-import "errors"
+import (
+	"errors"
+
+	"go.etcd.io/bbolt"
+)
 
 var ErrNoRecord = errors.New("record not found")
+
+// deleteExcept removes every key of b that is not in keep.
+func deleteExcept(b *bbolt.Bucket, keep map[string]struct{}) error {
+	var stale [][]byte
+	err := b.ForEach(func(k, v []byte) error {
+		if _, exists := keep[string(k)]; !exists {
+			stale = append(stale, append([]byte(nil), k...))
+		}
+		return nil
+	})
+	if err != nil {
+		return err
+	}
+	for _, k := range stale {
+		if err := b.Delete(k); err != nil {
+			return err
+		}
+	}
+	return nil
+}